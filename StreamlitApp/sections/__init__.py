@@ -0,0 +1,29 @@
+import os
+import importlib
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The sections of the dashboard in sidebar order and the module rendering each one. A module is
+# imported the first time its section is opened and stays loaded for the later reruns, so the
+# Introduction page is served without importing pandas, Plotly Express or the datasets.
+SECTIONS = {
+    "Introduction": "introduction",
+    "Race Circuits": "race_circuits",
+    "Constructor Standing": "constructor_standing",
+    "Driver Standing": "driver_standing",
+    "Race Results": "race_results",
+    "Pit Stops": "pit_stops",
+}
+
+def load_section(name):
+    """Imports the module of a section on first use and returns its render function."""
+    return importlib.import_module(f'{__name__}.{SECTIONS[name]}').render
+
+def default_views():
+    """Lists the figures every section shows by default, as (function, args, kwargs), importing every section."""
+    views = []
+    for module_name in SECTIONS.values():
+        module = importlib.import_module(f'{__name__}.{module_name}')
+        if hasattr(module, 'default_views'):
+            views.extend(module.default_views())
+    return views
\ No newline at end of file
@@ -0,0 +1,98 @@
+import streamlit as st
+from utils.constructor_standing_vis import (
+    plot_constructor_ranking_vs_year,
+    plot_constructor_wins_vs_year,
+    plot_constructor_points_vs_year,
+    plot_constructor_points_distribution_per_year,
+    plot_overall_win_percentage,
+    plot_yearly_win_percentage
+    )
+from utils.loaders import available_seasons
+
+def render():
+    """Renders the Constructor Standing section."""
+    st.subheader("Constructor Standing Visualizations")
+    
+    constructor_vis_option = st.sidebar.selectbox(
+        "Select Visualization",
+        ["Yearly Trends", "Dominance"]
+    )
+    
+    if constructor_vis_option == "Yearly Trends":
+        seasons = sorted(available_seasons('results'))
+        start_year, end_year = st.sidebar.select_slider(
+            "Select Year Range",
+            options=seasons,
+            value=(seasons[0], seasons[-1])
+        )
+        
+        show_ranking = st.sidebar.checkbox("Show Ranking vs Year", value=True)
+        show_wins = st.sidebar.checkbox("Show Wins vs Year", value=True)
+        show_points = st.sidebar.checkbox("Show Points vs Year", value=True)
+
+        if show_ranking:
+            st.write("### Ranking vs Year")
+            fig_ranking = plot_constructor_ranking_vs_year(start_year=start_year, end_year=end_year)
+            st.plotly_chart(fig_ranking, use_container_width=True)
+
+        if show_wins:
+            st.write("### Wins vs Year")
+            fig_wins = plot_constructor_wins_vs_year(start_year=start_year, end_year=end_year)
+            st.plotly_chart(fig_wins, use_container_width=True)
+
+        if show_points:
+            st.write("### Points vs Year")
+            fig_points = plot_constructor_points_vs_year(start_year=start_year, end_year=end_year)
+            st.plotly_chart(fig_points, use_container_width=True)
+        
+        st.markdown("""
+                    These visualizations track constructor performance trends in rankings, wins, and points across
+                    recent seasons. Mercedes' dominance is evident from 2017 to 2021, followed by the rise of
+                    Red Bull, starting in 2021 and solidifying through 2023. By 2024, a closer championship battle
+                    emerges between Red Bull, McLaren, Ferrari, and Mercedes, reflecting the impact of the 2022
+                    regulation changes aimed at enhancing competition.
+
+                    In the mid-to-lower rankings, Aston Martin has solidified a middle-ground position, with Haas
+                    showing marked improvement. In contrast, Alpine has experienced a notable decline, continuing
+                    from its rebranding of Renault in 2020-2021. Additionally, Alfa Romeo’s transition to Sauber
+                    in 2023 further reshapes the grid's landscape, highlighting the evolving dynamics within the
+                    constructor standings.
+                    """)
+
+    elif constructor_vis_option == "Dominance":
+        st.write("### Points Distribution per Year")
+        fig_points_dist = plot_constructor_points_distribution_per_year()
+        st.plotly_chart(fig_points_dist, use_container_width=True)
+
+        st.write("### Overall Win Percentage per Constructor")
+        fig_overall_win_percentage = plot_overall_win_percentage()
+        st.plotly_chart(fig_overall_win_percentage, use_container_width=True)
+
+        st.write("### Year-by-Year Win Percentage per Constructor")
+        fig_yearly_win_percentage = plot_yearly_win_percentage()
+        st.plotly_chart(fig_yearly_win_percentage, use_container_width=True)
+        
+        st.markdown("""
+                    The points distribution visualization provides a higher-level look into constructor dominance
+                    each season. Notably, 2021 and 2023 show a wide range of high points, reflecting dominant
+                    performances. In contrast, the 2024 season displays a much narrower distribution, indicating
+                    a more competitive field.
+                    
+                    The overall and yearly win percentage charts further emphasize the shifts in constructor
+                    dominance, highlighting how leading teams' win shares have evolved. Together, these
+                    visualizations underscore the competitive dynamics and changes in the F1 landscape over recent
+                    years.
+                    """)
+
+def default_views():
+    """Lists the figures of this section shown by default."""
+    seasons = sorted(available_seasons('results'))
+    year_range = {'start_year': seasons[0], 'end_year': seasons[-1]}
+    return [
+        (plot_constructor_ranking_vs_year, (), year_range),
+        (plot_constructor_wins_vs_year, (), year_range),
+        (plot_constructor_points_vs_year, (), year_range),
+        (plot_constructor_points_distribution_per_year, (), {}),
+        (plot_overall_win_percentage, (), {}),
+        (plot_yearly_win_percentage, (), {}),
+    ]
\ No newline at end of file
@@ -0,0 +1,98 @@
+import streamlit as st
+from utils.pit_stop_vis import (
+    plot_avg_pit_stop_duration_by_circuit,
+    plot_pit_stop_duration_by_constructor,
+    plot_pit_stop_count_by_lap,
+    plot_race_stints,
+    plot_undercut_gains
+)
+from utils.loaders import available_seasons, available_rounds
+
+def render():
+    """Renders the Pit Stops section."""
+    st.subheader("Pit Stop Visualizations")
+    pit_stop_vis_option = st.sidebar.selectbox(
+        "Select Visualization",
+        ["Average Pit Stop Duration by Circuit", "Pit Stop Duration by Constructor", "Pit Stop Count by Lap", "Race Stints", "Undercut Gains"]
+    )
+
+    if pit_stop_vis_option == "Average Pit Stop Duration by Circuit":
+        year = st.sidebar.selectbox("Select Year", options=available_seasons('pit_stops'))
+        st.write(f"### Average Pit Stop Duration by Circuit for {year}")
+        fig_avg_pit_duration = plot_avg_pit_stop_duration_by_circuit(year)
+        st.plotly_chart(fig_avg_pit_duration, use_container_width=True)
+        st.markdown("""
+                    This bar chart displays the average pit stop duration for each circuit in a selected year.
+                    By comparing pit stop times across circuits, this visualization highlights the variability
+                    influenced by pit lane design and track layout. Differences in pit stop durations can impact
+                    race results and reflect how teams adjust their 1 or 2 pitstop strategy.
+                    """)
+
+    elif pit_stop_vis_option == "Pit Stop Duration by Constructor":
+        year = st.sidebar.selectbox("Select Year", options=available_seasons('pit_stops'))
+        st.write(f"### Pit Stop Duration by Constructor for {year}")
+        fig_pit_duration_by_constructor = plot_pit_stop_duration_by_constructor(year)
+        st.plotly_chart(fig_pit_duration_by_constructor, use_container_width=True)
+        st.markdown("""
+                    This box plot shows the distribution of pit stop durations for each constructor in a
+                    selected year. By comparing pit stop performance across teams, this visualization highlights
+                    variations in efficiency and precision. Constructors with consistently shorter and more stable
+                    pit stop times demonstrate high team coordination, while wider distributions may reflect
+                    inconsistencies or challenges in pit lane operations.
+                    """)
+
+    elif pit_stop_vis_option == "Pit Stop Count by Lap":
+        year = st.sidebar.selectbox("Select Year", options=available_seasons('pit_stops'))
+        round_num = st.sidebar.selectbox("Select Round", options=available_rounds(year, 'pit_stops'))
+        st.write(f"### Pit Stop Count by Lap for Season {year}, Round {round_num}")
+        fig_pit_count_by_lap = plot_pit_stop_count_by_lap(year, round_num)
+        st.plotly_chart(fig_pit_count_by_lap, use_container_width=True)
+
+    elif pit_stop_vis_option == "Race Stints":
+        year = st.sidebar.selectbox("Select Year", options=available_seasons('pit_stops'))
+        round_num = st.sidebar.selectbox("Select Round", options=available_rounds(year, 'pit_stops'))
+        st.write(f"### Race Stints for Season {year}, Round {round_num}")
+        fig_race_stints = plot_race_stints(year, round_num)
+        if fig_race_stints:
+            st.plotly_chart(fig_race_stints, use_container_width=True)
+            st.markdown("""
+                    This chart splits each driver's race into stints between pit stops, ordered by the number of
+                    laps completed. Each stint starts on the lap after a stop and ends on the next in-lap, and
+                    hovering a stint shows its average lap time without the first lap and the in- and out-laps.
+                    Longer stints point to a one-stop strategy, while short final stints are often late stops
+                    for fresh tyres or the fastest lap point.
+                    """)
+        else:
+            st.write(f"No lap times available for Round {round_num} of {year}.")
+
+    elif pit_stop_vis_option == "Undercut Gains":
+        year = st.sidebar.selectbox("Select Year", options=available_seasons('pit_stops'))
+        st.write(f"### Undercut Gains by Constructor for {year}")
+        fig_undercut_gains = plot_undercut_gains(year)
+        if fig_undercut_gains:
+            st.plotly_chart(fig_undercut_gains, use_container_width=True)
+            st.markdown("""
+                    An undercut is a stop made before the car ahead, hoping to gain time on fresh tyres while
+                    that car completes its last laps on old ones. Each point is a stop where the car one
+                    position ahead pitted within the next five laps, and shows the gap gained on it once both
+                    cars had completed their out-laps. Points above zero gained time on that car, but a stop can
+                    gain time and still come out behind: hover a point to see whether the driver passed. Stops
+                    around a safety car or red flag are left out since the field bunches up whatever the strategy.
+                    """)
+        else:
+            st.write(f"No undercut attempts found for {year}.")
+
+def default_views():
+    """Lists the figures of this section shown by default, for the latest season and its first round."""
+    seasons = available_seasons('pit_stops')
+    if not seasons:
+        return []
+    year = seasons[0]
+    first_round = available_rounds(year, 'pit_stops')[0]
+    return [
+        (plot_avg_pit_stop_duration_by_circuit, (year,), {}),
+        (plot_pit_stop_duration_by_constructor, (year,), {}),
+        (plot_pit_stop_count_by_lap, (year, first_round), {}),
+        (plot_race_stints, (year, first_round), {}),
+        (plot_undercut_gains, (year,), {}),
+    ]
\ No newline at end of file
@@ -0,0 +1,76 @@
+import streamlit as st
+from utils.race_schedule_vis import (
+    f1_circuit_world_map,
+    races_by_continent,
+    races_by_circuit,
+    races_by_country
+    )
+from utils.loaders import available_seasons
+
+def render():
+    """Renders the Race Circuits section."""
+    visualization = st.sidebar.selectbox(
+        "Select Visualization",
+        ["World Map (F1 Circuits)", "Races by Continent", "Races by Circuit/Country"]
+    )
+    if visualization == "World Map (F1 Circuits)":
+        year = st.sidebar.selectbox("Select Year", options=available_seasons('schedule'))
+        fig = f1_circuit_world_map(year)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("""
+                    Here, you can see the global distribution of Formula 1 circuits for a selected year.
+                    Each marker highlights a race location, with details on the circuit and country.
+                    The map emphasizes the diverse environmental conditions, that teams must adapt to for optimal
+                    performance. These variations influence car setup and driver preparation, 
+                    underscoring the logistical challenges teams face in navigating the season's unique demands.
+                    """
+        )
+    
+    elif visualization == "Races by Continent":
+        fig = races_by_continent()
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("""
+                    This visualization illustrates the distribution of Formula 1 races by continent over the past
+                    several seasons. Europe holds the largest share of the calendar each year, emphasizing its
+                    historical and ongoing importance in F1. Asia and the Middle East follow closely, reflecting 
+                    the sport's expansion into new regions. North and South America account for fewer races,
+                    yet play a critical role in rounding out the global F1 season. Each continent’s race count is
+                    shown in terms of absolute numbers and percentages, highlighting their relative contributions.
+                    """
+        )
+    
+    elif visualization == "Races by Circuit/Country":
+        seasons = sorted(available_seasons('schedule'))
+        start_year, end_year = st.sidebar.select_slider(
+            "Select Year Range",
+            options=seasons,
+            value=(seasons[0], seasons[-1])
+        )
+        y_axis_choice = st.sidebar.selectbox(
+            "Select Y-Axis",
+            options=["Circuit", "Country"]
+        )
+        if y_axis_choice == "Circuit":
+            fig = races_by_circuit(start_year=start_year, end_year=end_year)
+        elif y_axis_choice == "Country":
+            fig = races_by_country(start_year=start_year, end_year=end_year)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("""
+                    This bar chart showcases the number of Formula 1 races held in each country/circuit over the
+                    selected time frame. The visualization highlights the USA’s growing influence on the F1 
+                    calendar, partially due to the attractive documentary named Drive to Survive by Netflix,
+                    currently hosting three races each season in Austin, Miami, and Las Vegas. It also reflects
+                    the enduring presence of classic circuits in countries such as Monaco, the UK, Hungary, and
+                    Austria, which have consistently retained their places in the F1 schedule. Additionally, this
+                    chart reveals countries that were once hosts but have since departed from the calendar,
+                    underscoring F1's dynamic global footprint.
+                    """)
+
+def default_views():
+    """Lists the figures of this section shown by default, with the world map of every season."""
+    seasons = sorted(available_seasons('schedule'))
+    return [(f1_circuit_world_map, (year,), {}) for year in seasons] + [
+        (races_by_continent, (), {}),
+        (races_by_circuit, (), {'start_year': seasons[0], 'end_year': seasons[-1]}),
+        (races_by_country, (), {'start_year': seasons[0], 'end_year': seasons[-1]}),
+    ]
\ No newline at end of file
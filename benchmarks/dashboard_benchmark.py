@@ -0,0 +1,264 @@
+"""Benchmarks the dataset loaders and chart functions of the dashboard.
+
+Every loader is timed from disk and from the cache. Every chart is timed over all seasons, every round
+of the latest season and a range of top-N values, split into data preparation and building the figure.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_DATASETS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Datasets'))
+
+# Files with one row per race entry, whose rounds are repeated to scale a season up.
+RACE_FILES = ['race_results.csv', 'race_schedule.csv', 'pit_results.csv']
+
+# A call is a regression when it is this much slower than the baseline, and by more than the noise floor.
+REGRESSION_THRESHOLD = 0.2
+NOISE_FLOOR_SECONDS = 0.01
+
+TOP_N_VALUES = [3, 6, 10, 20]
+
+def scale_datasets(source_dir, target_dir, factor):
+    """Copies a Datasets directory with every season's races repeated factor times as extra rounds.
+
+    Standings and driver files are copied as they are, so the scaled copy has the same drivers,
+    teams and seasons but factor times the races, results, pit stops and laps.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    for file_name in os.listdir(source_dir):
+        source_path = os.path.join(source_dir, file_name)
+        if not file_name.endswith('.csv'):
+            continue
+        if file_name not in RACE_FILES and not file_name.startswith('lap_times_'):
+            shutil.copy(source_path, os.path.join(target_dir, file_name))
+            continue
+
+        df = pd.read_csv(source_path, dtype=str, keep_default_na=False)
+        season = df['season'].astype(int)
+        race_round = df['round'].astype(int)
+        rounds_per_season = race_round.groupby(season).transform('max')
+        df_scaled = pd.concat([
+            df.assign(round=(race_round + copy * rounds_per_season).astype(str), copy=copy, order=np.arange(len(df)))
+            for copy in range(factor)
+        ], ignore_index=True)
+        # Copies follow their originals within each season, keeping every race's rows together.
+        df_scaled = df_scaled.assign(season_number=df_scaled['season'].astype(int))
+        df_scaled = df_scaled.sort_values(['season_number', 'copy', 'order'], kind='stable')
+        df_scaled.drop(columns=['copy', 'order', 'season_number']).to_csv(os.path.join(target_dir, file_name), index=False)
+
+def spaced_sample(values, size):
+    """Returns up to size values evenly spread over the list, keeping the first and last."""
+    values = list(values)
+    if size is None or len(values) <= size:
+        return values
+    return [values[index] for index in np.linspace(0, len(values) - 1, size).round().astype(int)]
+
+def benchmark_cases(sample_size):
+    """Lists every chart function with the arguments it is benchmarked on, drawn from the datasets being measured."""
+    from utils import race_schedule_vis, constructor_standing_vis, driver_standing_vis, race_results_vis, lap_time_vis, pit_stop_vis
+    from utils.loaders import load_race_schedule_data, load_race_results_data, load_race_catalogue
+
+    df_schedule = load_race_schedule_data()
+    seasons = sorted(int(season) for season in df_schedule['season'].unique())
+    first_season, last_season = seasons[0], seasons[-1]
+    season_ranges = [(first_season, last_season), (last_season - 2, last_season), (last_season, last_season)]
+    df_catalogue = load_race_catalogue()
+    races = [(int(season), int(race_round)) for season, race_round in df_catalogue[['season', 'round']].itertuples(index=False)]
+    last_season_races = [race for race in races if race[0] == last_season]
+    df_results = load_race_results_data()
+    constructors = sorted(df_results.loc[df_results['season'] == last_season, 'constructorId'].astype(str).unique())
+    drivers = df_results.loc[df_results['season'] == last_season, 'driverId'].astype(str).value_counts().index[:3]
+
+    def each(function, arguments):
+        return (f'{function.__module__.split(".")[-1]}.{function.__name__}', function, spaced_sample(arguments, sample_size))
+
+    return [
+        each(race_schedule_vis.f1_circuit_world_map, [{'year': season} for season in seasons]),
+        each(race_schedule_vis.races_by_continent, [{}]),
+        each(race_schedule_vis.races_by_circuit, [{'start_year': start, 'end_year': end} for start, end in season_ranges]),
+        each(race_schedule_vis.races_by_country, [{'start_year': start, 'end_year': end} for start, end in season_ranges]),
+        each(constructor_standing_vis.plot_constructor_ranking_vs_year, [{'start_year': start, 'end_year': end} for start, end in season_ranges]),
+        each(constructor_standing_vis.plot_constructor_wins_vs_year, [{'start_year': start, 'end_year': end} for start, end in season_ranges]),
+        each(constructor_standing_vis.plot_constructor_points_vs_year, [{'start_year': start, 'end_year': end} for start, end in season_ranges]),
+        each(constructor_standing_vis.plot_constructor_points_distribution_per_year, [{}]),
+        each(constructor_standing_vis.plot_overall_win_percentage, [{}]),
+        each(constructor_standing_vis.plot_yearly_win_percentage, [{}]),
+        each(driver_standing_vis.plot_top_drivers_by_points, [{'top': top} for top in TOP_N_VALUES]),
+        each(driver_standing_vis.plot_top_drivers_by_wins, [{'top': top} for top in TOP_N_VALUES]),
+        each(driver_standing_vis.plot_driver_progression, [{'driver_id': driver} for driver in drivers]),
+        each(race_results_vis.plot_grid_vs_position, [{'season_range': season_range} for season_range in season_ranges]),
+        each(race_results_vis.plot_mechanical_issues, [{'selected_season_range': season_range} for season_range in season_ranges]),
+        each(race_results_vis.plot_avg_points_vs_age, [{}]),
+        each(race_results_vis.plot_avg_position_vs_age, [{}]),
+        each(race_results_vis.plot_avg_max_speed_vs_age, [{}]),
+        each(race_results_vis.plot_top_drivers_podiums, [{'top_n': top, 'season_range': (first_season, last_season)} for top in TOP_N_VALUES]),
+        each(race_results_vis.plot_top_constructors_podiums, [{'top_n': top, 'season_range': (first_season, last_season)} for top in TOP_N_VALUES]),
+        each(race_results_vis.plot_head_to_head_performance, [{'year': last_season, 'constructor_id': constructor} for constructor in constructors]),
+        each(race_results_vis.plot_teammate_matrix, [{'year': season} for season in seasons]),
+        each(lap_time_vis.plot_driver_lap_times, [{'year': season, 'round_num': race_round} for season, race_round in last_season_races]),
+        each(pit_stop_vis.plot_avg_pit_stop_duration_by_circuit, [{'year': season} for season in seasons]),
+        each(pit_stop_vis.plot_pit_stop_duration_by_constructor, [{'year': season} for season in seasons]),
+        each(pit_stop_vis.plot_pit_stop_count_by_lap, [{'year': season, 'round_num': race_round} for season, race_round in last_season_races]),
+        each(pit_stop_vis.plot_race_stints, [{'year': season, 'round_num': race_round} for season, race_round in last_season_races]),
+        each(pit_stop_vis.plot_undercut_gains, [{'year': season} for season in seasons]),
+    ]
+
+def time_call(function, kwargs):
+    """Returns the seconds a call takes and its result."""
+    started_at = time.perf_counter()
+    result = function(**kwargs)
+    return time.perf_counter() - started_at, result
+
+def benchmark_loaders(repeat):
+    """Times every load_*_data loader reading from disk and again from the dataset cache."""
+    from utils import loaders
+    from utils.datasets import clear_dataset_cache
+
+    results = {}
+    for name in sorted(dir(loaders)):
+        if not (name.startswith('load_') and name.endswith('_data')):
+            continue
+        loader = getattr(loaders, name)
+        cold_times, warm_times = [], []
+        for _ in range(repeat):
+            clear_dataset_cache()
+            cold_times.append(time_call(loader, {})[0])
+            warm_times.append(time_call(loader, {})[0])
+        results[name] = {'cold_seconds': min(cold_times), 'warm_seconds': min(warm_times)}
+    return results
+
+def benchmark_plots(cases, repeat):
+    """Times every chart call, split into preparing its data and building its figure.
+
+    The whole call is timed with empty dataset, compute and figure caches. Building the figure is
+    timed by calling the undecorated function again once the result of its compute_* step is cached,
+    and data preparation is the difference between the two.
+    """
+    from utils.datasets import clear_dataset_cache
+    from utils.figure_cache import clear_figure_cache
+    from utils.frame_cache import clear_frame_cache
+
+    results = {}
+    for label, function, arguments in cases:
+        calls = []
+        for kwargs in arguments:
+            total_times, figure_times = [], []
+            for _ in range(repeat):
+                clear_dataset_cache()
+                clear_frame_cache()
+                clear_figure_cache()
+                total_times.append(time_call(function, kwargs)[0])
+                figure_times.append(time_call(getattr(function, '__wrapped__', function), kwargs)[0])
+            total, figure = min(total_times), min(figure_times)
+            calls.append({
+                'arguments': {key: list(value) if isinstance(value, tuple) else value for key, value in kwargs.items()},
+                'total_seconds': total,
+                'data_prep_seconds': max(total - figure, 0.0),
+                'figure_seconds': figure,
+            })
+        results[label] = {
+            'calls': calls,
+            'total_seconds': sum(call['total_seconds'] for call in calls) / len(calls),
+            'data_prep_seconds': sum(call['data_prep_seconds'] for call in calls) / len(calls),
+            'figure_seconds': sum(call['figure_seconds'] for call in calls) / len(calls),
+            'max_total_seconds': max(call['total_seconds'] for call in calls),
+        }
+    return results
+
+def find_regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Compares each loader and chart with a saved baseline run and returns the ones that got slower."""
+    regressions = []
+    for section, metric in [('loaders', 'cold_seconds'), ('plots', 'total_seconds')]:
+        for name, entry in results[section].items():
+            base_entry = baseline.get(section, {}).get(name)
+            if base_entry is None:
+                continue
+            seconds, base_seconds = entry[metric], base_entry[metric]
+            if seconds > base_seconds * (1 + threshold) and seconds - base_seconds > NOISE_FLOOR_SECONDS:
+                regressions.append((section, name, base_seconds, seconds))
+    return regressions
+
+def run_benchmarks(args):
+    """Runs the loader and chart benchmarks on the configured datasets and returns the results."""
+    from utils.aggregates import build_aggregate_tables
+    from utils.datasets import clear_dataset_cache
+
+    # The persisted aggregates are built once up front, as they would be on a deployed dashboard.
+    started_at = time.perf_counter()
+    build_aggregate_tables()
+    aggregates_seconds = time.perf_counter() - started_at
+    clear_dataset_cache()
+
+    return {
+        'metadata': {
+            'datasets_dir': args.datasets_dir,
+            'scale': args.scale,
+            'sample': args.sample,
+            'repeat': args.repeat,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plotly': importlib.import_module('plotly').__version__,
+            'machine': platform.machine(),
+        },
+        'aggregates_seconds': aggregates_seconds,
+        'loaders': benchmark_loaders(args.repeat),
+        'plots': benchmark_plots(benchmark_cases(args.sample), args.repeat),
+    }
+
+def print_report(results):
+    rows = [(name, entry['cold_seconds'], None, entry['warm_seconds']) for name, entry in results['loaders'].items()]
+    rows += [(name, entry['total_seconds'], entry['data_prep_seconds'], entry['figure_seconds']) for name, entry in results['plots'].items()]
+    df_report = pd.DataFrame(rows, columns=['function', 'total_s', 'data_prep_s', 'figure_or_warm_s'])
+    print(f'Aggregates built in {results["aggregates_seconds"]:.2f}s')
+    print(df_report.to_string(index=False, float_format=lambda value: f'{value:.4f}'))
+
+def main():
+    parser = argparse.ArgumentParser(description='Time every dataset loader and chart function of the dashboard.')
+    parser.add_argument('--datasets-dir', default=os.environ.get('F1_DATASETS_DIR', DEFAULT_DATASETS_DIR), help='Datasets directory to benchmark')
+    parser.add_argument('--scale', type=int, default=1, help='Repeat every season\'s races this many times in a temporary copy of the datasets')
+    parser.add_argument('--sample', type=int, default=None, help='Benchmark at most this many arguments per chart, evenly spread')
+    parser.add_argument('--repeat', type=int, default=1, help='Time each call this many times and keep the fastest')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with the results of an earlier run and exit with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='Relative slowdown counted as a regression')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='f1-benchmark-') as scaled_dir:
+        if args.scale > 1:
+            scale_datasets(args.datasets_dir, scaled_dir, args.scale)
+            args.datasets_dir = scaled_dir
+        # The utils modules read these when imported, so set them before the first import.
+        os.environ['F1_DATASETS_DIR'] = args.datasets_dir
+        os.environ.pop('F1_FIGURE_CACHE_DIR', None)
+        results = run_benchmarks(args)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2, default=str)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        for setting in ['scale', 'sample']:
+            if baseline['metadata'].get(setting) != results['metadata'][setting]:
+                print(f'Warning: the baseline was run with {setting}={baseline["metadata"].get(setting)}, this run with {setting}={results["metadata"][setting]}')
+        regressions = find_regressions(results, baseline, args.threshold)
+        for section, name, base_seconds, seconds in regressions:
+            print(f'REGRESSION {section} {name}: {base_seconds:.4f}s -> {seconds:.4f}s ({seconds / base_seconds - 1:+.0%})')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions against {args.baseline}')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import argparse
+import functools
+import tempfile
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.datasets import resolve_dataset_file
+from utils.loaders import load_lap_times_data, load_race_schedule_data, load_pit_stop_data, read_encoded_table
+from utils.lap_time_imputation import RACE_KEY, impute_lap_times_mean_median, impute_lap_times_least_squares
+from utils.pit_stop_analytics import mark_pit_laps, flag_neutralized_laps
+
+def hold_out_finishers(df_lap_times, df_race_results, df_pit_stops, sample_size, seed):
+    """Turns a sample of finishers into retirements at a random lap, keeping the laps they went on to drive as the truth.
+
+    Every other entry is marked as finished, so the imputation methods only fill the held-out laps.
+    Returns the truncated lap times, results and pit stops, and the held-out laps.
+    """
+    rng = np.random.default_rng(seed)
+    df_finishers = df_race_results.loc[df_race_results['status'].astype(str) == 'Finished', RACE_KEY]
+    df_finishers = df_finishers.merge(df_lap_times.groupby(RACE_KEY, observed=True)['lap'].max().rename('race_laps').reset_index(), on=RACE_KEY)
+    df_held_out = df_finishers.sample(n=min(sample_size, len(df_finishers)), random_state=seed).reset_index(drop=True)
+    df_held_out['cut_lap'] = (df_held_out['race_laps'] * rng.uniform(0.1, 0.9, len(df_held_out))).astype(int)
+
+    def after_cut(df):
+        df = df.merge(df_held_out[RACE_KEY + ['cut_lap']], on=RACE_KEY, how='left')
+        return df['lap'] > df['cut_lap'].fillna(np.inf).to_numpy()
+
+    held_out_lap = after_cut(df_lap_times).to_numpy()
+    df_truth = df_lap_times.loc[held_out_lap, RACE_KEY + ['lap', 'lap_time_seconds']]
+    df_lap_times = df_lap_times[~held_out_lap].reset_index(drop=True)
+    df_pit_stops = df_pit_stops[~after_cut(df_pit_stops).to_numpy()].reset_index(drop=True)
+
+    df_race_results = df_race_results.merge(df_held_out[RACE_KEY].assign(held_out=True), on=RACE_KEY, how='left')
+    df_race_results['status'] = np.where(df_race_results['held_out'].notna(), 'Retired', 'Finished')
+    return df_lap_times, df_race_results.drop(columns='held_out'), df_pit_stops, df_truth
+
+def score(df_imputed, df_truth, df_clean_laps):
+    """Returns the share of held-out laps imputed and the errors on all of them and on the clean (green-flag, non-pit) ones."""
+    df_scored = df_truth.merge(df_imputed[RACE_KEY + ['lap', 'lap_time_seconds']], on=RACE_KEY + ['lap'], suffixes=('', '_imputed'))
+    df_scored = df_scored.merge(df_clean_laps, on=RACE_KEY + ['lap'])
+    errors = df_scored['lap_time_seconds_imputed'] - df_scored['lap_time_seconds'].astype('float64')
+    clean_errors = errors[df_scored['clean']]
+    return {
+        'coverage': len(df_scored) / len(df_truth),
+        'mae': errors.abs().mean(),
+        'rmse': np.sqrt((errors ** 2).mean()),
+        'clean_mae': clean_errors.abs().mean(),
+        'clean_median_error': clean_errors.abs().median(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the accuracy and wall time of the lap time imputation methods on held-out finishers.')
+    parser.add_argument('--sample-size', type=int, default=100, help='Number of finishers to cut short')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-arima', action='store_true', help='Leave out the ARIMA method, which needs statsmodels and takes minutes')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for the ARIMA fits')
+    args = parser.parse_args()
+
+    df_race_results = read_encoded_table(resolve_dataset_file('race_results.csv'))
+    df_lap_times, df_race_results, df_pit_stops, df_truth = hold_out_finishers(
+        load_lap_times_data(), df_race_results, load_pit_stop_data(), args.sample_size, args.seed
+    )
+    df_race_schedule = load_race_schedule_data()
+
+    # Score clean laps against the full race, so the flags do not depend on the cut.
+    df_all_laps = load_lap_times_data()
+    df_clean_laps = mark_pit_laps(df_all_laps[RACE_KEY + ['lap', 'lap_time_seconds']], load_pit_stop_data())
+    df_clean_laps = df_clean_laps.merge(flag_neutralized_laps(df_all_laps), on=['season', 'round', 'lap'])
+    df_clean_laps['clean'] = ~(df_clean_laps['in_lap'] | df_clean_laps['out_lap'] | df_clean_laps['neutralized'] | (df_clean_laps['lap'] == 1))
+    df_clean_laps = df_clean_laps[RACE_KEY + ['lap', 'clean']]
+
+    # Every backend takes the lap times, results and schedule; the options only tune it. The least-squares
+    # fits get the truncated pit stops, so they cannot see the stops made after the cut.
+    methods = {
+        'mean': functools.partial(impute_lap_times_mean_median, method='mean'),
+        'median': functools.partial(impute_lap_times_mean_median, method='median'),
+        'least_squares': functools.partial(impute_lap_times_least_squares, df_pit_stops=df_pit_stops),
+    }
+    if not args.skip_arima:
+        from utils.arima_imputation import impute_lap_times_arima
+        # A fresh parameter cache, so every model is actually fitted.
+        cache_file = os.path.join(tempfile.mkdtemp(), 'arima_params.json')
+        methods['arima'] = functools.partial(impute_lap_times_arima, workers=args.workers, cache_file=cache_file)
+
+    results = []
+    for method, impute in methods.items():
+        started_at = time.perf_counter()
+        df_imputed = impute(df_lap_times, df_race_results, df_race_schedule)
+        seconds = time.perf_counter() - started_at
+        results.append(dict(method=method, seconds=seconds, **score(df_imputed, df_truth, df_clean_laps)))
+
+    print(f'{len(df_truth)} held-out laps of {args.sample_size} finishers')
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda value: f'{value:.3f}'))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'StreamlitApp'))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+sys.path.append(APP_DIR)
+
+from sections import SECTIONS
+
+# Modules the Introduction page should be served without.
+HEAVY_MODULES = ['pandas', 'plotly.express']
+
+def measure_section(section, timeout):
+    """Runs the app headless in this process, opening the Introduction and then a section, and times each run.
+
+    Returns the seconds to import Streamlit, to render the Introduction on a cold start, to open the
+    section for the first time and to rerun it, the heavy modules loaded by the Introduction and the
+    exceptions raised by the app.
+    """
+    started_at = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    result = {'section': section, 'streamlit_seconds': time.perf_counter() - started_at}
+
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    started_at = time.perf_counter()
+    app.run()
+    result['introduction_seconds'] = time.perf_counter() - started_at
+    result['introduction_modules'] = [module for module in HEAVY_MODULES if module in sys.modules]
+
+    result['first_open_seconds'] = None
+    if section != 'Introduction':
+        app.sidebar.selectbox[0].set_value(section)
+        started_at = time.perf_counter()
+        app.run()
+        result['first_open_seconds'] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    app.run()
+    result['rerun_seconds'] = time.perf_counter() - started_at
+    result['errors'] = [exception.message for exception in app.exception]
+    return result
+
+def run_section(section, timeout):
+    """Measures a section in a fresh interpreter, so nothing is imported or cached beforehand."""
+    env = dict(os.environ)
+    env.pop('F1_FIGURE_CACHE_DIR', None)
+    # The background warm-up would compete with the runs being timed.
+    env['F1_WARMUP'] = '0'
+    started_at = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', __file__, '--measure', section, '--timeout', str(timeout)],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_seconds'] = time.perf_counter() - started_at
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the cold start of the dashboard and the first opening of each section.')
+    parser.add_argument('--sections', nargs='+', default=list(SECTIONS), help='Sections to measure')
+    parser.add_argument('--timeout', type=float, default=300, help='Seconds a run of the app may take')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure_section(args.measure, args.timeout)))
+        return
+
+    results = [run_section(section, args.timeout) for section in args.sections]
+    print(f'{"section":<22}{"process":>9}{"streamlit":>11}{"intro":>8}{"open":>8}{"rerun":>8}  intro imports')
+    for result in results:
+        first_open = '' if result['first_open_seconds'] is None else f'{result["first_open_seconds"]:.3f}'
+        print(f'{result["section"]:<22}{result["process_seconds"]:>9.3f}{result["streamlit_seconds"]:>11.3f}'
+              f'{result["introduction_seconds"]:>8.3f}{first_open:>8}{result["rerun_seconds"]:>8.3f}  '
+              f'{", ".join(result["introduction_modules"]) or "-"}')
+        for error in result['errors']:
+            print(f'  error: {error}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""Test double of the Ergast API, serving the csv files of a Datasets directory.
+
+tests/test_ingestion.py runs the ingestion against it, with a share of requests failing to exercise the
+client's retries. Running it as python -m tests.ergast_stub serves the Datasets directory for trying the
+ingestion offline.
+"""
+import os
+import re
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import pandas as pd
+from utils.datasets import DATASETS_DIR
+
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 1000
+
+class ErgastStub:
+    """Answers Ergast API paths with JSON built from the csv files of a Datasets directory.
+
+    A non-zero error_rate makes that share of requests fail with 503, to exercise client retries.
+    """
+
+    def __init__(self, datasets_dir=DATASETS_DIR, error_rate=0.0):
+        self.datasets_dir = datasets_dir
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self._frames = {}
+        self._lap_timings = {}
+        self._lock = threading.Lock()
+        self.routes = [
+            (re.compile(r'^/(\d{4})\.json$'), self.season_schedule),
+            (re.compile(r'^/(\d{4})/(\d+)/results\.json$'), self.race_results),
+            (re.compile(r'^/(\d{4})/(\d+)/pitstops\.json$'), self.pit_stops),
+            (re.compile(r'^/(\d{4})/(\d+)/laps/(\d+)\.json$'), self.single_lap),
+            (re.compile(r'^/(\d{4})/(\d+)/laps\.json$'), self.all_laps),
+            (re.compile(r'^/(\d{4})/driverStandings\.json$'), self.driver_standings),
+            (re.compile(r'^/(\d{4})/constructorStandings\.json$'), self.constructor_standings),
+            (re.compile(r'^/drivers/([\w-]+)\.json$'), self.driver),
+        ]
+
+    def frame(self, file_name):
+        """Reads a csv file of the Datasets directory as text once and keeps it for later requests."""
+        with self._lock:
+            if file_name not in self._frames:
+                path = os.path.join(self.datasets_dir, file_name)
+                if os.path.exists(path):
+                    self._frames[file_name] = pd.read_csv(path, dtype=str, keep_default_na=False)
+                else:
+                    self._frames[file_name] = pd.DataFrame()
+            return self._frames[file_name]
+
+    def race_rows(self, file_name, year, round_num):
+        """Returns the rows of a csv file that belong to one race."""
+        df = self.frame(file_name)
+        if df.empty:
+            return df
+        return df[(df['season'] == year) & (df['round'] == round_num)]
+
+    def race_header(self, year, round_num):
+        """Returns the race fields Ergast repeats in every race table, or None for an unknown race."""
+        df_schedule = self.race_rows('race_schedule.csv', year, round_num)
+        if df_schedule.empty:
+            return None
+        race = df_schedule.iloc[0]
+        return {
+            'season': race['season'],
+            'round': race['round'],
+            'raceName': race['raceName'],
+            'Circuit': {
+                'circuitId': race['circuitId'],
+                'circuitName': race['circuitName'],
+                'Location': {
+                    'lat': race['location-lat'],
+                    'long': race['location-long'],
+                    'locality': race['location-locality'],
+                    'country': race['location-country']
+                }
+            },
+            'date': race['date'],
+            'time': race['time']
+        }
+
+    def season_schedule(self, query, year):
+        df_schedule = self.frame('race_schedule.csv')
+        races = [self.race_header(year, race_round) for race_round in df_schedule.loc[df_schedule['season'] == year, 'round']]
+        return self.page(query, races, lambda page: {'RaceTable': {'season': year, 'Races': page}})
+
+    def race_results(self, query, year, round_num):
+        results = []
+        for _, row in self.race_rows('race_results.csv', year, round_num).iterrows():
+            result = {
+                'position': row['position'],
+                'points': row['points'],
+                'Driver': {'driverId': row['driverId']},
+                'Constructor': {'constructorId': row['constructorId']},
+                'grid': row['grid'],
+                'status': row['status']
+            }
+            if row['time-ms']:
+                result['Time'] = {'millis': row['time-ms'], 'time': row['time-hrmins']}
+            if row['Max Avg Speed']:
+                result['FastestLap'] = {'AverageSpeed': {'units': row['Max Avg Speed Unit'], 'speed': row['Max Avg Speed']}}
+            results.append(result)
+        return self.race_page(query, year, round_num, 'Results', results)
+
+    def pit_stops(self, query, year, round_num):
+        pit_stops = [
+            {'driverId': row['driverId'], 'lap': row['lap'], 'stop': row['stop'], 'time': row['time'], 'duration': row['duration']}
+            for _, row in self.race_rows('pit_results.csv', year, round_num).iterrows()
+        ]
+        return self.race_page(query, year, round_num, 'PitStops', pit_stops)
+
+    def lap_timings(self, year, round_num):
+        """Returns the (lap, timing) pairs of a race in lap order, keeping them for the race's later requests."""
+        if (year, round_num) not in self._lap_timings:
+            df_laps = self.race_rows(f'lap_times_{year}.csv', year, round_num)
+            self._lap_timings[(year, round_num)] = [
+                (lap, {'driverId': driver_id, 'position': position, 'time': time})
+                for lap, driver_id, position, time in zip(df_laps['lap'], df_laps['driverId'], df_laps['position'], df_laps['time'])
+            ]
+        return self._lap_timings[(year, round_num)]
+
+    def single_lap(self, query, year, round_num, lap_number):
+        timings = [timing for lap, timing in self.lap_timings(year, round_num) if lap == lap_number]
+        return self.race_page(query, year, round_num, 'Laps', timings, group_laps=lambda page: [{'number': lap_number, 'Timings': page}])
+
+    def all_laps(self, query, year, round_num):
+        lap_timings = self.lap_timings(year, round_num)
+
+        def group_laps(page):
+            laps = []
+            for lap, timing in page:
+                if not laps or laps[-1]['number'] != lap:
+                    laps.append({'number': lap, 'Timings': []})
+                laps[-1]['Timings'].append(timing)
+            return laps
+
+        return self.race_page(query, year, round_num, 'Laps', lap_timings, group_laps=group_laps)
+
+    def driver_standings(self, query, year):
+        standings = []
+        for _, row in self.frame('driver_standings.csv').query('season == @year').iterrows():
+            given_name, _, family_name = row['driverName'].partition(' ')
+            standings.append({
+                'position': row['position'],
+                'points': row['points'],
+                'wins': row['wins'],
+                'Driver': {'driverId': row['driverId'], 'givenName': given_name, 'familyName': family_name},
+                'Constructors': [{'constructorId': row['constructorId'], 'name': row['constructorName']}]
+            })
+        return self.standings_page(query, year, 'DriverStandings', standings)
+
+    def constructor_standings(self, query, year):
+        standings = [
+            {
+                'position': row['position'],
+                'points': row['points'],
+                'wins': row['wins'],
+                'Constructor': {'constructorId': row['constructorId'], 'name': row['constructorName'], 'nationality': row['nationality']}
+            }
+            for _, row in self.frame('constructor_standings.csv').query('season == @year').iterrows()
+        ]
+        return self.standings_page(query, year, 'ConstructorStandings', standings)
+
+    def driver(self, query, driver_id):
+        df_drivers = self.frame('driver_info.csv')
+        drivers = [
+            {column: value for column, value in row.items() if value}
+            for _, row in df_drivers[df_drivers['driverId'] == driver_id].iterrows()
+        ]
+        return self.page(query, drivers, lambda page: {'DriverTable': {'driverId': driver_id, 'Drivers': page}})
+
+    def race_page(self, query, year, round_num, field, rows, group_laps=None):
+        """Pages the rows of a race table, leaving the race list empty when the race has no rows, like Ergast does."""
+        race = self.race_header(year, round_num)
+
+        def wrap(page):
+            if race is None or not page:
+                return {'RaceTable': {'season': year, 'round': round_num, 'Races': []}}
+            return {'RaceTable': {'season': year, 'round': round_num, 'Races': [dict(race, **{field: group_laps(page) if group_laps else page})]}}
+
+        return self.page(query, rows, wrap)
+
+    def standings_page(self, query, year, field, rows):
+        """Pages the rows of a season's final standings."""
+        df_schedule = self.frame('race_schedule.csv')
+        rounds = df_schedule.loc[df_schedule['season'] == year, 'round']
+
+        def wrap(page):
+            if not page:
+                return {'StandingsTable': {'season': year, 'StandingsLists': []}}
+            return {'StandingsTable': {'season': year, 'StandingsLists': [{'season': year, 'round': rounds.iloc[-1], field: page}]}}
+
+        return self.page(query, rows, wrap)
+
+    def page(self, query, rows, wrap):
+        """Applies the limit and offset query parameters and wraps the page in an MRData envelope."""
+        limit = min(int(query.get('limit', [DEFAULT_LIMIT])[0]), MAX_LIMIT)
+        offset = int(query.get('offset', ['0'])[0])
+        mr_data = {'xmlns': '', 'series': 'f1', 'limit': str(limit), 'offset': str(offset), 'total': str(len(rows))}
+        mr_data.update(wrap(rows[offset:offset + limit]))
+        return {'MRData': mr_data}
+
+    def respond(self, url):
+        """Returns the JSON document for a request path, or None when the path is not an Ergast endpoint."""
+        parts = urlsplit(url)
+        path = re.sub(r'^/api/f1', '', parts.path)
+        query = parse_qs(parts.query)
+        with self._lock:
+            self.requests_served += 1
+        for pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                return handler(query, *match.groups())
+        return None
+
+def make_handler(stub):
+    """Builds the request handler class that serves a stub's responses."""
+
+    class ErgastStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately, so send them without waiting for an ACK on keep-alive connections.
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if stub.error_rate and random.random() < stub.error_rate:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            document = stub.respond(self.path)
+            body = json.dumps(document).encode() if document is not None else b'{}'
+            self.send_response(200 if document is not None else 404)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ErgastStubHandler
+
+def serve_ergast_stub(datasets_dir=DATASETS_DIR, host='127.0.0.1', port=0, error_rate=0.0):
+    """Starts an Ergast-compatible server in a background thread and returns the server and its base URL."""
+    stub = ErgastStub(datasets_dir, error_rate)
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    server.stub = stub
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/api/f1'
+
+if __name__ == '__main__':
+    server, base_url = serve_ergast_stub(port=int(os.environ.get('ERGAST_STUB_PORT', '8000')))
+    print(f'Serving the Datasets directory as an Ergast API at {base_url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
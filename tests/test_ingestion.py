@@ -0,0 +1,87 @@
+import os
+import random
+import shutil
+import datetime
+import pandas as pd
+import pytest
+from utils.datasets import DATASETS_DIR
+from utils.ergast_client import ErgastClient
+from utils.ingestion import ingest_new_rounds, load_manifest
+from tests.ergast_stub import serve_ergast_stub
+
+SEASON = 2024
+ROUNDS = 4
+STORED_ROUNDS = 1
+# Oliver Bearman's first race was round 2 of 2024, so ingesting it adds him to driver_info.csv.
+NEW_DRIVER = 'bearman'
+TODAY = datetime.date(2025, 1, 1)
+RACE_FILES = ['race_results.csv', 'pit_results.csv', f'lap_times_{SEASON}.csv']
+CSV_FILES = RACE_FILES + ['race_schedule.csv', 'driver_standings.csv', 'constructor_standings.csv', 'driver_info.csv']
+
+def read_text_table(path):
+    """Reads a dataset file as text, so writing it back reproduces it."""
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+def file_bytes(datasets_dir):
+    """Returns the contents of every csv file of a Datasets directory."""
+    contents = {}
+    for file_name in CSV_FILES:
+        with open(os.path.join(datasets_dir, file_name), 'rb') as file:
+            contents[file_name] = file.read()
+    return contents
+
+@pytest.fixture
+def source_dir(tmp_path):
+    """A copy of the first rounds of one season of the Datasets directory, served by the Ergast stub."""
+    path = tmp_path / 'source'
+    path.mkdir()
+    for file_name in CSV_FILES:
+        df = read_text_table(os.path.join(DATASETS_DIR, file_name))
+        if 'season' in df:
+            df = df[df['season'] == str(SEASON)]
+        if 'round' in df:
+            df = df[df['round'].astype(int) <= ROUNDS]
+        df.to_csv(path / file_name, index=False)
+    return path
+
+@pytest.fixture
+def stored_dir(tmp_path, source_dir):
+    """The source copy as it was stored before its last rounds were raced."""
+    path = tmp_path / 'stored'
+    shutil.copytree(source_dir, path)
+    for file_name in RACE_FILES:
+        df = read_text_table(path / file_name)
+        df[df['round'].astype(int) <= STORED_ROUNDS].to_csv(path / file_name, index=False)
+    df_drivers = read_text_table(path / 'driver_info.csv')
+    df_drivers[df_drivers['driverId'] != NEW_DRIVER].to_csv(path / 'driver_info.csv', index=False)
+    return path
+
+def test_incremental_ingestion_reproduces_the_datasets(source_dir, stored_dir):
+    # The first request fails with this seed, so the retries are exercised on every run.
+    random.seed(1)
+    server, base_url = serve_ergast_stub(source_dir, error_rate=0.2)
+    try:
+        client = ErgastClient(base_url, rate=0, max_retries=10, backoff=0.01)
+        with open(stored_dir / 'driver_info.csv', 'rb') as file:
+            stored_drivers = file.read()
+
+        fetched = ingest_new_rounds(seasons=[SEASON], datasets_dir=stored_dir, today=TODAY, client=client)
+
+        assert fetched == [(SEASON, round_num) for round_num in range(STORED_ROUNDS + 1, ROUNDS + 1)]
+        assert client.retry_count > 0
+        expected = file_bytes(source_dir)
+        # New drivers are appended after the stored ones rather than in Ergast's order.
+        new_driver_line = next(line for line in expected['driver_info.csv'].splitlines(keepends=True) if line.startswith(NEW_DRIVER.encode() + b','))
+        expected['driver_info.csv'] = stored_drivers + new_driver_line
+        assert file_bytes(stored_dir) == expected
+        assert sorted(load_manifest(stored_dir)) == [(SEASON, round_num) for round_num in range(1, ROUNDS + 1)]
+
+        # Every round is settled now, so a second run fetches nothing and leaves every file untouched.
+        contents = file_bytes(stored_dir)
+        modified_at = {path.name: path.stat().st_mtime_ns for path in stored_dir.iterdir()}
+        assert ingest_new_rounds(seasons=[SEASON], datasets_dir=stored_dir, today=TODAY, client=client) == []
+        assert file_bytes(stored_dir) == contents
+        assert {path.name: path.stat().st_mtime_ns for path in stored_dir.iterdir()} == modified_at
+    finally:
+        server.shutdown()
+        server.server_close()
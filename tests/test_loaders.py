@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.loaders import convert_times_to_seconds
+
+@pytest.mark.parametrize('time, seconds', [
+    ('1:23.456', 83.456),
+    ('0:59.999', 59.999),
+    ('12:05.1', 725.1),
+    ('1:01:23.400', 3683.4),
+    ('83.5', 83.5),
+    (' 1:23.456 ', 83.456),
+])
+def test_convert_times_to_seconds_parses_lap_times(time, seconds):
+    assert convert_times_to_seconds(pd.Series([time]))[0] == pytest.approx(seconds)
+
+@pytest.mark.parametrize('time', ['', '   ', None, np.nan, 'abc', '1:', ':23.4', '1:2:3:4', '1.5:30', '.5', '1.', '-1:30', '1:23.4.5', 'inf', 'nan'])
+def test_convert_times_to_seconds_returns_nan_for_malformed_values(time):
+    assert np.isnan(convert_times_to_seconds(pd.Series([time]))[0])
+
+def test_convert_times_to_seconds_keeps_the_index():
+    times = pd.Series(['1:30.000', 'bad', '2:00.500'], index=[7, 3, 5])
+    seconds = convert_times_to_seconds(times)
+    pd.testing.assert_index_equal(seconds.index, times.index)
+    assert seconds.tolist()[::2] == [90.0, 120.5]
+    assert np.isnan(seconds[3])
+
+def test_convert_times_to_seconds_of_an_empty_column():
+    seconds = convert_times_to_seconds(pd.Series([], dtype=object))
+    assert seconds.empty
+    assert seconds.dtype == float
@@ -0,0 +1,272 @@
+"""Aggregate tables persisted under Datasets/aggregates.
+
+They hold the per-season totals behind the standings and podium charts, race results joined with
+the circuit and the driver's age, pit stops joined with the constructor and the circuit and analysed
+against the lap times, the stints, the teammate head-to-heads and the imputed laps of retired drivers.
+A table is rebuilt when one of its source files is newer. The pit stop and stint tables are indexed by
+season and round, so a race is looked up instead of filtered.
+"""
+import os
+import numpy as np
+import pandas as pd
+from utils.datasets import DATASETS_DIR, load_dataset, resolve_dataset_file
+from utils.loaders import read_race_results, read_driver_standings, read_constructor_standings, read_driver_info, read_encoded_table, read_lap_times, lap_times_file_names
+from utils.pit_stop_analytics import reconstruct_stints, analyse_pit_stops
+from utils.lap_time_imputation import impute_lap_times_mean_median, impute_lap_times_least_squares
+from utils.vocabulary import apply_vocabulary
+
+AGGREGATES_DIR = os.path.join(DATASETS_DIR, 'aggregates')
+
+PODIUM_COLUMNS = ['podiums_1st', 'podiums_2nd', 'podiums_3rd']
+
+def count_podiums(df_race_results, key):
+    """Counts 1st, 2nd and 3rd place finishes per entity and season."""
+    df_podiums = df_race_results[df_race_results['position'].isin([1, 2, 3])]
+    df_podium_counts = df_podiums.groupby([key, 'season', 'position'], observed=True).size().unstack('position')
+    df_podium_counts = df_podium_counts.reindex(columns=[1, 2, 3], fill_value=0).fillna(0).astype(int)
+    df_podium_counts.columns = PODIUM_COLUMNS
+    return df_podium_counts.reset_index()
+
+def fill_missing_totals(df_totals):
+    """Sets the totals missing from one of the merged sources to zero, keeping the counts as integers."""
+    df_totals['points'] = df_totals['points'].fillna(0)
+    for column in ['wins'] + PODIUM_COLUMNS:
+        df_totals[column] = df_totals[column].fillna(0).astype(int)
+    return df_totals
+
+def add_cumulative_totals(df, key, columns):
+    """Fills in every season for every entity and adds running totals, so season ranges are a difference of two rows."""
+    df[key] = df[key].astype(str)
+    seasons = sorted(df['season'].unique())
+    full_index = pd.MultiIndex.from_product([sorted(df[key].unique()), seasons], names=[key, 'season'])
+    df = df.set_index([key, 'season']).reindex(full_index, fill_value=0)
+    for column in columns:
+        df[f'cumulative_{column}'] = df.groupby(level=key)[column].cumsum()
+    return df.reset_index()
+
+def build_driver_season_totals(driver_standings_path, race_results_path):
+    """Aggregates points, wins and podiums per driver and season."""
+    df_driver_standings = read_driver_standings(driver_standings_path)
+    df_race_results = read_race_results(race_results_path)
+
+    df_totals = df_driver_standings.groupby(['driverId', 'season'], observed=True)[['points', 'wins']].sum().reset_index()
+    df_totals = df_totals.merge(count_podiums(df_race_results, 'driverId'), on=['driverId', 'season'], how='outer')
+    df_totals = fill_missing_totals(df_totals)
+    return add_cumulative_totals(df_totals, 'driverId', ['points', 'wins'] + PODIUM_COLUMNS)
+
+def build_constructor_season_totals(constructor_standings_path, race_results_path):
+    """Aggregates points, wins, podiums and share of the season's wins per constructor and season."""
+    df_constructor_standings = read_constructor_standings(constructor_standings_path)
+    df_race_results = read_race_results(race_results_path)
+
+    discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
+    df_constructor_standings = df_constructor_standings[~df_constructor_standings['constructorId'].isin(discontinued_teams)]
+
+    df_totals = df_constructor_standings.groupby(['constructorId', 'season'], observed=True)[['points', 'wins']].sum().reset_index()
+    df_totals = df_totals.merge(count_podiums(df_race_results, 'constructorId'), on=['constructorId', 'season'], how='outer')
+    df_totals = fill_missing_totals(df_totals)
+    df_totals = add_cumulative_totals(df_totals, 'constructorId', ['points', 'wins'] + PODIUM_COLUMNS)
+
+    df_totals['total_wins_per_year'] = df_totals.groupby('season')['wins'].transform('sum')
+    df_totals['win_percentage'] = (df_totals['wins'] / df_totals['total_wins_per_year']) * 100
+    return df_totals
+
+def build_race_facts(race_results_path, driver_info_path, race_schedule_path):
+    """Joins every race result with its circuit and the driver's date of birth, adding the driver's age at the race."""
+    df_race_results = read_race_results(race_results_path)
+    df_driver_info = read_driver_info(driver_info_path)
+    df_race_schedule = read_encoded_table(race_schedule_path)
+
+    df_facts = df_race_results.merge(df_race_schedule[['season', 'round', 'circuitId', 'circuitName']], on=['season', 'round'], how='left')
+    df_facts = df_facts.merge(df_driver_info[['driverId', 'dateOfBirth']], on='driverId', how='left')
+    df_facts['date'] = pd.to_datetime(df_facts['date'])
+    df_facts['age_at_race'] = (df_facts['date'] - df_facts['dateOfBirth']).dt.days / 365
+    return df_facts
+
+def build_pit_stop_facts(pit_results_path, race_results_path, race_schedule_path):
+    """Joins every pit stop with the driver's constructor and the race's circuit."""
+    df_pit_results = read_encoded_table(pit_results_path)
+    df_race_results = read_race_results(race_results_path)
+    df_race_schedule = read_encoded_table(race_schedule_path)
+
+    df_facts = df_pit_results.merge(df_race_results[['season', 'round', 'driverId', 'constructorId']], on=['season', 'round', 'driverId'], how='left')
+    return df_facts.merge(df_race_schedule[['season', 'round', 'circuitId', 'circuitName']], on=['season', 'round'], how='left')
+
+def build_teammate_head_to_head(race_results_path):
+    """Counts, for every pair of teammates in every season, the shared races and how often each finished and started ahead.
+
+    Drivers are paired with everyone who drove for the same constructor in the same race, so mid-season
+    swaps give one pair per line-up. A tie (both starting from the pit lane) counts for neither driver.
+    """
+    df_race_results = read_race_results(race_results_path)
+    df_entries = df_race_results[['season', 'round', 'constructorId', 'driverId', 'position', 'grid']]
+    # Order drivers by their first race for the team, the order the head-to-head chart lists them in.
+    df_entries['first_entry'] = np.arange(len(df_entries))
+    df_entries['first_entry'] = df_entries.groupby(['season', 'constructorId', 'driverId'], observed=True)['first_entry'].transform('min')
+
+    df_pairs = df_entries.merge(df_entries, on=['season', 'round', 'constructorId'], suffixes=('', '_teammate'))
+    df_pairs = df_pairs[df_pairs['driverId'] != df_pairs['driverId_teammate']]
+    df_pairs['race_win'] = df_pairs['position'] < df_pairs['position_teammate']
+    df_pairs['grid_win'] = df_pairs['grid'] < df_pairs['grid_teammate']
+
+    df_head_to_head = df_pairs.groupby(['season', 'constructorId', 'driverId', 'driverId_teammate'], observed=True).agg(
+        races=('round', 'size'),
+        race_wins=('race_win', 'sum'),
+        grid_wins=('grid_win', 'sum'),
+        first_entry=('first_entry', 'first'),
+        teammate_first_entry=('first_entry_teammate', 'first'),
+    ).reset_index()
+    df_head_to_head = df_head_to_head.rename(columns={'driverId_teammate': 'teammateId'})
+    df_head_to_head = df_head_to_head.sort_values(['season', 'constructorId', 'first_entry', 'teammate_first_entry'], ignore_index=True)
+    return df_head_to_head.drop(columns=['first_entry', 'teammate_first_entry'])
+
+def build_pit_stop_table(pit_results_path, race_results_path, race_schedule_path, *lap_times_paths):
+    """Joins every pit stop with its constructor and circuit and adds the lap-time analysis of the stop."""
+    df_pit_stops = build_pit_stop_facts(pit_results_path, race_results_path, race_schedule_path)
+    return analyse_pit_stops(read_lap_times(*lap_times_paths), df_pit_stops)
+
+def build_stint_table(pit_results_path, *lap_times_paths):
+    """Reconstructs the stints of every driver in every race from the pit laps and lap times."""
+    return reconstruct_stints(read_lap_times(*lap_times_paths), read_encoded_table(pit_results_path))
+
+def build_imputed_lap_times(race_results_path, race_schedule_path, pit_results_path, *lap_times_paths):
+    """Imputes the laps missed by every retired driver with the historical mean and median and the race's lap trends, one row per lap and method."""
+    df_lap_times = read_lap_times(*lap_times_paths)
+    # The discontinued teams' retirements are imputed too, so the raw results are read.
+    df_race_results = read_encoded_table(race_results_path)
+    df_race_schedule = read_encoded_table(race_schedule_path)
+    return pd.concat([
+        impute_lap_times_mean_median(df_lap_times, df_race_results, df_race_schedule, 'mean'),
+        impute_lap_times_mean_median(df_lap_times, df_race_results, df_race_schedule, 'median'),
+        impute_lap_times_least_squares(df_lap_times, df_race_results, df_race_schedule, df_pit_stops=read_encoded_table(pit_results_path)),
+    ], ignore_index=True)
+
+def read_fact_table(path):
+    """Reads a persisted fact table back with the column types it was built with."""
+    df = pd.read_csv(path, float_precision='round_trip', dtype={'season': 'int16', 'round': 'int16'})
+    for column in ['date', 'dateOfBirth']:
+        if column in df:
+            df[column] = pd.to_datetime(df[column])
+    # Flags with no value for some rows come back as objects, and the builders leave those rows missing.
+    for column in ['neutralized', 'undercut_success']:
+        if column in df and df[column].dtype == object:
+            df[column] = df[column].astype('boolean')
+    return apply_vocabulary(df)
+
+# Each table lists its source files, its builder and the reader of its persisted copy. Tables built from
+# the lap times list their files through a function, so seasons added to the Datasets directory are picked up.
+AGGREGATE_TABLES = {
+    'driver_season_totals': (['driver_standings.csv', 'race_results.csv'], build_driver_season_totals, None),
+    'constructor_season_totals': (['constructor_standings.csv', 'race_results.csv'], build_constructor_season_totals, None),
+    'race_facts': (['race_results.csv', 'driver_info.csv', 'race_schedule.csv'], build_race_facts, read_fact_table),
+    'pit_stops': (lambda: ['pit_results.csv', 'race_results.csv', 'race_schedule.csv'] + lap_times_file_names(), build_pit_stop_table, read_fact_table),
+    'pit_stints': (lambda: ['pit_results.csv'] + lap_times_file_names(), build_stint_table, read_fact_table),
+    'teammate_head_to_head': (['race_results.csv'], build_teammate_head_to_head, read_fact_table),
+    'imputed_lap_times': (lambda: ['race_results.csv', 'race_schedule.csv', 'pit_results.csv'] + lap_times_file_names(), build_imputed_lap_times, read_fact_table),
+}
+
+def aggregate_file_names(name):
+    """Returns the source files of an aggregate table."""
+    file_names = AGGREGATE_TABLES[name][0]
+    return file_names() if callable(file_names) else file_names
+
+def aggregate_path(name):
+    """Returns the path of a persisted aggregate table."""
+    return os.path.join(AGGREGATES_DIR, f'{name}.csv')
+
+def persist_aggregate(name, df):
+    """Writes an aggregate table next to the datasets, skipping it when the directory is read-only."""
+    try:
+        os.makedirs(AGGREGATES_DIR, exist_ok=True)
+        df.to_csv(aggregate_path(name) + '.tmp', index=False)
+        os.replace(aggregate_path(name) + '.tmp', aggregate_path(name))
+    except OSError:
+        pass
+
+def load_aggregate(name):
+    """Loads a persisted aggregate table, rebuilding and persisting it when one of its source files is newer."""
+    _, build, read = AGGREGATE_TABLES[name]
+
+    def read_or_build(*file_paths):
+        path = aggregate_path(name)
+        if os.path.exists(path) and all(os.path.getmtime(path) >= os.path.getmtime(file_path) for file_path in file_paths):
+            return read(path) if read else pd.read_csv(path, float_precision='round_trip')
+        df = build(*file_paths)
+        persist_aggregate(name, df)
+        return df
+
+    return load_dataset(f'aggregate_{name}', aggregate_file_names(name), read_or_build)
+
+def load_driver_season_totals():
+    """Loads the per-driver, per-season totals with running totals over the seasons."""
+    return load_aggregate('driver_season_totals')
+
+def load_constructor_season_totals():
+    """Loads the per-constructor, per-season totals with running totals over the seasons."""
+    return load_aggregate('constructor_season_totals')
+
+def load_race_facts():
+    """Loads the race results joined with circuits and driver ages, one row per season, round and driver."""
+    return load_aggregate('race_facts')
+
+def load_indexed_aggregate(name, index_columns):
+    """Loads an aggregate table indexed and sorted on the given columns, so selecting a slice is an index lookup."""
+    return load_dataset(
+        f'aggregate_{name}_by_' + '_'.join(index_columns),
+        aggregate_file_names(name),
+        lambda *file_paths: load_aggregate(name).set_index(index_columns, drop=False).sort_index()
+    )
+
+def query_race_table(name, season, round_num=None):
+    """Returns the rows of an aggregate table for a season, or for one race of it."""
+    df = load_indexed_aggregate(name, ['season', 'round'])
+    key = season if round_num is None else (season, round_num)
+    try:
+        df_rows = df.loc[[key]] if round_num is None else df.loc[key:key]
+    except KeyError:
+        df_rows = df.iloc[:0]
+    return df_rows.reset_index(drop=True)
+
+def query_pit_stops(season, round_num=None):
+    """Returns the analysed pit stops of a season, or of one race: constructor, circuit, in- and out-lap deltas and undercut gains."""
+    return query_race_table('pit_stops', season, round_num)
+
+def query_pit_stints(season, round_num=None):
+    """Returns the stints driven in a season, or in one race."""
+    return query_race_table('pit_stints', season, round_num)
+
+def query_imputed_lap_times(season, round_num=None, method='median'):
+    """Returns the imputed laps of the drivers who retired in a season, or in one race, for one imputation method."""
+    df_imputed = query_race_table('imputed_lap_times', season, round_num)
+    return df_imputed[df_imputed['method'] == method].reset_index(drop=True)
+
+def load_teammate_head_to_head():
+    """Loads the race and grid head-to-head counts of every teammate pair in every season."""
+    return load_aggregate('teammate_head_to_head')
+
+def season_range_totals(df_totals, key, season_range=None):
+    """Returns the totals of each entity over an inclusive season range from the difference of two running totals."""
+    cumulative_columns = [column for column in df_totals.columns if column.startswith('cumulative_')]
+    seasons = df_totals['season']
+
+    if season_range is None:
+        season_range = (seasons.min(), seasons.max())
+    start_year, end_year = season_range
+
+    def totals_up_to(year):
+        earlier_seasons = seasons[seasons <= year]
+        if earlier_seasons.empty:
+            return pd.DataFrame(0, index=pd.Index(sorted(df_totals[key].unique()), name=key), columns=cumulative_columns)
+        return df_totals[seasons == earlier_seasons.max()].set_index(key)[cumulative_columns]
+
+    df_range = totals_up_to(end_year) - totals_up_to(start_year - 1)
+    df_range.columns = [column.removeprefix('cumulative_') for column in cumulative_columns]
+    return df_range.sort_index().reset_index()
+
+def build_aggregate_tables():
+    """Rebuilds and persists every aggregate table."""
+    for name, (_, build, _) in AGGREGATE_TABLES.items():
+        persist_aggregate(name, build(*[resolve_dataset_file(file_name) for file_name in aggregate_file_names(name)]))
+
+if __name__ == '__main__':
+    build_aggregate_tables()
@@ -0,0 +1,176 @@
+"""ARIMA imputation of the laps missed by retired drivers, which needs statsmodels.
+
+The fits are spread over a pool of worker processes. Their parameters are cached in
+Datasets/aggregates/arima_params.json by driver, circuit and a hash of the lap history, so a re-run only
+fits the retirements whose history changed. The time of every fit is reported at the end.
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.aggregates import AGGREGATES_DIR, aggregate_path
+from utils.loaders import load_lap_times_data, load_race_schedule_data, read_encoded_table
+from utils.datasets import resolve_dataset_file
+from utils.lap_time_imputation import RACE_KEY, find_retirements, find_missing_laps
+
+ARIMA_ORDER = (10, 1, 0)
+ARIMA_CACHE_FILE = os.path.join(AGGREGATES_DIR, 'arima_params.json')
+
+def arima_histories(df_retirements, df_lap_times, df_race_schedule, lower_percentile=1, upper_percentile=99):
+    """Returns the lap times each retirement's model is fitted on, keyed by the index of the retirement.
+
+    A history is the driver's lap times at the circuit in earlier seasons followed by the laps completed
+    before retiring, in race order, without the laps outside its percentiles.
+    """
+    df_circuits = df_race_schedule[['season', 'round', 'circuitId']]
+    df_history = df_lap_times[RACE_KEY + ['lap', 'lap_time_seconds']].merge(df_circuits, on=['season', 'round'])
+    df_history = df_history.rename(columns={'season': 'history_season', 'round': 'history_round'})
+
+    df_targets = df_retirements[RACE_KEY].merge(df_circuits, on=['season', 'round'])
+    df_targets['retirement'] = df_targets.index
+    df_history = df_targets[['retirement', 'season', 'round', 'driverId', 'circuitId']].merge(df_history, on=['driverId', 'circuitId'])
+    # A circuit can host two races in a season, so only the retirement's own race is taken from its season.
+    own_race = (df_history['history_season'] == df_history['season']) & (df_history['history_round'] == df_history['round'])
+    df_history = df_history[(df_history['history_season'] < df_history['season']) | own_race]
+
+    lap_times = df_history.groupby('retirement')['lap_time_seconds']
+    lower_limit = lap_times.transform('quantile', lower_percentile / 100)
+    upper_limit = lap_times.transform('quantile', upper_percentile / 100)
+    df_history = df_history[df_history['lap_time_seconds'].between(lower_limit, upper_limit)]
+
+    df_history = df_history.sort_values(['retirement', 'history_season', 'history_round', 'lap'])
+    return {
+        retirement: df_group['lap_time_seconds'].to_numpy(dtype='float64')
+        for retirement, df_group in df_history.groupby('retirement')
+    }
+
+def history_key(driver_id, circuit_id, history, order):
+    """Returns the cache key of a fit: the driver, the circuit and a hash of the model order and the history."""
+    digest = hashlib.sha1(repr(order).encode() + history.tobytes()).hexdigest()
+    return f'{driver_id}|{circuit_id}|{digest}'
+
+def load_arima_cache(cache_file=ARIMA_CACHE_FILE):
+    """Reads the cached ARIMA parameters, keyed by history_key."""
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file) as file:
+        return json.load(file)
+
+def save_arima_cache(cache, cache_file=ARIMA_CACHE_FILE):
+    """Writes the cached ARIMA parameters, replacing the previous file only once the new one is complete."""
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = f'{cache_file}.tmp'
+    with open(tmp_file, 'w') as file:
+        json.dump(cache, file)
+    os.replace(tmp_file, cache_file)
+
+def fit_arima(task):
+    """Forecasts the missed laps of one retirement, fitting the model unless its parameters are given.
+
+    Runs in a worker process, so statsmodels is only imported there. Returns the retirement, the
+    forecast, the parameters, the seconds spent and whether the parameters came from the cache. The
+    forecast and parameters are None when the model cannot be fitted to the history.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    retirement, history, steps, order, params = task
+    started_at = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            model = ARIMA(history, order=order)
+            if params is None:
+                model_fit = model.fit()
+            else:
+                model_fit = model.filter(np.asarray(params))
+            forecast = model_fit.forecast(steps=steps)
+            params = list(map(float, model_fit.params))
+        except (np.linalg.LinAlgError, ValueError):
+            return retirement, None, None, time.perf_counter() - started_at, False
+    return retirement, forecast, params, time.perf_counter() - started_at, task[4] is not None
+
+def run_arima_imputation(df_lap_times, df_race_results, df_race_schedule, order=ARIMA_ORDER, workers=None,
+                         chunk_size=4, cache_file=ARIMA_CACHE_FILE):
+    """Imputes the laps missed by every retired driver with ARIMA forecasts fitted over a pool of processes.
+
+    Fits are sent to the workers in chunks of chunk_size. The fitted parameters are cached on disk
+    by driver, circuit and history, so a re-run only fits the retirements whose history changed and
+    filters the others with their cached parameters. Returns the imputed laps and one row of timing
+    per retirement; retirements whose model failed to fit are not imputed.
+    """
+    df_retirements = find_retirements(df_lap_times, df_race_results)
+    df_retirements = df_retirements.merge(df_race_schedule[['season', 'round', 'circuitId']], on=['season', 'round'])
+    histories = arima_histories(df_retirements, df_lap_times, df_race_schedule)
+    # ARIMA needs more observations than parameters to fit.
+    histories = {retirement: history for retirement, history in histories.items() if len(history) > 2 * sum(order)}
+
+    cache = load_arima_cache(cache_file)
+    keys = {
+        retirement: history_key(df_retirements.at[retirement, 'driverId'], df_retirements.at[retirement, 'circuitId'], history, order)
+        for retirement, history in histories.items()
+    }
+    df_imputed = find_missing_laps(df_retirements, df_lap_times)
+    steps = df_imputed.groupby('retirement').size()
+    tasks = [
+        (retirement, history, int(steps[retirement]), order, cache.get(keys[retirement]))
+        for retirement, history in histories.items()
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fit_arima, tasks, chunksize=chunk_size))
+
+    forecasts = {}
+    timings = []
+    for retirement, forecast, params, seconds, cached in results:
+        if forecast is not None:
+            forecasts[retirement] = forecast
+            cache[keys[retirement]] = params
+        timings.append((retirement, seconds, cached, forecast is None))
+    save_arima_cache(cache, cache_file)
+
+    df_imputed = df_imputed[df_imputed['retirement'].isin(forecasts)].reset_index(drop=True)
+    # Missing laps are listed in lap order, so each retirement's forecast steps line up with them.
+    df_imputed['lap_time_seconds'] = np.concatenate(
+        [forecasts[retirement] for retirement in df_imputed['retirement'].unique()] or [[]]
+    ).round(3)
+    df_imputed['method'] = 'arima'
+
+    df_timings = pd.DataFrame(timings, columns=['retirement', 'fit_seconds', 'cached', 'failed'])
+    df_timings = df_retirements[RACE_KEY + ['circuitId']].join(df_timings.set_index('retirement'), how='inner')
+    df_timings['history_laps'] = df_timings.index.map(lambda retirement: len(histories[retirement]))
+    return df_imputed.drop(columns='retirement').reset_index(drop=True), df_timings.reset_index(drop=True)
+
+def impute_lap_times_arima(df_lap_times, df_race_results, df_race_schedule, order=ARIMA_ORDER, workers=None, cache_file=ARIMA_CACHE_FILE):
+    """Imputes the laps every retired driver did not complete with ARIMA forecasts of their lap times at the circuit."""
+    df_imputed, _ = run_arima_imputation(df_lap_times, df_race_results, df_race_schedule, order, workers, cache_file=cache_file)
+    return df_imputed
+
+def main():
+    parser = argparse.ArgumentParser(description='Impute the laps missed by every retired driver with ARIMA forecasts.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=4, help='Fits sent to a worker at a time')
+    parser.add_argument('--output', default=aggregate_path('imputed_lap_times_arima'), help='Where to write the imputed laps')
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    df_race_results = read_encoded_table(resolve_dataset_file('race_results.csv'))
+    df_imputed, df_timings = run_arima_imputation(
+        load_lap_times_data(), df_race_results, load_race_schedule_data(), workers=args.workers, chunk_size=args.chunk_size
+    )
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    df_imputed.to_csv(args.output, index=False)
+
+    df_fitted = df_timings[~df_timings['cached'] & ~df_timings['failed']]
+    print(f'Imputed {len(df_imputed)} laps of {len(df_timings)} retirements in {time.perf_counter() - started_at:.1f}s')
+    print(f'Fitted {len(df_fitted)} models ({df_fitted["fit_seconds"].sum():.1f}s of fitting, '
+          f'{df_fitted["fit_seconds"].mean() if len(df_fitted) else 0:.2f}s per fit), '
+          f'reused {df_timings["cached"].sum()} cached fits, {df_timings["failed"].sum()} failed')
+    print(df_timings.sort_values('fit_seconds', ascending=False).head(10).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Typed Parquet copies of the csv files under Datasets/columnar.
+
+Driver and constructor ids are stored as categoricals, season, round and lap as integers, and lap
+times also in seconds. The loaders read a copy while it is newer than its csv file.
+"""
+import os
+import pandas as pd
+from utils.datasets import DATASETS_DIR, COLUMNAR_DIR, dataset_path, columnar_path, dataset_dtypes
+from utils.loaders import convert_times_to_seconds
+
+def convert_csv_to_columnar(file_name):
+    """Writes the typed Parquet copy of a CSV file from the Datasets directory."""
+    df = pd.read_csv(dataset_path(file_name), dtype=dataset_dtypes(file_name))
+
+    if file_name.startswith('lap_times_'):
+        df['lap_time_seconds'] = convert_times_to_seconds(df['time']).astype('float32')
+
+    os.makedirs(COLUMNAR_DIR, exist_ok=True)
+    output_path = columnar_path(file_name)
+    temp_path = output_path + '.tmp'
+    if file_name.startswith('lap_times_'):
+        write_partitioned_parquet(df, temp_path, 'round')
+    else:
+        df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, output_path)
+    return output_path
+
+def write_partitioned_parquet(df, path, column):
+    """Writes a Parquet file with one row group per value of column, so readers can filter on it cheaply."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.sort_values(column, kind='stable')
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for _, group in df.groupby(column, sort=True, observed=True):
+            writer.write_table(pa.Table.from_pandas(group, schema=schema, preserve_index=False))
+
+def build_columnar_store():
+    """Converts every CSV file in the Datasets directory to its columnar form."""
+    output_paths = []
+    for file_name in sorted(os.listdir(DATASETS_DIR)):
+        if file_name.endswith('.csv'):
+            output_paths.append(convert_csv_to_columnar(file_name))
+    return output_paths
+
+if __name__ == '__main__':
+    for path in build_columnar_store():
+        print(f'Wrote {path}')
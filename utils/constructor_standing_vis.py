@@ -1,21 +1,17 @@
 import plotly.express as px
-import pandas as pd
-import os
-
-def load_constructor_standings_data():
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'constructor_standings.csv')
-    df = pd.read_csv(file_path)
-
-    df['constructorId'] = df['constructorId'].replace({'alphatauri': 'rb'})
-    df['constructorName'] = df['constructorName'].replace({'AlphaTauri': 'RB F1 Team'})
-    
-    return df
-
-def plot_constructor_ranking_vs_year(start_year=2017, end_year=2024):
-    """Creates a line chart for Constructor Ranking vs Year, excluding discontinued teams, within a specified year range."""
-    
+from utils.loaders import load_constructor_standings_data
+from utils.aggregates import load_constructor_season_totals, season_range_totals
+from utils.figure_cache import cached_figure
+from utils.frame_cache import cached_frame
+
+@cached_frame
+def compute_constructor_ranking_vs_year(start_year=None, end_year=None):
+    """Returns the final ranking of every constructor in each season of a year range (every season by default), excluding discontinued teams."""
     df_constructor_standings = load_constructor_standings_data()
 
+    start_year = int(df_constructor_standings['season'].min()) if start_year is None else start_year
+    end_year = int(df_constructor_standings['season'].max()) if end_year is None else end_year
+
     discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
     df_constructor_standings = df_constructor_standings[~df_constructor_standings['constructorId'].isin(discontinued_teams)]
 
@@ -27,6 +23,10 @@ def plot_constructor_ranking_vs_year(start_year=2017, end_year=2024):
     df_constructor_standings['season'] = df_constructor_standings['season'].astype(int)
     df_constructor_standings['position'] = df_constructor_standings['position'].astype(int)
 
+    return df_constructor_standings[['season', 'constructorId', 'position']]
+
+def render_constructor_ranking_vs_year(df_constructor_standings, start_year, end_year):
+    """Draws the line chart of constructor final ranking vs year from compute_constructor_ranking_vs_year."""
     brand_colors = {
         'mercedes': '#565F64',
         'ferrari': '#ff0000',
@@ -69,11 +69,22 @@ def plot_constructor_ranking_vs_year(start_year=2017, end_year=2024):
 
     return fig
 
-def plot_constructor_wins_vs_year(start_year=2017, end_year=2024):
-    """Creates a line chart for Number of Wins vs Year within a specified range."""
-    
+@cached_figure
+def plot_constructor_ranking_vs_year(start_year=None, end_year=None):
+    """Creates a line chart for Constructor Ranking vs Year, excluding discontinued teams, within a specified year range (every season by default)."""
+    df_constructor_standings = compute_constructor_ranking_vs_year(start_year, end_year)
+    start_year = int(df_constructor_standings['season'].min()) if start_year is None else start_year
+    end_year = int(df_constructor_standings['season'].max()) if end_year is None else end_year
+    return render_constructor_ranking_vs_year(df_constructor_standings, start_year, end_year)
+
+@cached_frame
+def compute_constructor_wins_vs_year(start_year=None, end_year=None):
+    """Returns the wins of every constructor in each season of a year range (every season by default), excluding discontinued teams."""
     df_constructor_standings = load_constructor_standings_data()
 
+    start_year = int(df_constructor_standings['season'].min()) if start_year is None else start_year
+    end_year = int(df_constructor_standings['season'].max()) if end_year is None else end_year
+
     discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
     df_constructor_standings = df_constructor_standings[~df_constructor_standings['constructorId'].isin(discontinued_teams)]
 
@@ -83,6 +94,10 @@ def plot_constructor_wins_vs_year(start_year=2017, end_year=2024):
     df_filtered = df_constructor_standings[(df_constructor_standings['season'] >= start_year) & 
                                            (df_constructor_standings['season'] <= end_year)]
 
+    return df_filtered[['season', 'constructorId', 'wins']]
+
+def render_constructor_wins_vs_year(df_filtered, start_year, end_year):
+    """Draws the line chart of constructor wins vs year from compute_constructor_wins_vs_year."""
     brand_colors = {
         'mercedes': '#565F64',
         'ferrari': '#ff0000',
@@ -123,11 +138,22 @@ def plot_constructor_wins_vs_year(start_year=2017, end_year=2024):
 
     return fig
 
-def plot_constructor_points_vs_year(start_year=2017, end_year=2024):
-    """Creates a line chart for Points vs Year for each constructor within a specified range."""
-    
+@cached_figure
+def plot_constructor_wins_vs_year(start_year=None, end_year=None):
+    """Creates a line chart for Number of Wins vs Year within a specified range (every season by default)."""
+    df_filtered = compute_constructor_wins_vs_year(start_year, end_year)
+    start_year = int(df_filtered['season'].min()) if start_year is None else start_year
+    end_year = int(df_filtered['season'].max()) if end_year is None else end_year
+    return render_constructor_wins_vs_year(df_filtered, start_year, end_year)
+
+@cached_frame
+def compute_constructor_points_vs_year(start_year=None, end_year=None):
+    """Returns the points of every constructor in each season of a year range (every season by default), excluding discontinued teams."""
     df_constructor_standings = load_constructor_standings_data()
 
+    start_year = int(df_constructor_standings['season'].min()) if start_year is None else start_year
+    end_year = int(df_constructor_standings['season'].max()) if end_year is None else end_year
+
     discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
     df_constructor_standings = df_constructor_standings[~df_constructor_standings['constructorId'].isin(discontinued_teams)]
 
@@ -137,6 +163,10 @@ def plot_constructor_points_vs_year(start_year=2017, end_year=2024):
     df_filtered = df_constructor_standings[(df_constructor_standings['season'] >= start_year) & 
                                            (df_constructor_standings['season'] <= end_year)]
 
+    return df_filtered[['season', 'constructorId', 'points']]
+
+def render_constructor_points_vs_year(df_filtered, start_year, end_year):
+    """Draws the line chart of constructor points vs year from compute_constructor_points_vs_year."""
     brand_colors = {
         'mercedes': '#565F64',
         'ferrari': '#ff0000',
@@ -177,9 +207,17 @@ def plot_constructor_points_vs_year(start_year=2017, end_year=2024):
 
     return fig
 
-def plot_constructor_points_distribution_per_year():
-    """Creates a box plot for the distribution of constructor points per year."""
-    
+@cached_figure
+def plot_constructor_points_vs_year(start_year=None, end_year=None):
+    """Creates a line chart for Points vs Year for each constructor within a specified range (every season by default)."""
+    df_filtered = compute_constructor_points_vs_year(start_year, end_year)
+    start_year = int(df_filtered['season'].min()) if start_year is None else start_year
+    end_year = int(df_filtered['season'].max()) if end_year is None else end_year
+    return render_constructor_points_vs_year(df_filtered, start_year, end_year)
+
+@cached_frame
+def compute_constructor_points_distribution_per_year():
+    """Returns the points of every constructor in each season, excluding discontinued teams."""
     df_constructor_standings = load_constructor_standings_data()
 
     discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
@@ -187,7 +225,10 @@ def plot_constructor_points_distribution_per_year():
 
     df_constructor_standings['season'] = df_constructor_standings['season'].astype(int)
     df_constructor_standings['points'] = df_constructor_standings['points'].astype(float)
+    return df_constructor_standings[['season', 'constructorId', 'points']]
 
+def render_constructor_points_distribution_per_year(df_constructor_standings):
+    """Draws the box plot of constructor points per year from compute_constructor_points_distribution_per_year."""
     fig = px.box(
         df_constructor_standings,
         x='season',
@@ -209,20 +250,25 @@ def plot_constructor_points_distribution_per_year():
 
     return fig
 
+@cached_figure
+def plot_constructor_points_distribution_per_year():
+    """Creates a box plot for the distribution of constructor points per year."""
+    return render_constructor_points_distribution_per_year(compute_constructor_points_distribution_per_year())
+
 def calculate_win_percentage(df):
     """Calculates overall and year-by-year win percentage for constructors and filters out zero-win and discontinued teams."""
     
     discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
     df = df[~df['constructorId'].isin(discontinued_teams)]
 
-    overall_wins = df.groupby('constructorId')['wins'].sum().reset_index()
+    overall_wins = df.groupby('constructorId', observed=True)['wins'].sum().reset_index()
     overall_wins['win_percentage'] = (overall_wins['wins'] / overall_wins['wins'].sum()) * 100
 
     overall_wins = overall_wins[overall_wins['win_percentage'] > 0]
     
     overall_wins = overall_wins.sort_values(by='win_percentage', ascending=True)
 
-    yearly_wins = df.groupby(['season', 'constructorId'])['wins'].sum().reset_index()
+    yearly_wins = df.groupby(['season', 'constructorId'], observed=True)['wins'].sum().reset_index()
     yearly_races = df.groupby('season')['wins'].sum().reset_index().rename(columns={'wins': 'total_wins_per_year'})
     yearly_wins = yearly_wins.merge(yearly_races, on='season')
     yearly_wins['win_percentage'] = (yearly_wins['wins'] / yearly_wins['total_wins_per_year']) * 100
@@ -231,11 +277,18 @@ def calculate_win_percentage(df):
 
     return overall_wins, yearly_wins
 
-def plot_overall_win_percentage():
-    """Creates a bar chart for overall win percentage per constructor, excluding zero-win and discontinued teams."""
-    df_constructor_standings = load_constructor_standings_data()
-    overall_wins, _ = calculate_win_percentage(df_constructor_standings)
-    
+@cached_frame
+def compute_overall_win_percentage():
+    """Returns each constructor's share of all the wins over every season, excluding zero-win and discontinued teams."""
+    df_constructor_totals = season_range_totals(load_constructor_season_totals(), 'constructorId')
+
+    overall_wins = df_constructor_totals[['constructorId', 'wins']]
+    overall_wins['win_percentage'] = (overall_wins['wins'] / overall_wins['wins'].sum()) * 100
+    overall_wins = overall_wins[overall_wins['win_percentage'] > 0]
+    return overall_wins.sort_values(by='win_percentage', ascending=True)
+
+def render_overall_win_percentage(overall_wins):
+    """Draws the bar chart of overall win percentage per constructor from compute_overall_win_percentage."""
     brand_colors = {
         'mercedes': '#565F64',
         'ferrari': '#ff0000',
@@ -280,11 +333,21 @@ def plot_overall_win_percentage():
 
     return fig
 
-def plot_yearly_win_percentage():
-    """Creates a bar chart for yearly win percentage per constructor, excluding zero-win and discontinued teams."""
-    df_constructor_standings = load_constructor_standings_data()
-    _, yearly_wins = calculate_win_percentage(df_constructor_standings)
+@cached_figure
+def plot_overall_win_percentage():
+    """Creates a bar chart for overall win percentage per constructor, excluding zero-win and discontinued teams."""
+    return render_overall_win_percentage(compute_overall_win_percentage())
+
+@cached_frame
+def compute_yearly_win_percentage():
+    """Returns each constructor's share of the wins of every season, excluding zero-win and discontinued teams."""
+    df_constructor_totals = load_constructor_season_totals()
 
+    yearly_wins = df_constructor_totals[['season', 'constructorId', 'wins', 'total_wins_per_year', 'win_percentage']]
+    return yearly_wins[yearly_wins['win_percentage'] > 0].sort_values(['season', 'constructorId'])
+
+def render_yearly_win_percentage(yearly_wins):
+    """Draws the grouped bar chart of yearly win percentage per constructor from compute_yearly_win_percentage."""
     brand_colors = {
         'mercedes': '#565F64',
         'ferrari': '#ff0000',
@@ -326,3 +389,8 @@ def plot_yearly_win_percentage():
     )
 
     return fig
+
+@cached_figure
+def plot_yearly_win_percentage():
+    """Creates a bar chart for yearly win percentage per constructor, excluding zero-win and discontinued teams."""
+    return render_yearly_win_percentage(compute_yearly_win_percentage())
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""Loads every dataset of the Datasets directory (or F1_DATASETS_DIR) through one in-process cache.
+
+A dataset is built once even when several sessions ask for it at the same time, and it is kept until
+one of its files changes on disk. Every caller gets a read-only view, so copy-on-write copies a column
+only when the caller changes it. Once the cache holds more than F1_DATASET_CACHE_MB megabytes, the least
+recently used datasets without live views are dropped. dataset_cache_stats() reports the size and live
+views of each dataset.
+"""
+import os
+import re
+import hashlib
+import weakref
+import threading
+import importlib.util
+from collections import OrderedDict
+import pandas as pd
+
+# Cached frames are shared by every chart, so hand out shallow copies and let
+# copy-on-write keep callers from modifying the cached data in place.
+pd.set_option('mode.copy_on_write', True)
+
+# F1_DATASETS_DIR points the loaders at another copy of the datasets, such as a scaled-up one for benchmarks.
+DATASETS_DIR = os.environ.get('F1_DATASETS_DIR', os.path.join(os.path.dirname(__name__), '.', 'Datasets'))
+COLUMNAR_DIR = os.path.join(DATASETS_DIR, 'columnar')
+DATASET_CACHE_MAX_BYTES = int(float(os.environ.get('F1_DATASET_CACHE_MB', '512')) * 1024 * 1024)
+
+# Column types shared by the CSV and the columnar form of each dataset. Yearly
+# files such as lap_times_2017.csv use the entry of their base name.
+DATASET_DTYPES = {
+    'race_results.csv': {'season': 'int16', 'round': 'int16', 'driverId': 'category', 'constructorId': 'category', 'raceName': 'category', 'status': 'category'},
+    'pit_results.csv': {'season': 'int16', 'round': 'int16', 'driverId': 'category', 'stop': 'int16', 'lap': 'int16'},
+    'lap_times.csv': {'season': 'int16', 'round': 'int16', 'lap': 'int16', 'driverId': 'category'},
+    'driver_standings.csv': {'season': 'int16', 'driverId': 'category', 'constructorId': 'category'},
+    'constructor_standings.csv': {'season': 'int16', 'constructorId': 'category'},
+    'race_schedule.csv': {'season': 'int16', 'round': 'int16', 'raceName': 'category', 'circuitName': 'category'},
+    'driver_info.csv': {'driverId': 'category'},
+}
+
+# Frames are shared by every session of the process. Each entry keeps the files' signature, the frame,
+# its size in bytes and the number of views handed out that are still alive.
+_cache = OrderedDict()
+_cache_size = 0
+_cache_counts = {'hits': 0, 'builds': 0, 'evictions': 0}
+_build_locks = {}
+_seasons_cache = {}
+_lock = threading.RLock()
+
+def dataset_path(file_name):
+    """Returns the path of a file inside the Datasets directory."""
+    return os.path.join(DATASETS_DIR, file_name)
+
+def columnar_path(file_name):
+    """Returns the path of the columnar (Parquet) copy of a dataset file."""
+    return os.path.join(COLUMNAR_DIR, os.path.splitext(file_name)[0] + '.parquet')
+
+def dataset_dtypes(file_name):
+    """Returns the column types of a dataset file."""
+    base_name = re.sub(r'_\d{4}\.csv$', '.csv', os.path.basename(file_name))
+    return DATASET_DTYPES.get(base_name, {})
+
+def columnar_supported():
+    """Checks whether pyarrow is installed to read and write Parquet files."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def resolve_dataset_file(file_name):
+    """Returns the columnar copy of a dataset file when it is up to date, and the CSV file otherwise."""
+    csv_path = dataset_path(file_name)
+    parquet_path = columnar_path(file_name)
+    if not columnar_supported() or not os.path.exists(parquet_path):
+        return csv_path
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(parquet_path):
+        return csv_path
+    return parquet_path
+
+def read_table(path, columns=None):
+    """Reads a dataset file, or only some of its columns, from its columnar or CSV form with the dataset's column types."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, dtype=dataset_dtypes(path))
+
+def replace_values(series, mapping):
+    """Replaces values in a column, keeping categorical columns categorical."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).replace(mapping).astype('category')
+    return series.replace(mapping)
+
+def dataset_seasons(prefix):
+    """Returns the seasons that have a yearly file of a dataset, such as lap_times_2017.csv, in either form.
+
+    The listing is kept until a file is added to or removed from the Datasets directory.
+    """
+    directories = [directory for directory in (DATASETS_DIR, COLUMNAR_DIR) if os.path.isdir(directory)]
+    signature = tuple(os.stat(directory).st_mtime_ns for directory in directories)
+    pattern = re.compile(rf'^{re.escape(prefix)}_(\d{{4}})\.(csv|parquet)$')
+
+    with _lock:
+        entry = _seasons_cache.get(prefix)
+        if entry is None or entry[0] != signature:
+            seasons = {
+                int(match.group(1))
+                for directory in directories
+                for match in map(pattern.match, os.listdir(directory)) if match
+            }
+            entry = (signature, sorted(seasons))
+            _seasons_cache[prefix] = entry
+
+    return list(entry[1])
+
+def _file_signature(paths):
+    """Returns the modification time and size of each file, used to detect changes on disk."""
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+def dataset_version():
+    """Returns a fingerprint of the files in the Datasets directory that changes whenever a dataset changes."""
+    entries = []
+    for directory in (DATASETS_DIR, COLUMNAR_DIR):
+        if os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return hashlib.sha1(repr(sorted(entries)).encode()).hexdigest()[:16]
+
+def frame_size(df):
+    """Returns the memory used by a frame in bytes, including the strings in its object columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _build_lock(name):
+    """Returns the lock held while a dataset is built, so concurrent sessions build it only once."""
+    with _lock:
+        return _build_locks.setdefault(name, threading.Lock())
+
+def _lookup(name, signature):
+    """Returns the cached entry of a dataset when it was built from the current files, or None."""
+    with _lock:
+        entry = _cache.get(name)
+        if entry is None or entry['signature'] != signature:
+            return None
+        _cache.move_to_end(name)
+        _cache_counts['hits'] += 1
+        return entry
+
+def _store(name, signature, df):
+    """Caches a frame, evicting the least recently used datasets beyond the byte budget.
+
+    Datasets with live views are never evicted: their memory stays in use anyway, and loading
+    them again would only keep a second copy.
+    """
+    global _cache_size
+    entry = {'signature': signature, 'frame': df, 'size': frame_size(df), 'views': 0}
+    with _lock:
+        if name in _cache:
+            _cache_size -= _cache.pop(name)['size']
+        _cache[name] = entry
+        _cache_size += entry['size']
+        _cache_counts['builds'] += 1
+        for evicted_name in [key for key in _cache if key != name]:
+            if _cache_size <= DATASET_CACHE_MAX_BYTES:
+                break
+            if _cache[evicted_name]['views'] == 0:
+                _cache_size -= _cache.pop(evicted_name)['size']
+                _cache_counts['evictions'] += 1
+    return entry
+
+def _release_view(entry):
+    """Counts a view of a cached frame as released once it is garbage collected."""
+    with _lock:
+        entry['views'] -= 1
+
+def _view(entry):
+    """Returns a read-only view of a cached frame and counts it until it is garbage collected.
+
+    The view shares its columns with the cached frame; copy-on-write copies a column only when
+    a caller modifies it, so the cached data is never changed.
+    """
+    df = entry['frame'].copy(deep=False)
+    with _lock:
+        entry['views'] += 1
+    weakref.finalize(df, _release_view, entry)
+    return df
+
+def load_dataset(name, file_names, builder):
+    """Returns the frame built from the given dataset files, loading it once per process until a file changes.
+
+    Concurrent callers asking for a dataset being built wait for that build instead of starting their own.
+    """
+    paths = [resolve_dataset_file(file_name) for file_name in file_names]
+    signature = _file_signature(paths)
+
+    entry = _lookup(name, signature)
+    if entry is None:
+        with _build_lock(name):
+            entry = _lookup(name, signature)
+            if entry is None:
+                entry = _store(name, signature, builder(*paths))
+
+    return _view(entry)
+
+def dataset_cache_stats():
+    """Returns the datasets held in the cache with their size and live views, and the cache totals."""
+    with _lock:
+        return {
+            'datasets': {name: {'bytes': entry['size'], 'views': entry['views']} for name, entry in _cache.items()},
+            'bytes': _cache_size,
+            'max_bytes': DATASET_CACHE_MAX_BYTES,
+            **_cache_counts,
+        }
+
+def clear_dataset_cache():
+    """Drops every cached dataset so the next load reads from disk again."""
+    global _cache_size
+    with _lock:
+        _cache.clear()
+        _cache_size = 0
+        _seasons_cache.clear()
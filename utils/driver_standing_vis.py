@@ -1,28 +1,17 @@
 import plotly.express as px
-import pandas as pd
-import os
-
-def load_driver_standings_data():
-    """Loads and updates the driver standings data."""
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'driver_standings.csv')
-    df = pd.read_csv(file_path)
-
-    df['constructorId'] = df['constructorId'].replace({'alphatauri': 'rb'})
-    df['constructorName'] = df['constructorName'].replace({'AlphaTauri': 'RB F1 Team'})
-    
-    return df
-
-def plot_top_drivers_by_points(top=10):
-    """Creates a bar chart for the top 10 drivers with the highest total points (2017-2024) using Viridis color scale."""
-    
-    df_driver_standings = load_driver_standings_data()
-
-    df_driver_standings = df_driver_standings[df_driver_standings['season'].between(2017, 2024)]
-
-    total_points_per_driver = df_driver_standings.groupby('driverId')['points'].sum().reset_index()
-
-    top_drivers = total_points_per_driver.sort_values(by='points', ascending=False).head(top)
-
+from utils.loaders import load_driver_standings_data
+from utils.aggregates import load_driver_season_totals, season_range_totals
+from utils.figure_cache import cached_figure
+from utils.frame_cache import cached_frame
+
+@cached_frame
+def compute_top_drivers_by_points(top=10):
+    """Returns the drivers with the highest total points over every season, highest first."""
+    df_driver_totals = season_range_totals(load_driver_season_totals(), 'driverId')
+    return df_driver_totals[['driverId', 'points']].sort_values(by='points', ascending=False).head(top)
+
+def render_top_drivers_by_points(top_drivers):
+    """Draws the bar chart of the drivers' total points from compute_top_drivers_by_points."""
     fig = px.bar(
         top_drivers,
         x='driverId',
@@ -45,15 +34,19 @@ def plot_top_drivers_by_points(top=10):
 
     return fig
 
-def plot_top_drivers_by_wins(top=10):
-    """Creates a bar chart for the top 10 drivers with the most wins (2017-2024) using Viridis color scale."""
-    
-    df_driver_standings = load_driver_standings_data()
-
-    total_wins_per_driver = df_driver_standings.groupby('driverId')['wins'].sum().reset_index()
+@cached_figure
+def plot_top_drivers_by_points(top=10):
+    """Creates a bar chart for the top 10 drivers with the highest total points over every season using Viridis color scale."""
+    return render_top_drivers_by_points(compute_top_drivers_by_points(top))
 
-    top_drivers = total_wins_per_driver.sort_values(by='wins', ascending=False).head(top)
+@cached_frame
+def compute_top_drivers_by_wins(top=10):
+    """Returns the drivers with the most wins over every season, most first."""
+    df_driver_totals = season_range_totals(load_driver_season_totals(), 'driverId')
+    return df_driver_totals[['driverId', 'wins']].sort_values(by='wins', ascending=False).head(top)
 
+def render_top_drivers_by_wins(top_drivers):
+    """Draws the bar chart of the drivers' wins from compute_top_drivers_by_wins."""
     fig = px.bar(
         top_drivers,
         x='driverId',
@@ -76,13 +69,19 @@ def plot_top_drivers_by_wins(top=10):
 
     return fig
 
-def plot_driver_progression(driver_id):
-    """Creates three visualizations for a specific driver: Points vs Year, Wins vs Year, Standing vs Year (reversed)."""
-    
-    df_driver_standings = load_driver_standings_data()
+@cached_figure
+def plot_top_drivers_by_wins(top=10):
+    """Creates a bar chart for the top 10 drivers with the most wins over every season using Viridis color scale."""
+    return render_top_drivers_by_wins(compute_top_drivers_by_wins(top))
 
-    df_driver = df_driver_standings[df_driver_standings['driverId'] == driver_id]
+@cached_frame
+def compute_driver_progression(driver_id):
+    """Returns the points, wins and championship standing of a driver in each season."""
+    df_driver_standings = load_driver_standings_data()
+    return df_driver_standings[df_driver_standings['driverId'] == driver_id]
 
+def render_driver_progression(df_driver):
+    """Draws the points, wins and standing line charts of a driver from compute_driver_progression."""
     fig_points = px.line(
         df_driver,
         x='season',
@@ -123,4 +122,9 @@ def plot_driver_progression(driver_id):
         margin=dict(l=50, r=50, t=50, b=50),
     )
 
-    return fig_points, fig_wins, fig_standing
\ No newline at end of file
+    return fig_points, fig_wins, fig_standing
+
+@cached_figure
+def plot_driver_progression(driver_id):
+    """Creates three visualizations for a specific driver: Points vs Year, Wins vs Year, Standing vs Year (reversed)."""
+    return render_driver_progression(compute_driver_progression(driver_id))
\ No newline at end of file
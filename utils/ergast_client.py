@@ -0,0 +1,129 @@
+"""HTTP client for the Ergast API.
+
+It reuses keep-alive connections and fetches rounds concurrently. A token bucket keeps it under the rate
+limit, the requests in flight per endpoint are capped, and failed requests are retried with jittered
+exponential backoff. Lap times are paged from the bulk laps endpoint a thousand timings at a time.
+"""
+import os
+import re
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+ERGAST_BASE_URL = os.environ.get('ERGAST_BASE_URL', 'http://ergast.com/api/f1')
+
+# Ergast allows 4 requests per second in bursts, and asks clients to keep the sustained rate below that.
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 4
+DEFAULT_WORKERS = 8
+
+# Maximum number of requests in flight per kind of endpoint, so the heavy lap
+# queries cannot take every worker while the light ones wait.
+DEFAULT_ENDPOINT_LIMITS = {'laps': 4, 'pitstops': 4, 'results': 4, 'standings': 2, 'drivers': 2, 'schedule': 2}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket that lets `rate` calls per second through, with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def endpoint_kind(path):
+    """Returns the kind of Ergast endpoint a path points to, used to pick its concurrency limit."""
+    if re.search(r'/laps(/\d+)?\.json$', path):
+        return 'laps'
+    if path.endswith('pitstops.json'):
+        return 'pitstops'
+    if path.endswith('results.json'):
+        return 'results'
+    if path.endswith('Standings.json'):
+        return 'standings'
+    if path.startswith('drivers'):
+        return 'drivers'
+    return 'schedule'
+
+class ErgastClient:
+    """Fetches Ergast endpoints over pooled keep-alive connections, with rate limiting, retries and per-endpoint limits."""
+
+    def __init__(self, base_url=ERGAST_BASE_URL, rate=DEFAULT_RATE, burst=DEFAULT_BURST, workers=DEFAULT_WORKERS,
+                 endpoint_limits=None, max_retries=5, backoff=0.5, max_backoff=30.0, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        limits = dict(DEFAULT_ENDPOINT_LIMITS, **(endpoint_limits or {}))
+        self.semaphores = {kind: threading.BoundedSemaphore(limit) for kind, limit in limits.items()}
+        self.request_count = 0
+        self.retry_count = 0
+        self._count_lock = threading.Lock()
+        self._local = threading.local()
+
+    def session(self):
+        """Returns the calling thread's session, whose adapter keeps its connections alive between requests."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def retry_delay(self, attempt, response=None):
+        """Returns the wait before a retry: the server's Retry-After if given, else exponential backoff with full jitter."""
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return float(response.headers['Retry-After'])
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, path, params=None):
+        """Requests an Ergast endpoint and returns its MRData document, retrying transient failures."""
+        url = f'{self.base_url}/{path}'
+        with self.semaphores[endpoint_kind(path)]:
+            for attempt in range(self.max_retries + 1):
+                if self.bucket:
+                    self.bucket.acquire()
+                with self._count_lock:
+                    self.request_count += 1
+                response = None
+                try:
+                    response = self.session().get(url, params=params, timeout=self.timeout)
+                    if response.status_code not in RETRY_STATUS_CODES:
+                        response.raise_for_status()
+                        return response.json()['MRData']
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == self.max_retries:
+                        raise
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                with self._count_lock:
+                    self.retry_count += 1
+                time.sleep(self.retry_delay(attempt, response))
+
+    def map(self, function, items):
+        """Calls function on every item from a pool of worker threads and returns the results in order."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(function, items))
@@ -0,0 +1,126 @@
+"""Memoizes the chart functions on their arguments and the version of the datasets.
+
+Serialized figures are kept in a least-recently-used cache of F1_FIGURE_CACHE_MB megabytes. Evicted
+figures are spilled to F1_FIGURE_CACHE_DIR when that is set.
+"""
+import os
+import json
+import inspect
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+import numpy as np
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+from utils.datasets import dataset_version
+
+FIGURE_CACHE_MAX_BYTES = int(float(os.environ.get('F1_FIGURE_CACHE_MB', '64')) * 1024 * 1024)
+FIGURE_CACHE_DIR = os.environ.get('F1_FIGURE_CACHE_DIR')
+
+_figures = OrderedDict()
+_figures_size = 0
+_lock = threading.Lock()
+
+def normalize_argument(value):
+    """Turns an argument into plain Python values so equal arguments give equal cache keys."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [normalize_argument(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): normalize_argument(item) for key, item in sorted(value.items())}
+    return value
+
+def figure_cache_key(function, args, kwargs):
+    """Builds the cache key of a chart from its function name, its arguments and the dataset version.
+
+    Arguments are bound to the function's parameters with their defaults filled in, so a call passing
+    a value positionally, by keyword or through the default shares one entry.
+    """
+    try:
+        bound = inspect.signature(function).bind(*args, **kwargs)
+        bound.apply_defaults()
+        args, kwargs = (), dict(bound.arguments)
+    except TypeError:
+        pass
+    key = json.dumps(
+        [f'{function.__module__}.{function.__qualname__}', normalize_argument(args), normalize_argument(kwargs), dataset_version()],
+        default=repr
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def serialize_result(result):
+    """Serializes the result of a chart function (a figure, or a tuple of figures and messages) to JSON bytes."""
+    items = result if isinstance(result, tuple) else (result,)
+    serialized_items = [{'figure': item.to_plotly_json()} if isinstance(item, go.Figure) else {'value': item} for item in items]
+    return json.dumps({'tuple': isinstance(result, tuple), 'items': serialized_items}, cls=PlotlyJSONEncoder).encode()
+
+def deserialize_result(data):
+    """Rebuilds the result of a chart function from its JSON bytes."""
+    serialized = json.loads(data)
+    # The JSON was produced from valid figures, so skip plotly's property validation when rebuilding them.
+    items = tuple(go.Figure(item['figure'], _validate=False) if 'figure' in item else item['value'] for item in serialized['items'])
+    return items if serialized['tuple'] else items[0]
+
+def spill_path(key):
+    """Returns the path where an evicted figure is written when disk spilling is enabled."""
+    return os.path.join(FIGURE_CACHE_DIR, f'{key}.json')
+
+def store_figure(key, data):
+    """Stores serialized figures in memory, evicting the least recently used ones beyond the byte budget."""
+    global _figures_size
+    evicted = []
+    with _lock:
+        if key in _figures:
+            _figures_size -= len(_figures.pop(key))
+        _figures[key] = data
+        _figures_size += len(data)
+        while _figures_size > FIGURE_CACHE_MAX_BYTES and _figures:
+            evicted_key, evicted_data = _figures.popitem(last=False)
+            _figures_size -= len(evicted_data)
+            evicted.append((evicted_key, evicted_data))
+
+    if FIGURE_CACHE_DIR:
+        os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+        for evicted_key, evicted_data in evicted:
+            with open(spill_path(evicted_key) + '.tmp', 'wb') as file:
+                file.write(evicted_data)
+            os.replace(spill_path(evicted_key) + '.tmp', spill_path(evicted_key))
+
+def lookup_figure(key):
+    """Returns the serialized figures stored under a key from memory or the spill directory, or None."""
+    with _lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            return _figures[key]
+
+    if FIGURE_CACHE_DIR and os.path.exists(spill_path(key)):
+        with open(spill_path(key), 'rb') as file:
+            data = file.read()
+        store_figure(key, data)
+        return data
+    return None
+
+def clear_figure_cache():
+    """Drops every figure kept in memory."""
+    global _figures_size
+    with _lock:
+        _figures.clear()
+        _figures_size = 0
+
+def cached_figure(function):
+    """Memoizes a chart function on its name, arguments and the dataset version, so repeat views skip pandas and plotly."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        key = figure_cache_key(function, args, kwargs)
+        data = lookup_figure(key)
+        if data is not None:
+            return deserialize_result(data)
+
+        result = function(*args, **kwargs)
+        store_figure(key, serialize_result(result))
+        return result
+
+    return wrapper
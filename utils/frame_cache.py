@@ -0,0 +1,72 @@
+"""Memoizes the compute_* functions of the charts on their arguments and the version of the datasets.
+
+Up to F1_FRAME_CACHE_MB megabytes of results are kept, so drawing the same data with another style
+never repeats the aggregation.
+"""
+import os
+import functools
+import threading
+from collections import OrderedDict
+import pandas as pd
+from utils.datasets import frame_size
+from utils.figure_cache import figure_cache_key
+
+FRAME_CACHE_MAX_BYTES = int(float(os.environ.get('F1_FRAME_CACHE_MB', '64')) * 1024 * 1024)
+
+_frames = OrderedDict()
+_frames_size = 0
+_lock = threading.Lock()
+
+def result_size(result):
+    """Returns the memory used by the result of a compute function (a frame, or a tuple of frames) in bytes."""
+    items = result if isinstance(result, tuple) else (result,)
+    return sum(frame_size(item) for item in items if isinstance(item, pd.DataFrame))
+
+def shallow_copy(result):
+    """Returns a copy of a cached result sharing its data, so callers changing it leave the cached frames intact."""
+    if isinstance(result, tuple):
+        return tuple(shallow_copy(item) for item in result)
+    if isinstance(result, pd.DataFrame):
+        return result.copy(deep=False)
+    return result
+
+def store_frame(key, result):
+    """Stores a computed result, evicting the least recently used ones beyond the byte budget."""
+    global _frames_size
+    size = result_size(result)
+    with _lock:
+        if key in _frames:
+            _frames_size -= _frames.pop(key)[1]
+        _frames[key] = (result, size)
+        _frames_size += size
+        while _frames_size > FRAME_CACHE_MAX_BYTES and _frames:
+            _frames_size -= _frames.popitem(last=False)[1][1]
+
+def lookup_frame(key):
+    """Returns the computed result stored under a key, or None."""
+    with _lock:
+        if key in _frames:
+            _frames.move_to_end(key)
+            return _frames[key][0]
+    return None
+
+def clear_frame_cache():
+    """Drops every computed result kept in memory."""
+    global _frames_size
+    with _lock:
+        _frames.clear()
+        _frames_size = 0
+
+def cached_frame(function):
+    """Memoizes a compute function on its name, arguments and the dataset version, so restyling a chart skips the aggregation."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        key = figure_cache_key(function, args, kwargs)
+        result = lookup_frame(key)
+        if result is None:
+            result = function(*args, **kwargs)
+            store_frame(key, result)
+        return shallow_copy(result)
+
+    return wrapper
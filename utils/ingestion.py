@@ -0,0 +1,402 @@
+"""Incremental ingestion of the Ergast data into the Datasets directory.
+
+Datasets/manifest.json records the (season, round) pairs already stored. Only the rounds that are
+missing, or raced less than a week ago, are fetched. The affected csv files are rewritten atomically,
+along with the standings of the seasons that changed. Lap times are streamed into the yearly csv files
+without being held in memory.
+"""
+import os
+import csv
+import json
+import tempfile
+import datetime
+import argparse
+import pandas as pd
+from utils.datasets import DATASETS_DIR, columnar_path
+from utils.columnar_store import convert_csv_to_columnar
+from utils.ergast_client import ERGAST_BASE_URL, DEFAULT_RATE, DEFAULT_WORKERS, ErgastClient
+
+MANIFEST_FILE = 'manifest.json'
+
+# Timings per request to the bulk laps endpoint, about 50 laps of a full grid.
+LAP_PAGE_SIZE = 1000
+
+# Results can still change after a race (penalties, appeals), so a round is
+# fetched again until it has been stored this many days after the race.
+SETTLE_DAYS = 7
+
+RACE_RESULTS_COLUMNS = ['season', 'round', 'raceName', 'date', 'driverId', 'constructorId', 'grid', 'position', 'status', 'points', 'time-ms', 'time-hrmins', 'Max Avg Speed Unit', 'Max Avg Speed']
+PIT_RESULTS_COLUMNS = ['season', 'round', 'driverId', 'stop', 'lap', 'time', 'duration']
+LAP_TIMES_COLUMNS = ['season', 'round', 'lap', 'position', 'driverId', 'time']
+RACE_SCHEDULE_COLUMNS = ['season', 'round', 'raceName', 'date', 'time', 'circuitId', 'circuitName', 'location-locality', 'location-country', 'location-lat', 'location-long']
+DRIVER_STANDINGS_COLUMNS = ['season', 'position', 'points', 'wins', 'driverId', 'driverName', 'constructorId', 'constructorName']
+CONSTRUCTOR_STANDINGS_COLUMNS = ['season', 'position', 'points', 'wins', 'constructorId', 'constructorName', 'nationality']
+DRIVER_INFO_COLUMNS = ['driverId', 'url', 'givenName', 'familyName', 'dateOfBirth', 'nationality', 'permanentNumber', 'code']
+
+def fetch_race_schedule(client, year):
+    """Fetches the race calendar of a season."""
+    races = client.get(f'{year}.json', {'limit': 100})['RaceTable']['Races']
+    return [
+        {
+            'season': int(race['season']),
+            'round': int(race['round']),
+            'raceName': race['raceName'],
+            'date': race['date'],
+            'time': race.get('time'),
+            'circuitId': race['Circuit']['circuitId'],
+            'circuitName': race['Circuit']['circuitName'],
+            'location-locality': race['Circuit']['Location']['locality'],
+            'location-country': race['Circuit']['Location']['country'],
+            'location-lat': race['Circuit']['Location']['lat'],
+            'location-long': race['Circuit']['Location']['long'],
+        }
+        for race in races
+    ]
+
+def fetch_race_results(client, year, round_num):
+    """Fetches the classification of a race, or an empty list when the race has not been run."""
+    races = client.get(f'{year}/{round_num}/results.json', {'limit': 1000})['RaceTable']['Races']
+    if not races:
+        return []
+    race = races[0]
+    return [
+        {
+            'season': int(race['season']),
+            'round': int(race['round']),
+            'raceName': race['raceName'],
+            'date': race['date'],
+            'driverId': result['Driver']['driverId'],
+            'constructorId': result['Constructor']['constructorId'],
+            'grid': result['grid'],
+            'position': result.get('position'),
+            'status': result['status'],
+            'points': result['points'],
+            'time-ms': result['Time']['millis'] if 'Time' in result else None,
+            'time-hrmins': result['Time']['time'] if 'Time' in result else None,
+            'Max Avg Speed Unit': result['FastestLap']['AverageSpeed']['units'] if 'FastestLap' in result else None,
+            'Max Avg Speed': result['FastestLap']['AverageSpeed']['speed'] if 'FastestLap' in result else None
+        }
+        for result in race['Results']
+    ]
+
+def fetch_pit_results(client, year, round_num):
+    """Fetches the pit stops of a race."""
+    races = client.get(f'{year}/{round_num}/pitstops.json', {'limit': 1000})['RaceTable']['Races']
+    if not races:
+        return []
+    return [
+        {
+            'season': year,
+            'round': round_num,
+            'driverId': pit['driverId'],
+            'stop': pit.get('stop'),
+            'lap': pit.get('lap'),
+            'time': pit.get('time'),
+            'duration': pit.get('duration')
+        }
+        for pit in races[0]['PitStops']
+    ]
+
+def iter_lap_times(client, year, round_num, page_size=LAP_PAGE_SIZE):
+    """Yields the lap timings of a race as csv rows, paging through the bulk laps endpoint."""
+    offset = 0
+    while True:
+        mr_data = client.get(f'{year}/{round_num}/laps.json', {'limit': page_size, 'offset': offset})
+        races = mr_data['RaceTable']['Races']
+        if not races:
+            return
+        for lap in races[0].get('Laps', []):
+            for timing in lap['Timings']:
+                yield year, round_num, lap['number'], timing['position'], timing['driverId'], timing['time']
+        # The server may cap the page size, so advance by the limit it reports.
+        offset += int(mr_data['limit'])
+        if offset >= int(mr_data['total']):
+            return
+
+def fetch_lap_times(client, year, round_num, path):
+    """Writes the lap timings of a race to a headerless csv file page by page and returns the number of rows."""
+    row_count = 0
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        for row in iter_lap_times(client, year, round_num):
+            writer.writerow(row)
+            row_count += 1
+    return row_count
+
+def fetch_driver_standings(client, year):
+    """Fetches the current driver standings of a season."""
+    standings_lists = client.get(f'{year}/driverStandings.json', {'limit': 1000})['StandingsTable']['StandingsLists']
+    if not standings_lists:
+        return []
+    return [
+        {
+            'season': year,
+            'position': standing['position'],
+            'points': standing['points'],
+            'wins': standing['wins'],
+            'driverId': standing['Driver']['driverId'],
+            'driverName': f"{standing['Driver']['givenName']} {standing['Driver']['familyName']}",
+            'constructorId': standing['Constructors'][0]['constructorId'],
+            'constructorName': standing['Constructors'][0]['name']
+        }
+        for standing in standings_lists[0]['DriverStandings']
+    ]
+
+def fetch_constructor_standings(client, year):
+    """Fetches the current constructor standings of a season."""
+    standings_lists = client.get(f'{year}/constructorStandings.json', {'limit': 1000})['StandingsTable']['StandingsLists']
+    if not standings_lists:
+        return []
+    return [
+        {
+            'season': year,
+            'position': standing['position'],
+            'points': standing['points'],
+            'wins': standing['wins'],
+            'constructorId': standing['Constructor']['constructorId'],
+            'constructorName': standing['Constructor']['name'],
+            'nationality': standing['Constructor']['nationality']
+        }
+        for standing in standings_lists[0]['ConstructorStandings']
+    ]
+
+def fetch_driver_info(client, driver_id):
+    """Fetches the profile of one driver."""
+    drivers = client.get(f'drivers/{driver_id}.json')['DriverTable']['Drivers']
+    return drivers[:1]
+
+def manifest_path(datasets_dir=DATASETS_DIR):
+    """Returns the path of the manifest that lists the rounds stored in a Datasets directory."""
+    return os.path.join(datasets_dir, MANIFEST_FILE)
+
+def load_manifest(datasets_dir=DATASETS_DIR):
+    """Returns the stored rounds keyed by (season, round), building the list from race_results.csv the first time."""
+    path = manifest_path(datasets_dir)
+    if os.path.exists(path):
+        with open(path) as file:
+            rounds = json.load(file)['rounds']
+        return {(entry['season'], entry['round']): entry for entry in rounds}
+
+    race_results_path = os.path.join(datasets_dir, 'race_results.csv')
+    if not os.path.exists(race_results_path):
+        return {}
+    # Rounds downloaded before the manifest existed are treated as final.
+    df_rounds = pd.read_csv(race_results_path, usecols=['season', 'round', 'date']).drop_duplicates(['season', 'round'])
+    return {
+        (int(row.season), int(row.round)): {'season': int(row.season), 'round': int(row.round), 'date': row.date, 'fetched_at': None, 'settled': True}
+        for row in df_rounds.itertuples()
+    }
+
+def save_manifest(manifest, datasets_dir=DATASETS_DIR):
+    """Writes the manifest atomically, sorted by season and round."""
+    path = manifest_path(datasets_dir)
+    with open(path + '.tmp', 'w') as file:
+        json.dump({'rounds': [manifest[key] for key in sorted(manifest)]}, file, indent=1)
+        file.write('\n')
+    os.replace(path + '.tmp', path)
+
+def rounds_to_fetch(manifest, df_schedule, today):
+    """Returns the (season, round) pairs of the schedule that have been raced but are missing or not yet settled."""
+    pending = []
+    for race in df_schedule.itertuples():
+        if datetime.date.fromisoformat(race.date) > today:
+            continue
+        entry = manifest.get((race.season, race.round))
+        if entry is None or not entry['settled']:
+            pending.append((race.season, race.round))
+    return pending
+
+def as_csv_text(df, columns):
+    """Turns fetched rows into text columns in the csv's column order, with missing values left empty."""
+    df = df.reindex(columns=columns)
+    return df.astype(object).where(df.notna(), '').astype(str)
+
+def write_rows(datasets_dir, file_name, df_new, columns, key_columns):
+    """Replaces the rows of a dataset file that share key values with the new rows, writing the file atomically.
+
+    Returns whether the file changed. A file whose rows are all unchanged is left alone, so its
+    modification time (and every cache keyed on it) is kept.
+    """
+    path = os.path.join(datasets_dir, file_name)
+    df_new = as_csv_text(df_new, columns)
+    if os.path.exists(path):
+        # Read the existing rows as text so they are written back byte for byte.
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        df_keys = df_new[key_columns].drop_duplicates()
+        df = df.merge(df_keys, on=key_columns, how='left', indicator=True)
+        df = pd.concat([df[df['_merge'] == 'left_only'].drop(columns='_merge'), df_new], ignore_index=True)
+    else:
+        df = df_new
+    df = df.sort_values(key_columns, key=lambda column: pd.to_numeric(column), kind='stable')
+    csv_text = df.to_csv(index=False)
+    if os.path.exists(path):
+        with open(path, newline='') as file:
+            if file.read() == csv_text:
+                return False
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', newline='') as file:
+        file.write(csv_text)
+    os.replace(temp_path, path)
+    return True
+
+def merge_lap_rounds(datasets_dir, season, round_paths):
+    """Rewrites a season's lap file with the staged rounds in place of the stored ones, streaming row by row.
+
+    round_paths maps each round to the headerless csv file its timings were staged in.
+    """
+    path = os.path.join(datasets_dir, f'lap_times_{season}.csv')
+    pending_rounds = sorted(round_paths)
+
+    def copy_rounds_before(round_num, output):
+        while pending_rounds and (round_num is None or pending_rounds[0] < round_num):
+            with open(round_paths[pending_rounds.pop(0)], newline='') as staged:
+                for line in staged:
+                    output.write(line)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', newline='') as output:
+        if os.path.exists(path):
+            with open(path, newline='') as stored:
+                output.write(next(stored, ','.join(LAP_TIMES_COLUMNS) + '\n'))
+                for line in stored:
+                    round_num = int(line.split(',', 2)[1])
+                    copy_rounds_before(round_num, output)
+                    if round_num not in round_paths:
+                        output.write(line)
+        else:
+            output.write(','.join(LAP_TIMES_COLUMNS) + '\n')
+        copy_rounds_before(None, output)
+    os.replace(temp_path, path)
+    return path
+
+def append_new_drivers(client, datasets_dir, driver_ids):
+    """Adds the profiles of drivers that are not in driver_info.csv yet."""
+    path = os.path.join(datasets_dir, 'driver_info.csv')
+    known_ids = set(pd.read_csv(path, usecols=['driverId'])['driverId']) if os.path.exists(path) else set()
+    new_drivers = [driver for drivers in client.map(lambda driver_id: fetch_driver_info(client, driver_id), sorted(set(driver_ids) - known_ids)) for driver in drivers]
+    if not new_drivers:
+        return []
+
+    df_new = as_csv_text(pd.DataFrame(new_drivers), DRIVER_INFO_COLUMNS)
+    df = pd.read_csv(path, dtype=str, keep_default_na=False) if os.path.exists(path) else df_new.iloc[:0]
+    df = pd.concat([df, df_new], ignore_index=True)
+    df.to_csv(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+    return list(df_new['driverId'])
+
+def refresh_columnar_copies(file_names):
+    """Rebuilds the columnar copies of rewritten dataset files that had one, so the loaders keep reading Parquet."""
+    for file_name in file_names:
+        if os.path.exists(columnar_path(file_name)):
+            convert_csv_to_columnar(file_name)
+
+def fetch_round(client, season, round_num, staging_dir):
+    """Fetches the results and pit stops of a race and stages its lap times on disk, or returns None before the race."""
+    race_results = fetch_race_results(client, season, round_num)
+    if not race_results:
+        return None
+    lap_times_path = os.path.join(staging_dir, f'lap_times_{season}_{round_num}.csv')
+    fetch_lap_times(client, season, round_num, lap_times_path)
+    return race_results, fetch_pit_results(client, season, round_num), lap_times_path
+
+def ingest_new_rounds(seasons=None, base_url=ERGAST_BASE_URL, datasets_dir=DATASETS_DIR, today=None, client=None):
+    """Fetches the rounds missing from the datasets (and recent rounds that may still change) and merges them in.
+
+    Rounds are fetched concurrently through the client's worker pool. Every dataset file is
+    rewritten atomically, and the manifest is only saved once all of them are written, so an
+    interrupted run simply fetches the same rounds again next time.
+    """
+    today = today or datetime.date.today()
+    client = client or ErgastClient(base_url)
+    manifest = load_manifest(datasets_dir)
+    if seasons is None:
+        first_season = max((season for season, _ in manifest), default=today.year)
+        seasons = range(first_season, today.year + 1)
+
+    schedules = client.map(lambda year: fetch_race_schedule(client, year), list(seasons))
+    df_schedule = pd.DataFrame([race for races in schedules for race in races], columns=RACE_SCHEDULE_COLUMNS)
+    pending = rounds_to_fetch(manifest, df_schedule, today)
+    fetched = {'race_results': [], 'pit_results': []}
+    fetched_rounds = []
+    written_files = []
+    # Lap times are staged in one file per round and streamed into the season files, so they never sit in memory.
+    with tempfile.TemporaryDirectory(prefix='.staging-', dir=datasets_dir) as staging_dir:
+        lap_round_paths = {}
+        for (season, round_num), race in zip(pending, client.map(lambda key: fetch_round(client, *key, staging_dir), pending)):
+            if race is None:
+                continue
+            race_results, pit_results, lap_times_path = race
+            fetched['race_results'].extend(race_results)
+            fetched['pit_results'].extend(pit_results)
+            lap_round_paths.setdefault(season, {})[round_num] = lap_times_path
+            fetched_rounds.append((season, round_num, race_results[0]['date']))
+        for season, round_paths in sorted(lap_round_paths.items()):
+            merge_lap_rounds(datasets_dir, season, round_paths)
+            written_files.append(f'lap_times_{season}.csv')
+
+    if not df_schedule.empty:
+        if write_rows(datasets_dir, 'race_schedule.csv', df_schedule, RACE_SCHEDULE_COLUMNS, ['season', 'round']):
+            written_files.append('race_schedule.csv')
+
+    if fetched_rounds:
+        df_race_results = pd.DataFrame(fetched['race_results'])
+        if write_rows(datasets_dir, 'race_results.csv', df_race_results, RACE_RESULTS_COLUMNS, ['season', 'round']):
+            written_files.append('race_results.csv')
+        if fetched['pit_results']:
+            df_pit_results = pd.DataFrame(fetched['pit_results'])
+            df_pit_results['duration'] = pd.to_numeric(df_pit_results['duration'], errors='coerce')
+            if write_rows(datasets_dir, 'pit_results.csv', df_pit_results, PIT_RESULTS_COLUMNS, ['season', 'round']):
+                written_files.append('pit_results.csv')
+
+        # Standings only cover whole seasons, so refresh the seasons that gained rounds.
+        changed_seasons = sorted({season for season, _, _ in fetched_rounds})
+        driver_standings = client.map(lambda season: fetch_driver_standings(client, season), changed_seasons)
+        constructor_standings = client.map(lambda season: fetch_constructor_standings(client, season), changed_seasons)
+        df_driver_standings = pd.DataFrame([row for rows in driver_standings for row in rows])
+        if not df_driver_standings.empty:
+            if write_rows(datasets_dir, 'driver_standings.csv', df_driver_standings, DRIVER_STANDINGS_COLUMNS, ['season']):
+                written_files.append('driver_standings.csv')
+        df_constructor_standings = pd.DataFrame([row for rows in constructor_standings for row in rows])
+        if not df_constructor_standings.empty:
+            if write_rows(datasets_dir, 'constructor_standings.csv', df_constructor_standings, CONSTRUCTOR_STANDINGS_COLUMNS, ['season']):
+                written_files.append('constructor_standings.csv')
+        if append_new_drivers(client, datasets_dir, df_race_results['driverId']):
+            written_files.append('driver_info.csv')
+
+        fetched_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+        for season, round_num, race_date in fetched_rounds:
+            manifest[(season, round_num)] = {
+                'season': season,
+                'round': round_num,
+                'date': race_date,
+                'fetched_at': fetched_at,
+                'settled': (today - datetime.date.fromisoformat(race_date)).days >= SETTLE_DAYS
+            }
+        save_manifest(manifest, datasets_dir)
+
+    if os.path.abspath(datasets_dir) == os.path.abspath(DATASETS_DIR):
+        refresh_columnar_copies(sorted(set(written_files)))
+    return [(season, round_num) for season, round_num, _ in fetched_rounds]
+
+def parse_arguments():
+    """Parses the command line of the ingestion script."""
+    parser = argparse.ArgumentParser(description='Fetch the F1 rounds missing from the Datasets directory.')
+    parser.add_argument('--seasons', type=int, nargs=2, metavar=('FIRST', 'LAST'), help='season range to check, e.g. 2017 2024 for a full backfill')
+    parser.add_argument('--base-url', default=ERGAST_BASE_URL, help='address of the Ergast-compatible API')
+    parser.add_argument('--datasets-dir', default=DATASETS_DIR, help='directory holding the csv files')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='maximum requests per second (0 disables the limit)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='number of concurrent requests')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    seasons = range(arguments.seasons[0], arguments.seasons[1] + 1) if arguments.seasons else None
+    client = ErgastClient(arguments.base_url, rate=arguments.rate, workers=arguments.workers)
+    ingested_rounds = ingest_new_rounds(seasons, datasets_dir=arguments.datasets_dir, client=client)
+    if ingested_rounds:
+        for season, round_num in ingested_rounds:
+            print(f'Stored season {season} round {round_num}')
+    else:
+        print('The datasets are up to date')
+    print(f'{client.request_count} requests, {client.retry_count} retries')
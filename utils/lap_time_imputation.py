@@ -0,0 +1,165 @@
+"""Imputes the laps that retired drivers did not complete, for every retirement at once.
+
+The mean and median methods use each driver's trimmed lap times at the circuit in earlier seasons.
+The least-squares method fits the lap time trend of every race with retirements: a base pace per
+driver plus a fuel burn slope per lap and a tyre wear slope per lap of the stint, shared by the field.
+"""
+import numpy as np
+import pandas as pd
+from utils.loaders import load_pit_stop_data
+from utils.pit_stop_analytics import mark_pit_laps, flag_neutralized_laps
+
+RACE_KEY = ['season', 'round', 'driverId']
+
+# Entries that did not retire from the race: classified finishers, lapped cars,
+# disqualified drivers (who ran the full race) and drivers who never started.
+NON_RETIREMENT_STATUSES = ['Finished', 'Disqualified', 'Withdrew']
+
+def find_retirements(df_lap_times, df_race_results):
+    """Returns every driver who retired from a race, with the race's circuit, the laps they completed and the race's length."""
+    status = df_race_results['status'].astype(str)
+    retired = ~(status.isin(NON_RETIREMENT_STATUSES) | status.str.match(r'^\+\d+ Laps?$'))
+    df_retirements = df_race_results.loc[retired, RACE_KEY].reset_index(drop=True)
+
+    df_laps_completed = df_lap_times.groupby(RACE_KEY, observed=True)['lap'].max().rename('laps_completed').reset_index()
+    df_race_laps = df_lap_times.groupby(['season', 'round'])['lap'].max().rename('race_laps').reset_index()
+    df_retirements = df_retirements.merge(df_laps_completed, on=RACE_KEY, how='left')
+    df_retirements = df_retirements.merge(df_race_laps, on=['season', 'round'])
+    df_retirements['laps_completed'] = df_retirements['laps_completed'].fillna(0).astype(int)
+    return df_retirements[df_retirements['laps_completed'] < df_retirements['race_laps']].reset_index(drop=True)
+
+def find_missing_laps(df_retirements, df_lap_times):
+    """Lists the laps each retired driver did not complete, one row per lap, with the index of its retirement.
+
+    Every retirement is expanded to all the laps of its race and the recorded lap times are
+    reindexed onto them, so the laps left without a time are the ones to impute.
+    """
+    race_laps = df_retirements['race_laps'].to_numpy()
+    retirement_index = np.repeat(np.arange(len(df_retirements)), race_laps)
+    laps = np.arange(race_laps.sum()) - np.repeat(np.cumsum(race_laps) - race_laps, race_laps) + 1
+
+    df_race_laps = df_retirements[RACE_KEY].iloc[retirement_index].reset_index(drop=True)
+    df_race_laps['lap'] = laps
+    df_race_laps['retirement'] = retirement_index
+
+    recorded = df_lap_times.set_index(RACE_KEY + ['lap'])['lap_time_seconds']
+    recorded = recorded.reindex(pd.MultiIndex.from_frame(df_race_laps[RACE_KEY + ['lap']]))
+    return df_race_laps[recorded.isna().to_numpy()].reset_index(drop=True)
+
+def historical_baselines(df_retirements, df_lap_times, df_race_schedule, lower_percentile=1, upper_percentile=99):
+    """Returns the trimmed mean and median lap time of each retired driver at the race's circuit in earlier seasons.
+
+    Laps outside the percentiles of the driver's history at the circuit are dropped first. All
+    retirements are handled by one grouped quantile over the history joined to them.
+    """
+    df_circuits = df_race_schedule[['season', 'round', 'circuitId']]
+    df_history = df_lap_times[RACE_KEY + ['lap_time_seconds']].merge(df_circuits, on=['season', 'round'])
+    df_history = df_history.rename(columns={'season': 'history_season'}).drop(columns='round')
+
+    df_targets = df_retirements[RACE_KEY].merge(df_circuits, on=['season', 'round'])
+    df_targets['retirement'] = df_targets.index
+    df_history = df_targets[['retirement', 'season', 'driverId', 'circuitId']].merge(df_history, on=['driverId', 'circuitId'])
+    df_history = df_history[df_history['history_season'] < df_history['season']]
+
+    lap_times = df_history.groupby('retirement')['lap_time_seconds']
+    lower_limit = lap_times.transform('quantile', lower_percentile / 100)
+    upper_limit = lap_times.transform('quantile', upper_percentile / 100)
+    df_history = df_history[df_history['lap_time_seconds'].between(lower_limit, upper_limit)]
+
+    df_history = df_history.assign(lap_time_seconds=df_history['lap_time_seconds'].astype('float64'))
+    return df_history.groupby('retirement')['lap_time_seconds'].agg(['mean', 'median'])
+
+def impute_lap_times_mean_median(df_lap_times, df_race_results, df_race_schedule, method='mean'):
+    """Imputes the laps every retired driver did not complete with their historical mean or median lap time at the circuit.
+
+    Returns one row per imputed lap. Retirements of drivers with no earlier race at the circuit
+    have no baseline and are left out.
+    """
+    if method not in ('mean', 'median'):
+        raise ValueError("Invalid method specified. Use 'mean' or 'median'.")
+
+    df_retirements = find_retirements(df_lap_times, df_race_results)
+    df_baselines = historical_baselines(df_retirements, df_lap_times, df_race_schedule)
+    df_imputed = find_missing_laps(df_retirements, df_lap_times)
+
+    df_imputed['lap_time_seconds'] = df_imputed['retirement'].map(df_baselines[method]).round(3)
+    df_imputed['method'] = method
+    df_imputed = df_imputed.dropna(subset=['lap_time_seconds'])
+    return df_imputed.drop(columns='retirement').reset_index(drop=True)
+
+# Laps slower than this share of the driver's median lap of the race (spins, damage, traffic)
+# are left out of the trend fits.
+TREND_OUTLIER_FACTOR = 1.07
+
+def add_tyre_age(df_laps, df_pit_stops):
+    """Adds the number of laps since the driver's last pit stop (or the start) to every lap."""
+    df_stop_laps = df_pit_stops[RACE_KEY + ['lap']].drop_duplicates().rename(columns={'lap': 'stop_lap'})
+    df_stop_laps['stop_lap'] = df_stop_laps['stop_lap'].astype(df_laps['lap'].dtype)
+    df_laps = pd.merge_asof(
+        df_laps.sort_values('lap'), df_stop_laps.sort_values('stop_lap'),
+        left_on='lap', right_on='stop_lap', by=RACE_KEY, allow_exact_matches=False
+    )
+    df_laps['tyre_age'] = df_laps['lap'] - df_laps['stop_lap'].fillna(0)
+    return df_laps.drop(columns='stop_lap')
+
+def fit_lap_trends(df_laps):
+    """Fits every race's lap times by least squares as a driver's base pace plus fuel burn per lap and tyre wear per lap of the stint.
+
+    All drivers of a race share the fuel and tyre slopes and are fitted together in one closed-form
+    solve. Returns the slopes per race and the base pace per driver.
+    """
+    race_trends = []
+    driver_paces = []
+    for (season, round_num), df_race in df_laps.groupby(['season', 'round']):
+        drivers = df_race['driverId'].astype(str).to_numpy()
+        driver_names, driver_codes = np.unique(drivers, return_inverse=True)
+        design = np.zeros((len(df_race), len(driver_names) + 2))
+        design[np.arange(len(df_race)), driver_codes] = 1
+        design[:, -2] = df_race['lap'].to_numpy()
+        design[:, -1] = df_race['tyre_age'].to_numpy()
+        lap_times = df_race['lap_time_seconds'].to_numpy(dtype='float64')
+        coefficients, _, rank, _ = np.linalg.lstsq(design, lap_times, rcond=None)
+        if rank < design.shape[1]:
+            # Without stops in the race, tyre age is the lap minus a constant per driver and the wear
+            # cannot be told apart from the fuel burn, so the lap slope takes both.
+            coefficients = np.append(np.linalg.lstsq(design[:, :-1], lap_times, rcond=None)[0], 0.0)
+        race_trends.append((season, round_num, coefficients[-2], coefficients[-1]))
+        driver_paces.append(pd.DataFrame({'season': season, 'round': round_num, 'driverId': driver_names, 'base_pace': coefficients[:-2]}))
+
+    df_race_trends = pd.DataFrame(race_trends, columns=['season', 'round', 'fuel_slope', 'tyre_slope'])
+    df_driver_paces = pd.concat(driver_paces, ignore_index=True) if driver_paces else pd.DataFrame(columns=RACE_KEY + ['base_pace'])
+    return df_race_trends, df_driver_paces
+
+def impute_lap_times_least_squares(df_lap_times, df_race_results, df_race_schedule, df_pit_stops=None):
+    """Imputes the laps every retired driver did not complete from the lap time trends of their race.
+
+    The trends are fitted on the clean laps of the races with retirements (no lap 1, in- and out-laps,
+    neutralized laps or outliers), and each missed lap is predicted from the driver's base pace, the lap
+    and the age of the tyres they retired on. Drivers who retired before a clean lap get the median base
+    pace of the race. The pit stops are loaded unless given.
+    """
+    if df_pit_stops is None:
+        df_pit_stops = load_pit_stop_data()
+    df_retirements = find_retirements(df_lap_times, df_race_results)
+    df_imputed = find_missing_laps(df_retirements, df_lap_times)
+
+    df_races = df_retirements[['season', 'round']].drop_duplicates()
+    df_laps = df_lap_times[RACE_KEY + ['lap', 'lap_time_seconds']].merge(df_races, on=['season', 'round'])
+    df_laps = mark_pit_laps(df_laps, df_pit_stops).merge(flag_neutralized_laps(df_laps), on=['season', 'round', 'lap'])
+    driver_median = df_laps.groupby(RACE_KEY, observed=True)['lap_time_seconds'].transform('median')
+    clean_lap = ~(df_laps['in_lap'] | df_laps['out_lap'] | df_laps['neutralized'] | (df_laps['lap'] == 1))
+    df_laps = df_laps[clean_lap & (df_laps['lap_time_seconds'] <= driver_median * TREND_OUTLIER_FACTOR)]
+    df_race_trends, df_driver_paces = fit_lap_trends(add_tyre_age(df_laps, df_pit_stops))
+
+    df_driver_paces['driverId'] = df_driver_paces['driverId'].astype(df_imputed['driverId'].dtype)
+    df_imputed = add_tyre_age(df_imputed, df_pit_stops).sort_values(['retirement', 'lap'], ignore_index=True)
+    df_imputed = df_imputed.merge(df_race_trends, on=['season', 'round'], how='left')
+    df_imputed = df_imputed.merge(df_driver_paces, on=RACE_KEY, how='left')
+    race_pace = df_driver_paces.groupby(['season', 'round'])['base_pace'].median().rename('race_pace').reset_index()
+    df_imputed = df_imputed.merge(race_pace, on=['season', 'round'], how='left')
+    base_pace = df_imputed['base_pace'].fillna(df_imputed['race_pace'])
+
+    df_imputed['lap_time_seconds'] = (base_pace + df_imputed['fuel_slope'] * df_imputed['lap'] + df_imputed['tyre_slope'] * df_imputed['tyre_age']).round(3)
+    df_imputed['method'] = 'least_squares'
+    df_imputed = df_imputed.dropna(subset=['lap_time_seconds'])
+    return df_imputed[RACE_KEY + ['lap', 'lap_time_seconds', 'method']].reset_index(drop=True)
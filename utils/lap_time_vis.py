@@ -1,40 +1,30 @@
-import pandas as pd
 import plotly.express as px
+from utils.loaders import (
+    load_race_lap_times,
+    load_race_schedule_data,
+)
+from utils.aggregates import query_imputed_lap_times
+from utils.figure_cache import cached_figure
+from utils.frame_cache import cached_frame
 
-def load_lap_times_data():
-    """Loads the lap times data from concatenated CSV files."""
-    file_paths = [f'./Datasets/lap_times_{year}.csv' for year in range(2017, 2025)]
-    dataframes = [pd.read_csv(file) for file in file_paths]
-    lap_times_df = pd.concat(dataframes, ignore_index=True)
-    return lap_times_df
-
-def convert_time_to_seconds(time_str):
-    """Converts lap time from string format 'M:SS.mmm' to seconds."""
-    minutes, seconds = time_str.split(':')
-    total_seconds = int(minutes) * 60 + float(seconds)
-    return total_seconds
-
-def plot_driver_lap_times(year, round_num, lower_percentile=5, upper_percentile=95):
-    """Plots a box plot of lap times for all drivers in a given race, filtering out extreme outliers."""
-    
-    lap_times_df = load_lap_times_data()
-    race_schedule_df = pd.read_csv('./Datasets/race_schedule.csv')
-    
-    race_name = race_schedule_df[(race_schedule_df['season'] == year) & 
-                                 (race_schedule_df['round'] == round_num)]['raceName'].values[0]
+@cached_frame
+def compute_driver_lap_times(year, round_num, lower_percentile=5, upper_percentile=95):
+    """Returns the lap times of every driver in a given race between two percentiles, leaving out extreme outliers."""
+    lap_times_df = load_race_lap_times(year, round_num)
     
-    lap_times_df = lap_times_df[(lap_times_df['season'] == year) & (lap_times_df['round'] == round_num)]
-    
-    lap_times_df['lap_time_seconds'] = lap_times_df['time'].apply(convert_time_to_seconds)
+    # Lap times are stored as float32; round back to the millisecond timing precision for display.
+    lap_times_df['lap_time_seconds'] = lap_times_df['lap_time_seconds'].astype('float64').round(3)
     
     lower_limit = lap_times_df['lap_time_seconds'].quantile(lower_percentile / 100)
     upper_limit = lap_times_df['lap_time_seconds'].quantile(upper_percentile / 100)
     
-    lap_times_filtered = lap_times_df[
+    return lap_times_df[
         (lap_times_df['lap_time_seconds'] >= lower_limit) &
         (lap_times_df['lap_time_seconds'] <= upper_limit)
     ]
-    
+
+def render_driver_lap_times(lap_times_filtered, race_name, df_imputed=None, imputation_method=None):
+    """Draws the box plot of lap times per driver from compute_driver_lap_times, with the imputed laps as markers when given."""
     fig = px.box(
         lap_times_filtered,
         x='driverId',
@@ -43,6 +33,17 @@ def plot_driver_lap_times(year, round_num, lower_percentile=5, upper_percentile=
         labels={'lap_time_seconds': 'Lap Time (seconds)', 'driverId': 'Driver'}
     )
     
+    if df_imputed is not None:
+        fig.add_scatter(
+            x=df_imputed['driverId'].astype(str),
+            y=df_imputed['lap_time_seconds'],
+            mode='markers',
+            marker=dict(symbol='x', color='crimson'),
+            name=f'Imputed laps ({imputation_method})',
+            customdata=df_imputed['lap'],
+            hovertemplate='Lap %{customdata}: %{y:.3f}s<extra></extra>'
+        )
+    
     fig.update_layout(
         xaxis_title='Driver',
         yaxis_title='Lap Time (seconds)',
@@ -52,4 +53,19 @@ def plot_driver_lap_times(year, round_num, lower_percentile=5, upper_percentile=
         hoverlabel=dict(bgcolor="white", font_size=12, font_family="Arial")
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+@cached_figure
+def plot_driver_lap_times(year, round_num, lower_percentile=5, upper_percentile=95, imputation_method=None):
+    """Plots a box plot of lap times for all drivers in a given race, filtering out extreme outliers.
+
+    With an imputation_method ('mean', 'median' or 'least_squares'), the laps imputed for the drivers who retired are overlaid as markers.
+    """
+    race_schedule_df = load_race_schedule_data()
+    
+    race_name = race_schedule_df[(race_schedule_df['season'] == year) & 
+                                 (race_schedule_df['round'] == round_num)]['raceName'].values[0]
+    
+    lap_times_filtered = compute_driver_lap_times(year, round_num, lower_percentile, upper_percentile)
+    df_imputed = query_imputed_lap_times(year, round_num, imputation_method) if imputation_method else None
+    return render_driver_lap_times(lap_times_filtered, race_name, df_imputed, imputation_method)
\ No newline at end of file
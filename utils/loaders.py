@@ -0,0 +1,253 @@
+"""Loaders of the datasets shared by the charts.
+
+The driverId, constructorId, raceName, status and circuitName columns are encoded as categoricals
+over the vocabulary of utils/vocabulary.py, so filters, groupbys and merges between datasets work on
+integer codes. The yearly lap_times_{season}.csv files are discovered in the Datasets directory and
+each is read on first use. The seasons and rounds offered by the app come from a cached catalogue of
+the schedule, results, pit stops and lap times, which is rebuilt when a file changes.
+"""
+import io
+import os
+import re
+import numpy as np
+import pandas as pd
+from utils.datasets import load_dataset, read_table, replace_values, dataset_dtypes, dataset_seasons
+from utils.vocabulary import apply_vocabulary
+
+def read_encoded_table(file_path):
+    """Reads a dataset file and encodes its id and name columns with the shared vocabulary."""
+    return apply_vocabulary(read_table(file_path))
+
+def load_race_schedule_data():
+    """Loads the race schedule data from CSV."""
+    return load_dataset('race_schedule', ['race_schedule.csv'], read_encoded_table)
+
+def read_race_results(file_path):
+    """Reads the race results CSV, merging alphatauri into rb and dropping discontinued teams."""
+    df = read_table(file_path)
+    df['constructorId'] = replace_values(df['constructorId'], {'alphatauri': 'rb'})
+    discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
+    df = df[~df['constructorId'].isin(discontinued_teams)]
+    return apply_vocabulary(df)
+
+def load_race_results_data():
+    """Loads the race results data from CSV."""
+    return load_dataset('race_results', ['race_results.csv'], read_race_results)
+
+def read_driver_info(file_path):
+    """Reads the driver information CSV and parses the dates of birth."""
+    df_driver_info = read_table(file_path)
+    df_driver_info['dateOfBirth'] = pd.to_datetime(df_driver_info['dateOfBirth'])
+    return apply_vocabulary(df_driver_info)
+
+def load_driver_info():
+    """Loads the driver information from CSV."""
+    return load_dataset('driver_info', ['driver_info.csv'], read_driver_info)
+
+def load_mechanical_issues_data():
+    """Loads the occurrences of each mechanical finishing status from CSV."""
+    return load_dataset('mechanical_issues', ['finishing_status_mechanica_issues_2017_2024.csv'], read_encoded_table)
+
+def load_pit_stop_data():
+    """Loads the pit stop data from CSV."""
+    return load_dataset('pit_results', ['pit_results.csv'], read_encoded_table)
+
+def read_driver_standings(file_path):
+    """Reads the driver standings CSV, renaming AlphaTauri to RB."""
+    df = read_table(file_path)
+
+    df['constructorId'] = replace_values(df['constructorId'], {'alphatauri': 'rb'})
+    df['constructorName'] = df['constructorName'].replace({'AlphaTauri': 'RB F1 Team'})
+    
+    return apply_vocabulary(df)
+
+def load_driver_standings_data():
+    """Loads and updates the driver standings data."""
+    return load_dataset('driver_standings', ['driver_standings.csv'], read_driver_standings)
+
+def read_constructor_standings(file_path):
+    """Reads the constructor standings CSV, renaming AlphaTauri to RB."""
+    df = read_table(file_path)
+
+    df['constructorId'] = replace_values(df['constructorId'], {'alphatauri': 'rb'})
+    df['constructorName'] = df['constructorName'].replace({'AlphaTauri': 'RB F1 Team'})
+    
+    return apply_vocabulary(df)
+
+def load_constructor_standings_data():
+    """Loads and updates the constructor standings data."""
+    return load_dataset('constructor_standings', ['constructor_standings.csv'], read_constructor_standings)
+
+def convert_times_to_seconds(times):
+    """Converts a column of lap times in 'M:SS.mmm' or 'H:MM:SS.mmm' format to seconds, with NaN for malformed values."""
+    text = pd.Series(times).astype(str).str.strip()
+    well_formed = text.str.fullmatch(r'\d+(?::\d+){0,2}(?:\.\d+)?')
+    parts = text.where(well_formed).str.split(':', expand=True)
+
+    # Values have one to three parts, so each part shifts the ones before it up by a factor of 60.
+    seconds = pd.Series(0.0, index=text.index)
+    for column in parts.columns:
+        part = pd.to_numeric(parts[column], errors='coerce')
+        seconds = seconds.mask(part.notna(), seconds * 60 + part)
+    return seconds.where(well_formed)
+
+def read_lap_times(*file_paths):
+    """Reads and concatenates the yearly lap times files, adding the lap times in seconds."""
+    dataframes = []
+    for file in file_paths:
+        df = read_table(file)
+        if 'lap_time_seconds' not in df:
+            df['lap_time_seconds'] = convert_times_to_seconds(df['time']).astype('float32')
+        # Sharing the categories lets the concatenation keep driverId categorical.
+        dataframes.append(apply_vocabulary(df))
+    lap_times_df = pd.concat(dataframes, ignore_index=True)
+    return apply_vocabulary(lap_times_df)
+
+def lap_times_file_names(seasons=None):
+    """Returns the names of the yearly lap times files in the Datasets directory, or of those of the given seasons."""
+    return [f'lap_times_{year}.csv' for year in dataset_seasons('lap_times') if seasons is None or year in seasons]
+
+def empty_lap_times():
+    """Returns the lap times frame of seasons or races without lap times."""
+    return apply_vocabulary(pd.DataFrame(columns=['season', 'round', 'lap', 'position', 'driverId', 'time', 'lap_time_seconds']))
+
+def load_season_lap_times(year):
+    """Loads the lap times of one season from its yearly file."""
+    return load_dataset(f'lap_times_{year}', [f'lap_times_{year}.csv'], read_lap_times)
+
+def concat_season_lap_times(*file_paths):
+    """Concatenates the lap times of the seasons of the given yearly files, loading each season on first use."""
+    years = [int(re.search(r'lap_times_(\d{4})', os.path.basename(path)).group(1)) for path in file_paths]
+    return apply_vocabulary(pd.concat([load_season_lap_times(year) for year in years], ignore_index=True))
+
+def load_lap_times_data(seasons=None):
+    """Loads the lap times of every season, or of the given seasons, reading each season's file on first use.
+
+    The concatenation is cached as well, so the sessions asking for the same seasons share one frame.
+    """
+    file_names = lap_times_file_names(seasons)
+    if not file_names:
+        return empty_lap_times()
+    name = 'lap_times_all' if seasons is None else 'lap_times_seasons_' + '_'.join(file_name[10:14] for file_name in file_names)
+    return load_dataset(name, file_names, concat_season_lap_times)
+
+def read_race_catalogue(*file_paths):
+    """Builds the catalogue of races in the lap times files, with the rows and bytes each race occupies."""
+    catalogues = []
+    for file_path in file_paths:
+        if file_path.endswith('.parquet'):
+            df = pd.read_parquet(file_path, columns=['season', 'round', 'lap'])
+        else:
+            df = pd.read_csv(file_path, usecols=['season', 'round', 'lap'])
+
+        df['row'] = np.arange(len(df))
+        catalogue = df.groupby(['season', 'round'], sort=False).agg(
+            first_row=('row', 'min'),
+            last_row=('row', 'max'),
+            laps=('lap', 'max'),
+        ).reset_index()
+        catalogue['file_path'] = file_path
+
+        if not file_path.endswith('.parquet'):
+            # Byte offset of every line, so a race can be read without parsing the rest of the file.
+            with open(file_path, 'rb') as file:
+                data = np.frombuffer(file.read(), dtype=np.uint8)
+            line_starts = np.concatenate([[0], np.flatnonzero(data == ord('\n')) + 1, [len(data)]])
+            catalogue['byte_start'] = line_starts[catalogue['first_row'] + 1]
+            catalogue['byte_end'] = line_starts[np.minimum(catalogue['last_row'] + 2, len(line_starts) - 1)]
+
+        catalogues.append(catalogue)
+
+    df_catalogue = pd.concat(catalogues, ignore_index=True)
+    return df_catalogue.sort_values(['season', 'round'], ignore_index=True)
+
+def load_season_race_catalogue(year):
+    """Loads the catalogue of the races in one season's lap times file."""
+    return load_dataset(f'race_catalogue_{year}', [f'lap_times_{year}.csv'], read_race_catalogue)
+
+def load_race_catalogue(seasons=None):
+    """Loads the catalogue of the races that have lap times, in every season or the given ones, reading each season's file on first use."""
+    catalogues = [load_season_race_catalogue(year) for year in dataset_seasons('lap_times') if seasons is None or year in seasons]
+    if not catalogues:
+        return pd.DataFrame(columns=['season', 'round', 'first_row', 'last_row', 'laps', 'file_path'])
+    return pd.concat(catalogues, ignore_index=True)
+
+# The datasets the catalogue tracks, as accepted by available_seasons and available_rounds.
+CATALOGUE_DATASETS = ['schedule', 'results', 'pit_stops', 'lap_times']
+
+def read_dataset_catalogue(race_schedule_path, race_results_path, pit_results_path, *lap_times_paths):
+    """Builds the catalogue of every race in the datasets, flagging the ones with a schedule entry, results and pit stops.
+
+    Only the season and round columns are read. Lap times are flagged per season from the names of
+    the yearly files, without opening them; the rounds they cover are in the season's race catalogue.
+    """
+    races = {}
+    for column, path in [('schedule', race_schedule_path), ('results', race_results_path), ('pit_stops', pit_results_path)]:
+        races[column] = read_table(path, ['season', 'round']).drop_duplicates().set_index(['season', 'round'])
+
+    df_catalogue = pd.concat(races.values()).index.unique().to_frame(index=False)
+    df_catalogue = df_catalogue.sort_values(['season', 'round'], ignore_index=True)
+    keys = pd.MultiIndex.from_frame(df_catalogue)
+    for column, df_races in races.items():
+        df_catalogue[column] = keys.isin(df_races.index)
+
+    lap_seasons = [int(re.search(r'lap_times_(\d{4})', os.path.basename(path)).group(1)) for path in lap_times_paths]
+    df_catalogue['lap_times'] = df_catalogue['season'].isin(lap_seasons)
+    return df_catalogue
+
+def load_dataset_catalogue():
+    """Loads the catalogue of the seasons and rounds in the datasets, rebuilt when a file changes or a season's lap times are added."""
+    return load_dataset(
+        'dataset_catalogue',
+        ['race_schedule.csv', 'race_results.csv', 'pit_results.csv'] + lap_times_file_names(),
+        read_dataset_catalogue
+    )
+
+def available_seasons(dataset='results'):
+    """Returns the seasons with races in a dataset ('schedule', 'results', 'pit_stops' or 'lap_times'), latest first."""
+    df_catalogue = load_dataset_catalogue()
+    return sorted({int(season) for season in df_catalogue.loc[df_catalogue[dataset], 'season']}, reverse=True)
+
+def available_rounds(year, dataset='results'):
+    """Returns the rounds of a season with races in a dataset, in calendar order.
+
+    The rounds with lap times are read from the season's race catalogue, so only that season's file is scanned.
+    """
+    if dataset == 'lap_times':
+        if year not in dataset_seasons('lap_times'):
+            return []
+        return sorted(int(race_round) for race_round in load_season_race_catalogue(year)['round'])
+    df_catalogue = load_dataset_catalogue()
+    return sorted(int(race_round) for race_round in df_catalogue.loc[df_catalogue[dataset] & (df_catalogue['season'] == year), 'round'])
+
+def read_race_lap_times(file_path, year, round_num):
+    """Reads the lap times of a single race from its yearly lap times file."""
+    if file_path.endswith('.parquet'):
+        # Each round is its own row group, so the filter only reads that race.
+        df = pd.read_parquet(file_path, filters=[('round', '==', round_num)])
+    else:
+        catalogue = load_season_race_catalogue(year)
+        race = catalogue[(catalogue['season'] == year) & (catalogue['round'] == round_num)]
+        if race.empty:
+            df = pd.read_csv(file_path, nrows=0, dtype=dataset_dtypes(file_path))
+        else:
+            with open(file_path, 'rb') as file:
+                header = file.readline()
+                file.seek(int(race['byte_start'].iloc[0]))
+                rows = file.read(int(race['byte_end'].iloc[0] - race['byte_start'].iloc[0]))
+            df = pd.read_csv(io.BytesIO(header + rows), dtype=dataset_dtypes(file_path))
+
+    df = df[(df['season'] == year) & (df['round'] == round_num)].reset_index(drop=True)
+    if 'lap_time_seconds' not in df:
+        df['lap_time_seconds'] = convert_times_to_seconds(df['time']).astype('float32')
+    return apply_vocabulary(df)
+
+def load_race_lap_times(year, round_num):
+    """Loads the lap times of a single race without reading the other races, with no rows for a season without a lap times file."""
+    if year not in dataset_seasons('lap_times'):
+        return empty_lap_times()
+    return load_dataset(
+        f'lap_times_{year}_{round_num}',
+        [f'lap_times_{year}.csv'],
+        lambda file_path: read_race_lap_times(file_path, year, round_num)
+    )
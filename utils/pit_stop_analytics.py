@@ -0,0 +1,151 @@
+"""Stint reconstruction and pit stop analysis from the lap times.
+
+Each stop gets its in-lap and out-lap deltas, whether it fell under a safety car or red flag, and the
+gap gained on the car ahead when that car pitted within the next UNDERCUT_WINDOW laps (the undercut).
+"""
+import numpy as np
+import pandas as pd
+
+RACE_KEY = ['season', 'round', 'driverId']
+
+# A car ahead that pits within this many laps after the driver is treated as
+# the target of an undercut.
+UNDERCUT_WINDOW = 5
+
+# Laps where the field's median lap time is this much slower than the race's
+# typical lap are treated as run behind a safety car or under a red flag.
+NEUTRALIZED_FACTOR = 1.25
+
+def mark_pit_laps(df_laps, df_pit_stops):
+    """Flags every lap that ends in the pit lane (in-lap) or starts from it (out-lap)."""
+    df_pit_laps = df_pit_stops[RACE_KEY + ['lap']].drop_duplicates()
+    df_laps = df_laps.merge(df_pit_laps.assign(in_lap=True), on=RACE_KEY + ['lap'], how='left')
+    df_laps = df_laps.merge(df_pit_laps.assign(lap=df_pit_laps['lap'] + 1, out_lap=True), on=RACE_KEY + ['lap'], how='left')
+    df_laps['in_lap'] = df_laps['in_lap'].notna()
+    df_laps['out_lap'] = df_laps['out_lap'].notna()
+    return df_laps
+
+def add_race_time(df_laps):
+    """Adds each driver's cumulative race time at the end of every lap."""
+    df_laps = df_laps.sort_values(RACE_KEY + ['lap'], ignore_index=True)
+    df_laps['race_time'] = df_laps.groupby(RACE_KEY, observed=True)['lap_time_seconds'].cumsum()
+    return df_laps
+
+def flag_neutralized_laps(df_laps):
+    """Returns, for every race lap, whether it was neutralized and how many neutralized laps the race had up to it."""
+    df_field = df_laps.groupby(['season', 'round', 'lap'], observed=True)['lap_time_seconds'].median().rename('field_lap_time').reset_index()
+    typical_lap_time = df_field.groupby(['season', 'round'])['field_lap_time'].transform('median')
+    df_field['neutralized'] = df_field['field_lap_time'] > typical_lap_time * NEUTRALIZED_FACTOR
+    df_field['neutralized_laps'] = df_field.groupby(['season', 'round'])['neutralized'].cumsum()
+    return df_field[['season', 'round', 'lap', 'neutralized', 'neutralized_laps']]
+
+def reconstruct_stints(df_laps, df_pit_stops):
+    """Splits every driver's race into stints between pit stops, one row per stint.
+
+    Each stint runs from the lap after a stop (or lap 1) to the next in-lap (or the last lap).
+    Its pace is the mean lap time without lap 1 and the in- and out-laps.
+    """
+    df_laps = mark_pit_laps(df_laps, df_pit_stops)
+    df_stop_laps = df_pit_stops[RACE_KEY + ['lap']].drop_duplicates().sort_values('lap')
+    df_stop_laps['stops_before'] = df_stop_laps.groupby(RACE_KEY, observed=True).cumcount() + 1
+
+    # For each lap, the number of stops made on earlier laps is its stint number minus one.
+    df_laps = pd.merge_asof(
+        df_laps.sort_values('lap'), df_stop_laps, on='lap', by=RACE_KEY, allow_exact_matches=False
+    )
+    df_laps['stint'] = df_laps['stops_before'].fillna(0).astype(int) + 1
+
+    clean_lap = ~(df_laps['in_lap'] | df_laps['out_lap'] | (df_laps['lap'] == 1))
+    df_laps['clean_lap_time'] = df_laps['lap_time_seconds'].where(clean_lap)
+    df_stints = df_laps.groupby(RACE_KEY + ['stint'], observed=True).agg(
+        start_lap=('lap', 'min'),
+        end_lap=('lap', 'max'),
+        avg_lap_time=('clean_lap_time', 'mean'),
+    ).reset_index()
+    df_stints['stint_length'] = df_stints['end_lap'] - df_stints['start_lap'] + 1
+    return df_stints.sort_values(RACE_KEY + ['stint'], ignore_index=True)
+
+def analyse_pit_stops(df_laps, df_pit_stops):
+    """Adds in-lap and out-lap deltas, the stint each stop ends and the undercut gain to every pit stop.
+
+    Deltas are measured against the driver's median clean lap of the race, and neutralized marks
+    stops whose in- or out-lap ran behind a safety car or under a red flag. When the car ahead at the
+    end of the lap before the stop pits within UNDERCUT_WINDOW laps, undercut_gain is how much of the
+    gap to it the driver gained by the end of that car's out-lap (positive means gained), and
+    undercut_success whether the driver came out ahead.
+    """
+    df_laps = add_race_time(mark_pit_laps(df_laps, df_pit_stops))
+    clean_lap = ~(df_laps['in_lap'] | df_laps['out_lap'] | (df_laps['lap'] == 1))
+    df_reference = df_laps[clean_lap].groupby(RACE_KEY, observed=True)['lap_time_seconds'].median().rename('reference_lap_time').reset_index()
+    df_lap_times = df_laps[RACE_KEY + ['lap', 'position', 'lap_time_seconds', 'race_time']]
+
+    df_stops = df_pit_stops.assign(stop_order=np.arange(len(df_pit_stops))).sort_values(RACE_KEY + ['lap'], ignore_index=True)
+    df_stops['stint_length'] = df_stops['lap'] - df_stops.groupby(RACE_KEY, observed=True)['lap'].shift(fill_value=0)
+    df_stops = df_stops.merge(df_reference, on=RACE_KEY, how='left')
+    df_stops = df_stops.merge(
+        df_lap_times[RACE_KEY + ['lap', 'lap_time_seconds']].rename(columns={'lap_time_seconds': 'in_lap_time'}),
+        on=RACE_KEY + ['lap'], how='left'
+    )
+    # The out-lap follows the stop, so key it by the lap before it.
+    df_out_laps = df_lap_times[RACE_KEY + ['lap', 'lap_time_seconds']].rename(columns={'lap_time_seconds': 'out_lap_time'})
+    df_stops = df_stops.merge(df_out_laps.assign(lap=df_out_laps['lap'] - 1), on=RACE_KEY + ['lap'], how='left')
+    df_stops['in_lap_delta'] = df_stops['in_lap_time'] - df_stops['reference_lap_time']
+    df_stops['out_lap_delta'] = df_stops['out_lap_time'] - df_stops['reference_lap_time']
+    df_stops['pit_loss'] = df_stops['in_lap_delta'] + df_stops['out_lap_delta']
+
+    # Stops under a safety car or red flag cost far less (or far more) than a green-flag stop.
+    df_neutralized = flag_neutralized_laps(df_laps)
+    df_stops = df_stops.merge(df_neutralized[['season', 'round', 'lap', 'neutralized']], on=['season', 'round', 'lap'], how='left')
+    df_out_neutralized = df_neutralized[['season', 'round', 'lap', 'neutralized']].rename(columns={'neutralized': 'out_lap_neutralized'})
+    df_stops = df_stops.merge(df_out_neutralized.assign(lap=df_out_neutralized['lap'] - 1), on=['season', 'round', 'lap'], how='left')
+    df_stops['neutralized'] = df_stops['neutralized'].eq(True) | df_stops['out_lap_neutralized'].eq(True)
+    df_stops = df_stops.drop(columns='out_lap_neutralized')
+    df_stops = add_undercut_gains(df_stops, df_lap_times, df_neutralized)
+    return df_stops.sort_values('stop_order', ignore_index=True).drop(columns='stop_order')
+
+def add_undercut_gains(df_stops, df_lap_times, df_neutralized):
+    """Finds the car ahead before each stop and, when it pits soon after, the gap gained on it through the stops.
+
+    Exchanges with a neutralized lap between the two measurements are left out, since the field
+    bunches up behind the safety car whatever the strategy.
+    """
+    df_stops['stop_index'] = np.arange(len(df_stops))
+    df_before = df_lap_times.rename(columns={'lap': 'lap_before', 'position': 'position_before', 'race_time': 'race_time_before'})
+    df_before = df_before[RACE_KEY + ['lap_before', 'position_before', 'race_time_before']]
+    df_candidates = df_stops[['stop_index'] + RACE_KEY + ['lap']].assign(lap_before=df_stops['lap'] - 1)
+    df_candidates = df_candidates.merge(df_before, on=RACE_KEY + ['lap_before'])
+
+    # The rival is the car one position ahead at the end of the lap before the stop.
+    df_rivals = df_before.rename(columns={'driverId': 'rivalId', 'position_before': 'rival_position', 'race_time_before': 'rival_race_time_before'})
+    df_candidates['rival_position'] = df_candidates['position_before'] - 1
+    df_candidates = df_candidates.merge(df_rivals, on=['season', 'round', 'lap_before', 'rival_position'])
+
+    df_rival_stops = df_stops[RACE_KEY + ['lap']].rename(columns={'driverId': 'rivalId', 'lap': 'rival_stop_lap'})
+    df_candidates = df_candidates.merge(df_rival_stops, on=['season', 'round', 'rivalId'])
+    in_window = (df_candidates['rival_stop_lap'] > df_candidates['lap']) & (df_candidates['rival_stop_lap'] <= df_candidates['lap'] + UNDERCUT_WINDOW)
+    df_candidates = df_candidates[in_window].sort_values('rival_stop_lap').drop_duplicates('stop_index')
+
+    # Compare both cars once the rival has completed its out-lap.
+    df_candidates['lap_after'] = df_candidates['rival_stop_lap'] + 1
+    df_after = df_lap_times[RACE_KEY + ['lap', 'race_time']].rename(columns={'lap': 'lap_after', 'race_time': 'race_time_after'})
+    df_candidates = df_candidates.merge(df_after, on=RACE_KEY + ['lap_after'])
+    df_candidates = df_candidates.merge(
+        df_after.rename(columns={'driverId': 'rivalId', 'race_time_after': 'rival_race_time_after'}),
+        on=['season', 'round', 'rivalId', 'lap_after']
+    )
+    df_neutralized_laps = df_neutralized[['season', 'round', 'lap', 'neutralized_laps']]
+    df_candidates = df_candidates.merge(df_neutralized_laps.rename(columns={'lap': 'lap_before', 'neutralized_laps': 'neutralized_before'}), on=['season', 'round', 'lap_before'])
+    df_candidates = df_candidates.merge(df_neutralized_laps.rename(columns={'lap': 'lap_after', 'neutralized_laps': 'neutralized_after'}), on=['season', 'round', 'lap_after'])
+    df_candidates = df_candidates[df_candidates['neutralized_after'] == df_candidates['neutralized_before']]
+
+    gap_before = df_candidates['race_time_before'] - df_candidates['rival_race_time_before']
+    gap_after = df_candidates['race_time_after'] - df_candidates['rival_race_time_after']
+    df_candidates['undercut_gain'] = gap_before - gap_after
+    df_candidates['undercut_success'] = gap_after < 0
+
+    df_stops = df_stops.merge(
+        df_candidates[['stop_index', 'rivalId', 'rival_stop_lap', 'undercut_gain', 'undercut_success']],
+        on='stop_index', how='left'
+    )
+    df_stops['undercut_success'] = df_stops['undercut_success'].astype('boolean')
+    return df_stops.drop(columns='stop_index')
@@ -1,41 +1,18 @@
-import pandas as pd
 import plotly.express as px
-import os
-
-def load_pit_stop_data():
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'pit_results.csv')
-    df_pit_results = pd.read_csv(file_path)
-    return df_pit_results
-
-def load_race_results_data():
-    """Loads the race results data from CSV."""
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'race_results.csv')
-    df = pd.read_csv(file_path)
-    df['constructorId'] = df['constructorId'].replace({'alphatauri': 'rb'})
-    discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
-    df = df[~df['constructorId'].isin(discontinued_teams)]
-    return df
+from utils.loaders import load_pit_stop_data
+from utils.aggregates import query_pit_stops, query_pit_stints
+from utils.figure_cache import cached_figure
+from utils.frame_cache import cached_frame
+from utils.vocabulary import vocabulary_labels
 
-def plot_avg_pit_stop_duration_by_circuit(year):
-    """Plots the average pit stop duration by circuit for a given year."""
-    df_pit_results = load_pit_stop_data()
-    df_race_results = load_race_results_data()
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'race_schedule.csv')
-    race_schedule = pd.read_csv(file_path)
-    
-    df_race_results_reduced = df_race_results[['season', 'round', 'driverId', 'constructorId']]
-    df_pit_results = df_pit_results.merge(df_race_results_reduced, on=['season', 'round', 'driverId'], how='left')
-    
-    df_pit_results_with_circuits = df_pit_results.merge(
-        race_schedule[['season', 'round', 'circuitName']],
-        on=['season', 'round'],
-        how='left'
-    )
-    
-    df_pit_results_year = df_pit_results_with_circuits[df_pit_results_with_circuits['season'] == year]
-    
-    avg_pit_stop_duration = df_pit_results_year.groupby('circuitName')['duration'].mean().reset_index()
-    
+@cached_frame
+def compute_avg_pit_stop_duration_by_circuit(year):
+    """Returns the average pit stop duration at each circuit of a given year."""
+    df_pit_results_year = query_pit_stops(year)
+    return df_pit_results_year.groupby('circuitName', observed=True)['duration'].mean().reset_index()
+
+def render_avg_pit_stop_duration_by_circuit(avg_pit_stop_duration):
+    """Draws the bar chart of average pit stop duration by circuit from compute_avg_pit_stop_duration_by_circuit."""
     fig = px.bar(
         avg_pit_stop_duration,
         x='circuitName',
@@ -55,16 +32,19 @@ def plot_avg_pit_stop_duration_by_circuit(year):
 
     return fig
 
-def plot_pit_stop_duration_by_constructor(year):
-    df_pit_results = load_pit_stop_data()
-    df_race_results = load_race_results_data()
-
-    df_race_results_reduced = df_race_results[['season', 'round', 'driverId', 'constructorId']]
-    df_pit_results = df_pit_results.merge(df_race_results_reduced, on=['season', 'round', 'driverId'], how='left')
+@cached_figure
+def plot_avg_pit_stop_duration_by_circuit(year):
+    """Plots the average pit stop duration by circuit for a given year."""
+    return render_avg_pit_stop_duration_by_circuit(compute_avg_pit_stop_duration_by_circuit(year))
 
-    df_pit_results_year = df_pit_results[df_pit_results['season'] == year]
+@cached_frame
+def compute_pit_stop_duration_by_constructor(year):
+    """Returns the constructor and duration of every pit stop of a given year."""
+    return query_pit_stops(year)[['constructorId', 'duration']]
 
-    constructor_mean_durations = df_pit_results_year.groupby('constructorId')['duration'].mean()
+def render_pit_stop_duration_by_constructor(df_pit_results_year):
+    """Draws the box plot of pit stop durations by constructor from compute_pit_stop_duration_by_constructor."""
+    constructor_mean_durations = df_pit_results_year.groupby('constructorId', observed=True)['duration'].mean()
     sorted_constructors = constructor_mean_durations.sort_values(ascending=False).index.tolist()
 
     brand_colors = {
@@ -104,15 +84,24 @@ def plot_pit_stop_duration_by_constructor(year):
 
     return fig
 
-def plot_pit_stop_count_by_lap(year=None, round_num=None):
-    """Plots a histogram showing the count of pit stops by lap for a given year and round."""
-    df_pit_results = load_pit_stop_data()
+@cached_figure
+def plot_pit_stop_duration_by_constructor(year):
+    """Plots the distribution of pit stop durations by constructor for a given year, slowest on average first."""
+    return render_pit_stop_duration_by_constructor(compute_pit_stop_duration_by_constructor(year))
 
+@cached_frame
+def compute_pit_stop_count_by_lap(year=None, round_num=None):
+    """Returns the lap of every pit stop of a given year and round (every season or every round by default)."""
     if year:
-        df_pit_results = df_pit_results[df_pit_results['season'] == year]
-    if round_num:
+        df_pit_results = query_pit_stops(year, round_num)
+    else:
+        df_pit_results = load_pit_stop_data()
+    if round_num and not year:
         df_pit_results = df_pit_results[df_pit_results['round'] == round_num]
+    return df_pit_results[['lap']]
 
+def render_pit_stop_count_by_lap(df_pit_results):
+    """Draws the histogram of pit stops by lap from compute_pit_stop_count_by_lap."""
     fig = px.histogram(
         df_pit_results,
         x='lap',
@@ -129,4 +118,93 @@ def plot_pit_stop_count_by_lap(year=None, round_num=None):
         hoverlabel=dict(bgcolor="white", font_size=12, font_family="Arial")
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+@cached_figure
+def plot_pit_stop_count_by_lap(year=None, round_num=None):
+    """Plots a histogram showing the count of pit stops by lap for a given year and round."""
+    return render_pit_stop_count_by_lap(compute_pit_stop_count_by_lap(year, round_num))
+
+@cached_frame
+def compute_race_stints(year, round_num):
+    """Returns each driver's stints in a race with their first and last lap, length and average lap time."""
+    df_stints = query_pit_stints(year, round_num)
+    return df_stints.assign(driverId=vocabulary_labels(df_stints['driverId']), stint=df_stints['stint'].astype(str))
+
+def render_race_stints(df_stints):
+    """Draws each driver's stints as bars along the laps from compute_race_stints."""
+    driver_order = df_stints.groupby('driverId')['end_lap'].max().sort_values().index.tolist()
+
+    fig = px.bar(
+        df_stints,
+        x='stint_length',
+        y='driverId',
+        base=df_stints['start_lap'] - 1,
+        color='stint',
+        orientation='h',
+        labels={'stint_length': 'Laps', 'driverId': 'Driver', 'stint': 'Stint', 'avg_lap_time': 'Avg. Lap Time (s)'},
+        category_orders={'driverId': driver_order},
+        hover_data={'start_lap': True, 'end_lap': True, 'avg_lap_time': ':.3f'}
+    )
+
+    fig.update_layout(
+        xaxis_title='Lap',
+        yaxis_title='Driver',
+        plot_bgcolor='white',
+        paper_bgcolor='lightgray',
+        hoverlabel=dict(bgcolor="white", font_size=12, font_family="Arial")
+    )
+
+    return fig
+
+@cached_figure
+def plot_race_stints(year, round_num):
+    """Plots each driver's stints in a race as bars along the laps, coloured by stint and hovering the stint pace."""
+    df_stints = compute_race_stints(year, round_num)
+    if df_stints.empty:
+        return None
+    return render_race_stints(df_stints)
+
+@cached_frame
+def compute_undercut_gains(year):
+    """Returns the time gained or lost on the car ahead by every pit stop made first under green flag in a given year."""
+    df_pit_stops = query_pit_stops(year)
+    df_undercuts = df_pit_stops[df_pit_stops['undercut_gain'].notna() & ~df_pit_stops['neutralized']]
+    df_undercuts = df_undercuts.assign(
+        constructorId=vocabulary_labels(df_undercuts['constructorId']),
+        outcome=df_undercuts['undercut_success'].map({True: 'Passed', False: 'Stayed behind'})
+    )
+    return df_undercuts[['constructorId', 'driverId', 'rivalId', 'round', 'lap', 'outcome', 'undercut_gain']]
+
+def render_undercut_gains(df_undercuts):
+    """Draws the box plot of undercut gains by constructor from compute_undercut_gains."""
+    constructor_order = df_undercuts.groupby('constructorId')['undercut_gain'].median().sort_values(ascending=False).index.tolist()
+
+    fig = px.box(
+        df_undercuts,
+        x='constructorId',
+        y='undercut_gain',
+        points='all',
+        labels={'constructorId': 'Constructor', 'undercut_gain': 'Gap Gained (s)', 'outcome': 'Outcome'},
+        category_orders={'constructorId': constructor_order},
+        hover_data={'driverId': True, 'rivalId': True, 'round': True, 'lap': True, 'outcome': True, 'undercut_gain': ':.2f'}
+    )
+
+    fig.add_hline(y=0, line_dash='dash', line_color='gray')
+    fig.update_layout(
+        xaxis_title='Constructor',
+        yaxis_title='Gap Gained on the Car Ahead (s)',
+        plot_bgcolor='white',
+        paper_bgcolor='lightgray',
+        hoverlabel=dict(bgcolor="white", font_size=12, font_family="Arial")
+    )
+
+    return fig
+
+@cached_figure
+def plot_undercut_gains(year):
+    """Plots the time gained or lost on the car ahead by pitting first, per constructor, for a given year."""
+    df_undercuts = compute_undercut_gains(year)
+    if df_undercuts.empty:
+        return None
+    return render_undercut_gains(df_undercuts)
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""Asyncio JSON service for the data behind the charts.
+
+The endpoints call the compute_* functions of the utils/*_vis.py modules and the season and race
+queries. Responses are cached up to F1_API_CACHE_MB megabytes and carry an ETag derived from the dataset
+version, so a client sending it back in If-None-Match gets a 304 until the datasets change.
+POST /batch with {"requests": [{"endpoint": ..., "params": {...}}, ...]} answers several queries at once.
+"""
+import os
+import json
+import asyncio
+import inspect
+import hashlib
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+import pandas as pd
+from utils.datasets import dataset_version
+from utils.loaders import CATALOGUE_DATASETS, available_seasons, available_rounds
+from utils.aggregates import query_pit_stints, query_imputed_lap_times
+from utils.race_results_vis import (
+    compute_grid_vs_position,
+    compute_mechanical_issue_shares,
+    compute_mechanical_issues_by_constructor,
+    compute_avg_points_vs_age,
+    compute_avg_position_vs_age,
+    compute_avg_max_speed_vs_age,
+    compute_top_drivers_podiums,
+    compute_top_constructors_podiums,
+    compute_head_to_head_performance,
+    compute_teammate_matrix,
+)
+from utils.constructor_standing_vis import (
+    compute_constructor_ranking_vs_year,
+    compute_constructor_wins_vs_year,
+    compute_constructor_points_vs_year,
+    compute_constructor_points_distribution_per_year,
+    compute_overall_win_percentage,
+    compute_yearly_win_percentage,
+)
+from utils.driver_standing_vis import compute_top_drivers_by_points, compute_top_drivers_by_wins, compute_driver_progression
+from utils.pit_stop_vis import (
+    compute_avg_pit_stop_duration_by_circuit,
+    compute_pit_stop_duration_by_constructor,
+    compute_pit_stop_count_by_lap,
+    compute_undercut_gains,
+)
+from utils.race_schedule_vis import compute_circuit_world_map, compute_races_by_continent, compute_races_by_circuit, compute_races_by_country
+from utils.lap_time_vis import compute_driver_lap_times
+
+API_HOST = os.environ.get('F1_API_HOST', '127.0.0.1')
+API_PORT = int(os.environ.get('F1_API_PORT', '8600'))
+API_WORKERS = int(os.environ.get('F1_API_WORKERS', '4'))
+API_CACHE_MAX_BYTES = int(float(os.environ.get('F1_API_CACHE_MB', '32')) * 1024 * 1024)
+MAX_BATCH_REQUESTS = 50
+
+def season_range(value):
+    """Parses a season range given as '2017,2020' in a query string or as [2017, 2020] in a batch."""
+    seasons = value.split(',') if isinstance(value, str) else value
+    if len(seasons) != 2:
+        raise ValueError(f'season_range needs a first and a last season, got {value!r}')
+    return (int(seasons[0]), int(seasons[1]))
+
+def choice(values):
+    """Returns a parser accepting only the given values."""
+    def parse(value):
+        if value not in values:
+            raise ValueError(f'expected one of {", ".join(values)}')
+        return value
+    return parse
+
+# Type of every parameter the endpoints take, named as the arguments of the functions they call.
+PARAMETER_TYPES = {
+    'year': int,
+    'round_num': int,
+    'start_year': int,
+    'end_year': int,
+    'top': int,
+    'top_n': int,
+    'season_range': season_range,
+    'selected_season_range': season_range,
+    'driver_id': str,
+    'constructor_id': str,
+    'metric': choice(['race', 'grid']),
+    'lower_percentile': float,
+    'upper_percentile': float,
+    'method': str,
+    'dataset': choice(CATALOGUE_DATASETS),
+}
+
+# The data behind the dashboard's charts, served without building the figures. Each endpoint
+# calls a function returning a frame (or a list) and takes that function's arguments as parameters.
+ENDPOINTS = {
+    'seasons': available_seasons,
+    'rounds': available_rounds,
+    'schedule/circuits': compute_circuit_world_map,
+    'schedule/by-continent': compute_races_by_continent,
+    'schedule/by-circuit': compute_races_by_circuit,
+    'schedule/by-country': compute_races_by_country,
+    'drivers/top-points': compute_top_drivers_by_points,
+    'drivers/top-wins': compute_top_drivers_by_wins,
+    'drivers/progression': compute_driver_progression,
+    'drivers/podiums': compute_top_drivers_podiums,
+    'drivers/grid-vs-position': compute_grid_vs_position,
+    'drivers/avg-points-vs-age': compute_avg_points_vs_age,
+    'drivers/avg-position-vs-age': compute_avg_position_vs_age,
+    'drivers/avg-max-speed-vs-age': compute_avg_max_speed_vs_age,
+    'drivers/head-to-head': compute_head_to_head_performance,
+    'drivers/teammate-matrix': compute_teammate_matrix,
+    'constructors/ranking': compute_constructor_ranking_vs_year,
+    'constructors/wins': compute_constructor_wins_vs_year,
+    'constructors/points': compute_constructor_points_vs_year,
+    'constructors/points-distribution': compute_constructor_points_distribution_per_year,
+    'constructors/podiums': compute_top_constructors_podiums,
+    'constructors/win-percentage': compute_overall_win_percentage,
+    'constructors/yearly-win-percentage': compute_yearly_win_percentage,
+    'constructors/mechanical-issues': compute_mechanical_issues_by_constructor,
+    'mechanical-issues': compute_mechanical_issue_shares,
+    'pit-stops/average-by-circuit': compute_avg_pit_stop_duration_by_circuit,
+    'pit-stops/duration-by-constructor': compute_pit_stop_duration_by_constructor,
+    'pit-stops/count-by-lap': compute_pit_stop_count_by_lap,
+    'pit-stops/undercut-gains': compute_undercut_gains,
+    'pit-stops/stints': lambda year, round_num=None: query_pit_stints(year, round_num),
+    'laps/distribution': compute_driver_lap_times,
+    'laps/imputed': lambda year, round_num=None, method='median': query_imputed_lap_times(year, round_num, method),
+}
+
+class QueryError(Exception):
+    """A request the service cannot answer, with the HTTP status to answer it with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def bind_parameters(endpoint, params):
+    """Converts the parameters of a request and binds them to the endpoint's function, defaults filled in.
+
+    Binding first means the same query shares one cache entry however its parameters are written.
+    """
+    if endpoint not in ENDPOINTS:
+        raise QueryError(404, f'Unknown endpoint {endpoint!r}')
+    if not isinstance(params, dict):
+        raise QueryError(400, f'The parameters of {endpoint!r} must be an object')
+    signature = inspect.signature(ENDPOINTS[endpoint])
+    arguments = {}
+    for name, value in params.items():
+        if name not in signature.parameters:
+            raise QueryError(400, f'Unknown parameter {name!r} for {endpoint!r}')
+        try:
+            arguments[name] = None if value is None else PARAMETER_TYPES.get(name, str)(value)
+        except (TypeError, ValueError) as error:
+            raise QueryError(400, f'Invalid value {value!r} for {name!r}: {error}')
+    try:
+        bound = signature.bind(**arguments)
+    except TypeError as error:
+        raise QueryError(400, f'{endpoint}: {error}')
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+def query_etag(version, endpoint, arguments):
+    """Returns the entity tag of a query, which changes whenever the datasets change."""
+    key = json.dumps([endpoint, arguments], sort_keys=True, default=str)
+    return f'"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+def serialize_rows(result):
+    """Turns the result of an endpoint's function into JSON-ready rows."""
+    if isinstance(result, pd.DataFrame):
+        return json.loads(result.to_json(orient='records', date_format='iso'))
+    return result
+
+def run_query(endpoint, arguments, version):
+    """Runs an endpoint's function and returns its response body as JSON bytes."""
+    rows = serialize_rows(ENDPOINTS[endpoint](**arguments))
+    return json.dumps({
+        'endpoint': endpoint,
+        'params': arguments,
+        'dataset_version': version,
+        'rows': rows,
+    }, default=str).encode()
+
+def error_body(status, message, endpoint=None, params=None):
+    """Returns the JSON body of an error response."""
+    return json.dumps({'endpoint': endpoint, 'params': params, 'status': status, 'error': message}, default=str).encode()
+
+class QueryService:
+    """Answers queries on a thread pool, keeping the response bodies in a least-recently-used cache.
+
+    Responses are cached per dataset version, so a change to the datasets is picked up by the next
+    query. Identical queries arriving while one is being computed wait for that one.
+    """
+
+    def __init__(self, workers=API_WORKERS, max_bytes=API_CACHE_MAX_BYTES):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query-api')
+        self.max_bytes = max_bytes
+        self.responses = OrderedDict()
+        self.size = 0
+        self.pending = {}
+
+    def store(self, etag, body):
+        """Caches a response body, evicting the least recently used ones beyond the byte budget."""
+        self.responses[etag] = body
+        self.size += len(body)
+        while self.size > self.max_bytes and self.responses:
+            self.size -= len(self.responses.popitem(last=False)[1])
+
+    async def query(self, endpoint, params, version):
+        """Returns the entity tag and JSON body answering a query, computing it only when it is not cached."""
+        arguments = bind_parameters(endpoint, params)
+        etag = query_etag(version, endpoint, arguments)
+        if etag in self.responses:
+            self.responses.move_to_end(etag)
+            return etag, self.responses[etag]
+
+        if etag not in self.pending:
+            loop = asyncio.get_running_loop()
+            self.pending[etag] = loop.run_in_executor(self.executor, run_query, endpoint, arguments, version)
+        try:
+            body = await asyncio.shield(self.pending[etag])
+        except Exception as error:
+            raise QueryError(500, f'{endpoint}: {error!r}')
+        finally:
+            self.pending.pop(etag, None)
+        if etag not in self.responses:
+            self.store(etag, body)
+        return etag, body
+
+    async def batch(self, requests, version):
+        """Answers several queries at once, returning a combined entity tag and a body listing every response in order."""
+        if not isinstance(requests, list) or not requests:
+            raise QueryError(400, 'The body needs a non-empty "requests" list')
+        if len(requests) > MAX_BATCH_REQUESTS:
+            raise QueryError(400, f'A batch takes at most {MAX_BATCH_REQUESTS} requests')
+
+        async def answer(request):
+            if not isinstance(request, dict):
+                return None, error_body(400, f'A batch request must be an object, got {request!r}')
+            endpoint, params = request.get('endpoint'), request.get('params') or {}
+            try:
+                return await self.query(endpoint, params, version)
+            except QueryError as error:
+                return None, error_body(error.status, str(error), endpoint, params)
+
+        answers = await asyncio.gather(*(answer(request) for request in requests))
+        etag = f'"{version}-{hashlib.sha1(b"".join((etag or "").encode() for etag, _ in answers)).hexdigest()[:16]}"'
+        body = b'{"dataset_version": ' + json.dumps(version).encode() + b', "responses": [' + b', '.join(body for _, body in answers) + b']}'
+        return etag, body
+
+    async def respond(self, method, target, headers, body):
+        """Routes a request, returning the status, the entity tag (or None) and the JSON body of the response."""
+        url = urlsplit(target)
+        endpoint = url.path.strip('/')
+        version = dataset_version()
+
+        if endpoint == '':
+            listing = {name: list(inspect.signature(function).parameters) for name, function in ENDPOINTS.items()}
+            return 200, None, json.dumps({'dataset_version': version, 'endpoints': listing, 'batch': 'POST /batch'}).encode()
+        if endpoint == 'batch':
+            if method != 'POST':
+                raise QueryError(405, 'Send batches as POST /batch')
+            try:
+                requests = json.loads(body or b'{}').get('requests')
+            except (ValueError, AttributeError):
+                raise QueryError(400, 'The body is not a JSON object')
+            return (200, *await self.batch(requests, version))
+        if method != 'GET':
+            raise QueryError(405, f'{method} is not supported on {endpoint!r}')
+
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        try:
+            # The entity tag only depends on the query and the dataset version, so a client holding a
+            # fresh copy gets its answer without the query being looked up or computed.
+            if headers.get('if-none-match') == query_etag(version, endpoint, bind_parameters(endpoint, params)):
+                return 304, headers['if-none-match'], b''
+            return (200, *await self.query(endpoint, params, version))
+        except QueryError as error:
+            return error.status, None, error_body(error.status, str(error), endpoint, params)
+
+    async def handle_connection(self, reader, writer):
+        """Serves the HTTP/1.1 requests of a connection, keeping it open between requests unless asked to close."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, protocol = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length') or 0))
+
+                try:
+                    status, etag, payload = await self.respond(method, target, headers, body)
+                except QueryError as error:
+                    status, etag, payload = error.status, None, error_body(error.status, str(error))
+
+                keep_alive = protocol == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                response_headers = [
+                    f'HTTP/1.1 {status} {HTTP_REASONS.get(status, "")}',
+                    'Content-Type: application/json',
+                    f'Content-Length: {len(payload)}',
+                    'Cache-Control: no-cache',
+                    f'Connection: {"keep-alive" if keep_alive else "close"}',
+                ]
+                if etag:
+                    response_headers.append(f'ETag: {etag}')
+                writer.write(('\r\n'.join(response_headers) + '\r\n\r\n').encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=API_HOST, port=API_PORT):
+        """Listens for requests until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f'Serving the F1 query API on http://{host}:{port}/')
+        async with server:
+            await server.serve_forever()
+
+HTTP_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the data behind the dashboard charts as a JSON API.')
+    parser.add_argument('--host', default=API_HOST, help='Address to listen on (default: F1_API_HOST or 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=API_PORT, help='Port to listen on (default: F1_API_PORT or 8600)')
+    parser.add_argument('--workers', type=int, default=API_WORKERS, help='Threads computing responses (default: F1_API_WORKERS or 4)')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(QueryService(workers=args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Race replay of the Race Results section.
+
+The lap times of one race are loaded and each driver's race time is summed once. The replay then
+yields the running order, gap to the leader and interval one lap at a time, and the app draws each
+lap into the same placeholder.
+"""
+import numpy as np
+import plotly.express as px
+from utils.loaders import load_race_lap_times
+from utils.pit_stop_analytics import add_race_time
+
+def race_time_table(df_laps):
+    """Adds each driver's cumulative race time to a race's lap times and orders them by lap and position."""
+    df_laps = df_laps[['season', 'round', 'driverId', 'lap', 'position', 'lap_time_seconds']]
+    # Summing float32 lap times over a whole race drifts by milliseconds, so accumulate in float64.
+    df_laps = df_laps.assign(lap_time_seconds=df_laps['lap_time_seconds'].astype('float64'))
+    df_laps = add_race_time(df_laps)
+    df_laps['race_time'] = df_laps['race_time'].round(3)
+    return df_laps.sort_values(['lap', 'position'], ignore_index=True)
+
+def iter_race_frames(year, round_num):
+    """Yields the running order at the end of each lap of a race, one frame per lap.
+
+    Only the lap times of the selected race are loaded, and the gaps of a lap are worked out when
+    its frame is requested, so a replay can stop at any lap without computing the rest of the race.
+    Each frame has the driver's position, race time, gap to the leader and interval to the car ahead.
+    """
+    df_race = race_time_table(load_race_lap_times(year, round_num))
+    laps = df_race['lap'].to_numpy()
+    lap_starts = np.flatnonzero(np.r_[True, laps[1:] != laps[:-1]])
+    lap_ends = np.r_[lap_starts[1:], len(laps)]
+
+    for start, end in zip(lap_starts, lap_ends):
+        df_frame = df_race.iloc[start:end].reset_index(drop=True)
+        df_frame['gap_to_leader'] = df_frame['race_time'] - df_frame['race_time'].min()
+        df_frame['interval'] = df_frame['race_time'].diff().fillna(0).clip(lower=0)
+        yield df_frame
+
+def plot_race_replay_frame(df_frame, total_laps, max_gap=60):
+    """Plots the gap of every driver to the leader at the end of a lap, leader on top."""
+    lap = int(df_frame['lap'].iloc[0])
+    df_frame = df_frame.assign(
+        driverId=df_frame['driverId'].astype(str),
+        label=df_frame['gap_to_leader'].map(lambda gap: f'+{gap:.1f}s' if gap else 'Leader')
+    )
+
+    fig = px.bar(
+        df_frame,
+        x='gap_to_leader',
+        y='driverId',
+        orientation='h',
+        text='label',
+        title=f'Lap {lap} / {total_laps}',
+        labels={'gap_to_leader': 'Gap to Leader (s)', 'driverId': 'Driver'},
+        category_orders={'driverId': df_frame['driverId'].tolist()},
+        hover_data={'position': True, 'interval': ':.3f', 'race_time': ':.3f', 'label': False}
+    )
+
+    fig.update_traces(textposition='outside', cliponaxis=False)
+    fig.update_layout(
+        xaxis=dict(range=[0, max_gap]),
+        xaxis_title='Gap to Leader (seconds)',
+        yaxis_title='Driver',
+        height=600,
+        plot_bgcolor='white',
+        paper_bgcolor='lightgray',
+        hoverlabel=dict(bgcolor="white", font_size=12, font_family="Arial")
+    )
+
+    return fig
\ No newline at end of file
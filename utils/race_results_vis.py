@@ -1,43 +1,25 @@
 import plotly.express as px
 import pandas as pd
-import os
-
-def load_race_results_data():
-    """Loads the race results data from CSV."""
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'race_results.csv')
-    df = pd.read_csv(file_path)
-    df['constructorId'] = df['constructorId'].replace({'alphatauri': 'rb'})
-    discontinued_teams = ['toro_rosso', 'force_india', 'racing_point']
-    df = df[~df['constructorId'].isin(discontinued_teams)]
-    return df
-
-def load_driver_info():
-    """Loads the driver information from CSV."""
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'driver_info.csv')
-    df_driver_info = pd.read_csv(file_path)
-    df_driver_info['dateOfBirth'] = pd.to_datetime(df_driver_info['dateOfBirth'])
-    return df_driver_info
+from utils.loaders import load_race_results_data, load_mechanical_issues_data
+from utils.aggregates import PODIUM_COLUMNS, load_driver_season_totals, load_constructor_season_totals, season_range_totals, load_race_facts, load_teammate_head_to_head
+from utils.figure_cache import cached_figure
+from utils.frame_cache import cached_frame
+from utils.vocabulary import vocabulary_labels
 
 def get_merged_race_driver_data():
-    """Merges race results with driver info and calculates driver age at each race."""
-    df_race_results = load_race_results_data()
-    df_driver_info = load_driver_info()
-    
-    df_merged = pd.merge(df_race_results, df_driver_info[['driverId', 'dateOfBirth']], on='driverId')
-    
-    df_merged['date'] = pd.to_datetime(df_merged['date'])
-    
-    df_merged['age_at_race'] = (df_merged['date'] - df_merged['dateOfBirth']).dt.days / 365
-    
-    return df_merged
+    """Returns the race results with each driver's date of birth and age at each race."""
+    return load_race_facts()
 
-def plot_grid_vs_position(season_range):
-    """Creates a scatter plot showing the relationship between grid start and final position for a range of seasons."""
-    
+@cached_frame
+def compute_grid_vs_position(season_range):
+    """Returns the grid start and final position of every result in a range of seasons."""
     df_race_results = load_race_results_data()
 
     df_filtered = df_race_results[(df_race_results['season'] >= season_range[0]) & (df_race_results['season'] <= season_range[1])]
+    return df_filtered[['grid', 'position', 'constructorId', 'driverId', 'raceName', 'points']]
 
+def render_grid_vs_position(df_filtered):
+    """Draws the scatter plot of grid start against final position from compute_grid_vs_position."""
     brand_colors = {
         'mercedes': '#565F64',
         'ferrari': '#ff0000',
@@ -74,21 +56,43 @@ def plot_grid_vs_position(season_range):
 
     return fig
 
-def plot_mechanical_issues(selected_season_range):
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'finishing_status_mechanica_issues_2017_2024.csv')
-    df_mechanical_issues = pd.read_csv(file_path)
+@cached_figure
+def plot_grid_vs_position(season_range):
+    """Creates a scatter plot showing the relationship between grid start and final position for a range of seasons."""
+    return render_grid_vs_position(compute_grid_vs_position(season_range))
+
+@cached_frame
+def compute_mechanical_issue_shares():
+    """Returns the occurrences and share of every mechanical issue, grouping the issues under 2% as 'Other'."""
+    df_mechanical_issues = load_mechanical_issues_data()
     total_occurrences = df_mechanical_issues['count'].sum()
     df_mechanical_issues['percentage'] = (df_mechanical_issues['count'] / total_occurrences) * 100
     threshold = 2.0
     df_mechanical_issues['status_grouped'] = df_mechanical_issues.apply(
         lambda row: row['status'] if row['percentage'] >= threshold else 'Other', axis=1
     )
-    df_mechanical_issues_grouped = df_mechanical_issues.groupby('status_grouped').agg(
+    return df_mechanical_issues.groupby('status_grouped').agg(
         {'count': 'sum', 'percentage': 'sum'}
         ).reset_index()
+
+@cached_frame
+def compute_mechanical_issues_by_constructor(selected_season_range):
+    """Returns how often each constructor retired with each of the most common mechanical issues in a range of seasons."""
+    df_mechanical_issues_grouped = compute_mechanical_issue_shares()
     df_top_mechanical_issues = df_mechanical_issues_grouped[(df_mechanical_issues_grouped['percentage'] >= 5.0) & 
                                                         (df_mechanical_issues_grouped['status_grouped'] != 'Other')]
     
+    df_race_results = load_race_results_data()
+    df_filtered = df_race_results[(df_race_results['season'] >= selected_season_range[0]) & 
+                              (df_race_results['season'] <= selected_season_range[1])]
+    top_issues = df_top_mechanical_issues['status_grouped'].tolist()
+    df_filtered = df_filtered[df_filtered['status'].isin(top_issues)]
+    df_grouped = df_filtered.groupby(['season', 'constructorId', 'status'], observed=True).size().reset_index(name='count')
+    df_pivot = df_grouped.pivot_table(index=['constructorId', 'season'], columns='status', values='count', fill_value=0, observed=True).reset_index()
+    return pd.melt(df_pivot, id_vars=['constructorId', 'season'], var_name='issue', value_name='count')
+
+def render_mechanical_issues(df_mechanical_issues_grouped, df_issues_by_constructor):
+    """Draws the pie chart of mechanical issue shares and the stacked bar chart of issues per constructor."""
     fig_pie = px.pie(df_mechanical_issues_grouped, 
              values='percentage', 
              names='status_grouped', 
@@ -101,16 +105,7 @@ def plot_mechanical_issues(selected_season_range):
                       hovertemplate='<b>%{label}</b><br>Occurrences: %{customdata[0]}<br>Percentage: %{value:.2f}%')
     fig_pie.update_layout(showlegend=True, paper_bgcolor='lightgray')
     
-    df_race_results = load_race_results_data()
-    df_filtered = df_race_results[(df_race_results['season'] >= selected_season_range[0]) & 
-                              (df_race_results['season'] <= selected_season_range[1])]
-    top_issues = df_top_mechanical_issues['status_grouped'].tolist()
-    df_filtered = df_filtered[df_filtered['status'].isin(top_issues)]
-    df_grouped = df_filtered.groupby(['season', 'constructorId', 'status']).size().reset_index(name='count')
-    df_pivot = df_grouped.pivot_table(index=['constructorId', 'season'], columns='status', values='count', fill_value=0).reset_index()
-    df = pd.melt(df_pivot, id_vars=['constructorId', 'season'], var_name='issue', value_name='count')
-    
-    fig_stacked_bar = px.bar(df, 
+    fig_stacked_bar = px.bar(df_issues_by_constructor, 
                  x='constructorId', 
                  y='count', 
                  color='issue',
@@ -124,19 +119,26 @@ def plot_mechanical_issues(selected_season_range):
     
     return fig_pie, fig_stacked_bar
 
-def plot_avg_points_vs_age():
-    """Plot average points per season against age."""
-    df_driver_info = load_driver_info()
-    df_merged = get_merged_race_driver_data()
-    df_season_avg_points = df_merged.groupby(['driverId', 'season']).agg(
+@cached_figure
+def plot_mechanical_issues(selected_season_range):
+    """Plots the share of every mechanical issue and how often each constructor suffered the most common ones in a range of seasons."""
+    return render_mechanical_issues(compute_mechanical_issue_shares(), compute_mechanical_issues_by_constructor(selected_season_range))
+
+@cached_frame
+def compute_avg_points_vs_age():
+    """Returns every driver's average points in each season with their age at the start of the season."""
+    df_race_facts = load_race_facts()
+    df_season_avg_points = df_race_facts.groupby(['driverId', 'season'], observed=True).agg(
         avg_points=('points', 'mean'),
         first_race_date=('date', 'min'),
+        dateOfBirth=('dateOfBirth', 'first'),
     ).reset_index()
 
-    df_season_avg_points = pd.merge(df_season_avg_points, df_driver_info[['driverId', 'dateOfBirth']], on='driverId')
-    df_season_avg_points['age_at_start_of_season'] = (pd.to_datetime(df_season_avg_points['first_race_date']) - 
-                                                      pd.to_datetime(df_season_avg_points['dateOfBirth'])).dt.days / 365
+    df_season_avg_points['age_at_start_of_season'] = (df_season_avg_points['first_race_date'] - df_season_avg_points['dateOfBirth']).dt.days / 365
+    return df_season_avg_points
 
+def render_avg_points_vs_age(df_season_avg_points):
+    """Draws the scatter plot of average points against age from compute_avg_points_vs_age."""
     fig = px.scatter(df_season_avg_points, 
                      x='age_at_start_of_season', 
                      y='avg_points', 
@@ -151,19 +153,26 @@ def plot_avg_points_vs_age():
     ))
     return fig
 
-def plot_avg_position_vs_age():
-    """Plot average position per season against age."""
-    df_driver_info = load_driver_info()
-    df_merged = get_merged_race_driver_data()
-    df_season_avg_position = df_merged.groupby(['driverId', 'season']).agg(
+@cached_figure
+def plot_avg_points_vs_age():
+    """Plot average points per season against age."""
+    return render_avg_points_vs_age(compute_avg_points_vs_age())
+
+@cached_frame
+def compute_avg_position_vs_age():
+    """Returns every driver's average position in each season with their age at the start of the season."""
+    df_race_facts = load_race_facts()
+    df_season_avg_position = df_race_facts.groupby(['driverId', 'season'], observed=True).agg(
         avg_position=('position', 'mean'),
         first_race_date=('date', 'min'),
+        dateOfBirth=('dateOfBirth', 'first'),
     ).reset_index()
 
-    df_season_avg_position = pd.merge(df_season_avg_position, df_driver_info[['driverId', 'dateOfBirth']], on='driverId')
-    df_season_avg_position['age_at_start_of_season'] = (pd.to_datetime(df_season_avg_position['first_race_date']) - 
-                                                        pd.to_datetime(df_season_avg_position['dateOfBirth'])).dt.days / 365
+    df_season_avg_position['age_at_start_of_season'] = (df_season_avg_position['first_race_date'] - df_season_avg_position['dateOfBirth']).dt.days / 365
+    return df_season_avg_position
 
+def render_avg_position_vs_age(df_season_avg_position):
+    """Draws the scatter plot of average position against age from compute_avg_position_vs_age."""
     fig = px.scatter(df_season_avg_position, 
                      x='age_at_start_of_season', 
                      y='avg_position', 
@@ -179,19 +188,26 @@ def plot_avg_position_vs_age():
     ))
     return fig
 
-def plot_avg_max_speed_vs_age():
-    """Plot average max speed per season against age."""
-    df_driver_info = load_driver_info()
-    df_merged = get_merged_race_driver_data()
-    df_season_avg_speed = df_merged.groupby(['driverId', 'season']).agg(
+@cached_figure
+def plot_avg_position_vs_age():
+    """Plot average position per season against age."""
+    return render_avg_position_vs_age(compute_avg_position_vs_age())
+
+@cached_frame
+def compute_avg_max_speed_vs_age():
+    """Returns every driver's average max speed in each season with their age at the start of the season."""
+    df_race_facts = load_race_facts()
+    df_season_avg_speed = df_race_facts.groupby(['driverId', 'season'], observed=True).agg(
         avg_max_speed=('Max Avg Speed', 'mean'),
         first_race_date=('date', 'min'),
+        dateOfBirth=('dateOfBirth', 'first'),
     ).reset_index()
 
-    df_season_avg_speed = pd.merge(df_season_avg_speed, df_driver_info[['driverId', 'dateOfBirth']], on='driverId')
-    df_season_avg_speed['age_at_start_of_season'] = (pd.to_datetime(df_season_avg_speed['first_race_date']) - 
-                                                     pd.to_datetime(df_season_avg_speed['dateOfBirth'])).dt.days / 365
+    df_season_avg_speed['age_at_start_of_season'] = (df_season_avg_speed['first_race_date'] - df_season_avg_speed['dateOfBirth']).dt.days / 365
+    return df_season_avg_speed
 
+def render_avg_max_speed_vs_age(df_season_avg_speed):
+    """Draws the scatter plot of average max speed against age from compute_avg_max_speed_vs_age."""
     fig = px.scatter(df_season_avg_speed, 
                      x='age_at_start_of_season',
                      y='avg_max_speed',
@@ -207,24 +223,28 @@ def plot_avg_max_speed_vs_age():
     ))
     return fig
 
-def plot_top_drivers_podiums(top_n=6, season_range=(2017, 2024)):
-    """Plots a stacked bar chart showing podium counts for the top drivers over a specified season range."""
-    df_race_results = load_race_results_data()
-    
-    df_filtered = df_race_results[(df_race_results['season'] >= season_range[0]) & 
-                                  (df_race_results['season'] <= season_range[1])]
-    
-    df_podiums = df_filtered[df_filtered['position'].isin([1, 2, 3])]
-
-    df_podium_counts = df_podiums.groupby(['driverId', 'position']).size().reset_index(name='count')
+@cached_figure
+def plot_avg_max_speed_vs_age():
+    """Plot average max speed per season against age."""
+    return render_avg_max_speed_vs_age(compute_avg_max_speed_vs_age())
 
-    df_total_podiums = df_podium_counts.groupby('driverId')['count'].sum().reset_index(name='total_podiums')
+@cached_frame
+def compute_top_drivers_podiums(top_n=6, season_range=None):
+    """Returns the podium counts of the top drivers over a season range (every season by default), one row per driver and podium position."""
+    df_total_podiums = season_range_totals(load_driver_season_totals(), 'driverId', season_range)
+    df_total_podiums['total_podiums'] = df_total_podiums[PODIUM_COLUMNS].sum(axis=1)
     top_drivers = df_total_podiums.nlargest(top_n, 'total_podiums')['driverId'].tolist()
 
-    df_top_podiums = df_podium_counts[df_podium_counts['driverId'].isin(top_drivers)]
-    
-    df_top_podiums['position'] = df_top_podiums['position'].map({1: '1st', 2: '2nd', 3: '3rd'})
+    df_top_podiums = df_total_podiums[df_total_podiums['driverId'].isin(top_drivers)].melt(
+        id_vars='driverId', value_vars=PODIUM_COLUMNS, var_name='position', value_name='count'
+    )
+    df_top_podiums = df_top_podiums[df_top_podiums['count'] > 0].sort_values(['driverId', 'position'])
     
+    df_top_podiums['position'] = df_top_podiums['position'].map(dict(zip(PODIUM_COLUMNS, ['1st', '2nd', '3rd'])))
+    return df_top_podiums
+
+def render_top_drivers_podiums(df_top_podiums):
+    """Draws the stacked bar chart of podium counts from compute_top_drivers_podiums."""
     fig = px.bar(df_top_podiums, 
                  x='driverId', 
                  y='count', 
@@ -241,24 +261,28 @@ def plot_top_drivers_podiums(top_n=6, season_range=(2017, 2024)):
 
     return fig
 
-def plot_top_constructors_podiums(top_n=6, season_range=(2017, 2024)):
-    """Plots a stacked bar chart showing podium counts for the top constructors over a specified season range."""
-    df_race_results = load_race_results_data()
-    
-    df_filtered = df_race_results[(df_race_results['season'] >= season_range[0]) & 
-                                  (df_race_results['season'] <= season_range[1])]
-    
-    df_podiums = df_filtered[df_filtered['position'].isin([1, 2, 3])]
+@cached_figure
+def plot_top_drivers_podiums(top_n=6, season_range=None):
+    """Plots a stacked bar chart showing podium counts for the top drivers over a specified season range (every season by default)."""
+    return render_top_drivers_podiums(compute_top_drivers_podiums(top_n, season_range))
 
-    df_podium_counts = df_podiums.groupby(['constructorId', 'position']).size().reset_index(name='count')
-
-    df_total_podiums = df_podium_counts.groupby('constructorId')['count'].sum().reset_index(name='total_podiums')
+@cached_frame
+def compute_top_constructors_podiums(top_n=6, season_range=None):
+    """Returns the podium counts of the top constructors over a season range (every season by default), one row per constructor and podium position."""
+    df_total_podiums = season_range_totals(load_constructor_season_totals(), 'constructorId', season_range)
+    df_total_podiums['total_podiums'] = df_total_podiums[PODIUM_COLUMNS].sum(axis=1)
     top_constructors = df_total_podiums.nlargest(top_n, 'total_podiums')['constructorId'].tolist()
 
-    df_top_podiums = df_podium_counts[df_podium_counts['constructorId'].isin(top_constructors)]
-    
-    df_top_podiums['position'] = df_top_podiums['position'].map({1: '1st', 2: '2nd', 3: '3rd'})
+    df_top_podiums = df_total_podiums[df_total_podiums['constructorId'].isin(top_constructors)].melt(
+        id_vars='constructorId', value_vars=PODIUM_COLUMNS, var_name='position', value_name='count'
+    )
+    df_top_podiums = df_top_podiums[df_top_podiums['count'] > 0].sort_values(['constructorId', 'position'])
     
+    df_top_podiums['position'] = df_top_podiums['position'].map(dict(zip(PODIUM_COLUMNS, ['1st', '2nd', '3rd'])))
+    return df_top_podiums
+
+def render_top_constructors_podiums(df_top_podiums):
+    """Draws the stacked bar chart of podium counts from compute_top_constructors_podiums."""
     fig = px.bar(df_top_podiums, 
                  x='constructorId', 
                  y='count', 
@@ -275,46 +299,88 @@ def plot_top_constructors_podiums(top_n=6, season_range=(2017, 2024)):
 
     return fig
 
-def plot_head_to_head_performance(df_race_results, year, constructor_id):
-    """Plots head-to-head comparison of two drivers from the same constructor for a given year."""
+@cached_figure
+def plot_top_constructors_podiums(top_n=6, season_range=None):
+    """Plots a stacked bar chart showing podium counts for the top constructors over a specified season range (every season by default)."""
+    return render_top_constructors_podiums(compute_top_constructors_podiums(top_n, season_range))
+
+@cached_frame
+def compute_head_to_head_performance(year, constructor_id):
+    """Returns how often each driver of a constructor finished and started ahead of their teammate in a given year."""
+    df_head_to_head = load_teammate_head_to_head()
+    df_pairs = df_head_to_head[(df_head_to_head['season'] == year) & 
+                               (df_head_to_head['constructorId'] == constructor_id)]
     
-    df_filtered = df_race_results[(df_race_results['season'] == year) & 
-                                  (df_race_results['constructorId'] == constructor_id)]
-    
-    unique_drivers = df_filtered['driverId'].unique()
-    if len(unique_drivers) < 2:
-        return None, f"Less than 2 drivers found for {constructor_id} in {year}"
+    if df_pairs.empty:
+        return pd.DataFrame(columns=['Metric', 'Driver', 'Count'])
     
-    driver1, driver2 = unique_drivers[:2]
-    
-    driver1_race_wins = driver2_race_wins = 0
-    driver1_grid_wins = driver2_grid_wins = 0
-    
-    for _, race in df_filtered.groupby('round'):
-        race_data = race[['driverId', 'position', 'grid']]
-        race_driver1 = race_data[race_data['driverId'] == driver1]
-        race_driver2 = race_data[race_data['driverId'] == driver2]
-        
-        if not race_driver1.empty and not race_driver2.empty:
-            if race_driver1['position'].values[0] < race_driver2['position'].values[0]:
-                driver1_race_wins += 1
-            else:
-                driver2_race_wins += 1
-            
-            if race_driver1['grid'].values[0] < race_driver2['grid'].values[0]:
-                driver1_grid_wins += 1
-            else:
-                driver2_grid_wins += 1
+    # With a mid-season driver change there is one bar per teammate pairing.
+    if len(df_pairs) == 2:
+        drivers = df_pairs['driverId'].astype(str).tolist()
+    else:
+        drivers = (df_pairs['driverId'].astype(str) + ' vs ' + df_pairs['teammateId'].astype(str)).tolist()
     
     comparison_data = {
-        'Metric': ['Race Position Wins', 'Race Position Wins', 'Grid Position Wins', 'Grid Position Wins'],
-        'Driver': [driver1, driver2, driver1, driver2],
-        'Count': [driver1_race_wins, driver2_race_wins, driver1_grid_wins, driver2_grid_wins]
+        'Metric': ['Race Position Wins'] * len(drivers) + ['Grid Position Wins'] * len(drivers),
+        'Driver': drivers * 2,
+        'Count': df_pairs['race_wins'].tolist() + df_pairs['grid_wins'].tolist()
     }
-    df_comparison = pd.DataFrame(comparison_data)
+    return pd.DataFrame(comparison_data)
+
+def render_head_to_head_performance(df_comparison):
+    """Draws the grouped bar chart of a head-to-head comparison from compute_head_to_head_performance."""
+    return px.bar(df_comparison, x='Metric', y='Count', color='Driver',
+                  labels={'Count': 'Times Finished Ahead', 'Metric': 'Comparison'},
+                  barmode='group')
+
+@cached_figure
+def plot_head_to_head_performance(year, constructor_id):
+    """Plots head-to-head comparison of the drivers of a constructor for a given year."""
+    df_comparison = compute_head_to_head_performance(year, constructor_id)
+    if df_comparison.empty:
+        return None, f"Less than 2 drivers found for {constructor_id} in {year}"
+    return render_head_to_head_performance(df_comparison), None
+
+@cached_frame
+def compute_teammate_matrix(year, metric='race'):
+    """Returns how often every driver finished (or started, for metric='grid') ahead of each teammate in a given year, out of their races together."""
+    df_head_to_head = load_teammate_head_to_head()
+    df_year = df_head_to_head[df_head_to_head['season'] == year]
+    wins_column = 'race_wins' if metric == 'race' else 'grid_wins'
+    return pd.DataFrame({
+        'driverId': vocabulary_labels(df_year['driverId']),
+        'teammateId': vocabulary_labels(df_year['teammateId']),
+        'wins': df_year[wins_column],
+        'races': df_year['races'],
+    })
+
+def render_teammate_matrix(df_year):
+    """Draws the heatmap of teammate comparisons from compute_teammate_matrix."""
+    # Drivers are listed team by team, so each team's pairings form a block on the diagonal.
+    drivers = list(dict.fromkeys(df_year['driverId']))
+    df_wins = df_year.pivot_table(index='driverId', columns='teammateId', values='wins', aggfunc='sum').reindex(index=drivers, columns=drivers)
+    df_races = df_year.pivot_table(index='driverId', columns='teammateId', values='races', aggfunc='sum').reindex(index=drivers, columns=drivers)
+    df_share = df_wins / df_races * 100
+    cell_text = (df_wins.astype('Int64').astype(str) + '/' + df_races.astype('Int64').astype(str)).where(df_races.notna(), '')
     
-    fig = px.bar(df_comparison, x='Metric', y='Count', color='Driver',
-                 labels={'Count': 'Times Finished Ahead', 'Metric': 'Comparison'},
-                 barmode='group')
+    fig = px.imshow(
+        df_share,
+        labels={'x': 'Teammate', 'y': 'Driver', 'color': 'Times Ahead (%)'},
+        color_continuous_scale='Viridis',
+        zmin=0,
+        zmax=100,
+        aspect='auto'
+    )
+    fig.update_traces(
+        text=cell_text.to_numpy(),
+        texttemplate='%{text}',
+        hovertemplate='<b>%{y}</b> ahead of <b>%{x}</b>: %{text} (%{z:.0f}%)<extra></extra>'
+    )
+    fig.update_layout(margin=dict(l=50, r=50, t=50, b=50), paper_bgcolor='lightgray')
     
-    return fig, None
\ No newline at end of file
+    return fig
+
+@cached_figure
+def plot_teammate_matrix(year, metric='race'):
+    """Plots how often every driver finished (or started, for metric='grid') ahead of each teammate in a given year."""
+    return render_teammate_matrix(compute_teammate_matrix(year, metric))
\ No newline at end of file
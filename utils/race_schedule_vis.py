@@ -1,15 +1,23 @@
 import plotly.express as px
-import pandas as pd
-import os
+from utils.loaders import load_race_schedule_data
+from utils.figure_cache import cached_figure
+from utils.frame_cache import cached_frame
 
-def load_race_schedule_data():
-    file_path = os.path.join(os.path.dirname(__name__), '.', 'Datasets', 'race_schedule.csv')
-    return pd.read_csv(file_path)
-    
-def f1_circuit_world_map(year):
+def season_bounds(start_year=None, end_year=None):
+    """Fills in a missing first or last season with the first or last season of the race schedule."""
+    df_race_schedule = load_race_schedule_data()
+    start_year = int(df_race_schedule['season'].min()) if start_year is None else start_year
+    end_year = int(df_race_schedule['season'].max()) if end_year is None else end_year
+    return start_year, end_year
+
+@cached_frame
+def compute_circuit_world_map(year):
+    """Returns the races of a given year with the location of their circuits."""
     df_race_schedule = load_race_schedule_data()
-    df_filtered_by_year = df_race_schedule[df_race_schedule['season'] == year]
+    return df_race_schedule[df_race_schedule['season'] == year]
 
+def render_circuit_world_map(df_filtered_by_year, year):
+    """Draws the world map of the circuits of a year from compute_circuit_world_map."""
     fig = px.scatter_geo(df_filtered_by_year,
                          lat='location-lat',
                          lon='location-long',
@@ -58,9 +66,14 @@ def f1_circuit_world_map(year):
     
     return fig
 
+@cached_figure
+def f1_circuit_world_map(year):
+    """Creates a world map of the circuits raced on in a given year."""
+    return render_circuit_world_map(compute_circuit_world_map(year), year)
 
-def races_by_continent():
-    """Creates a scatter_geo plot showing the number of F1 races per continent."""
+@cached_frame
+def compute_races_by_continent():
+    """Returns the number and percentage of races held on every continent, with a point to place each continent on a map."""
     df_race_schedule = load_race_schedule_data()
 
     country_to_continent = {
@@ -110,7 +123,10 @@ def races_by_continent():
     
     continent_race_count['lat'] = continent_race_count['continent'].map(lambda x: continent_geo[x]['lat'])
     continent_race_count['long'] = continent_race_count['continent'].map(lambda x: continent_geo[x]['long'])
+    return continent_race_count
 
+def render_races_by_continent(continent_race_count, season_span):
+    """Draws the map of races per continent from compute_races_by_continent."""
     fig = px.scatter_geo(continent_race_count,
                          lat='lat',
                          lon='long',
@@ -119,7 +135,7 @@ def races_by_continent():
                          size='race_count',
                          size_max=20,
                          color='race_count',
-                         title='Number and Percentage of F1 Races by Continent (2017-2024)',
+                         title=f'Number and Percentage of F1 Races by Continent ({season_span})',
                          projection='equirectangular',
                          color_continuous_scale=px.colors.sequential.Plasma)
 
@@ -136,7 +152,7 @@ def races_by_continent():
             projection_scale=1.2
         ),
         title={
-        'text': 'F1 Races in Different Continents (2017-2024)',
+        'text': f'F1 Races in Different Continents ({season_span})',
         'x': 0.40,
         'xanchor': 'center',
         'yanchor': 'top'
@@ -153,15 +169,25 @@ def races_by_continent():
 
     return fig
 
-def races_by_circuit(start_year=2017, end_year=2024):
-    """Creates a bar chart showing the number of races by circuit for a specified year range."""
+@cached_figure
+def races_by_continent():
+    """Creates a scatter_geo plot showing the number of F1 races per continent."""
+    start_year, end_year = season_bounds()
+    return render_races_by_continent(compute_races_by_continent(), f'{start_year}-{end_year}')
+
+@cached_frame
+def compute_races_by_circuit(start_year=None, end_year=None):
+    """Returns the number of races held at every circuit in a year range (every season by default), most first."""
     df_race_schedule = load_race_schedule_data()
+    start_year, end_year = season_bounds(start_year, end_year)
 
     df_filtered = df_race_schedule[(df_race_schedule['season'] >= start_year) & (df_race_schedule['season'] <= end_year)]
  
-    circuit_race_count = df_filtered.groupby('circuitName').size().reset_index(name='count')
-    circuit_race_count = circuit_race_count.sort_values(by='count', ascending=False)
+    circuit_race_count = df_filtered.groupby('circuitName', observed=True).size().reset_index(name='count')
+    return circuit_race_count.sort_values(by='count', ascending=False)
 
+def render_races_by_circuit(circuit_race_count, start_year, end_year):
+    """Draws the bar chart of races by circuit from compute_races_by_circuit."""
     fig = px.bar(
         circuit_race_count, 
         x='count',
@@ -189,17 +215,27 @@ def races_by_circuit(start_year=2017, end_year=2024):
 
     return fig
 
-def races_by_country(start_year=2017, end_year=2024):
-    """Creates a bar chart showing the number of races by country for a specified year range."""
+@cached_figure
+def races_by_circuit(start_year=None, end_year=None):
+    """Creates a bar chart showing the number of races by circuit for a specified year range (every season by default)."""
+    start_year, end_year = season_bounds(start_year, end_year)
+    return render_races_by_circuit(compute_races_by_circuit(start_year, end_year), start_year, end_year)
+
+@cached_frame
+def compute_races_by_country(start_year=None, end_year=None):
+    """Returns the number of races held in every country in a year range (every season by default), most first."""
     df_race_schedule = load_race_schedule_data()
+    start_year, end_year = season_bounds(start_year, end_year)
 
     df_race_schedule = df_race_schedule[(df_race_schedule['season'] >= start_year) & (df_race_schedule['season'] <= end_year)]
     
     df_race_schedule['location-country'] = df_race_schedule['location-country'].replace({'United States': 'USA'})
     
     race_count_by_country = df_race_schedule.groupby('location-country').size().reset_index(name='count')
-    race_count_by_country = race_count_by_country.sort_values(by='count', ascending=False)
+    return race_count_by_country.sort_values(by='count', ascending=False)
 
+def render_races_by_country(race_count_by_country, start_year, end_year):
+    """Draws the bar chart of races by country from compute_races_by_country."""
     fig = px.bar(race_count_by_country, 
                  x='count',
                  y='location-country',
@@ -223,4 +259,10 @@ def races_by_country(start_year=2017, end_year=2024):
 
     fig.update_traces(textposition='outside')
 
-    return fig
\ No newline at end of file
+    return fig
+
+@cached_figure
+def races_by_country(start_year=None, end_year=None):
+    """Creates a bar chart showing the number of races by country for a specified year range (every season by default)."""
+    start_year, end_year = season_bounds(start_year, end_year)
+    return render_races_by_country(compute_races_by_country(start_year, end_year), start_year, end_year)
\ No newline at end of file
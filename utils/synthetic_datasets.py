@@ -0,0 +1,329 @@
+"""Writes a synthetic Datasets directory with the schema of the real one, for full-history load tests.
+
+Real circuits, drivers and constructors are reused. Lap times are simulated from each circuit's typical
+pace, fuel burn, tyre wear, pit stops and safety cars, and grid and finishing positions follow car pace.
+Pit stop durations and retirement statuses are drawn from the shipped data.
+"""
+import os
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from utils.datasets import DATASETS_DIR
+from utils.loaders import convert_times_to_seconds
+
+POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+TEAMS_PER_SEASON = 10
+DRIVERS_PER_TEAM = 2
+
+# Ergast has fastest laps (and so average speeds) from 2004.
+FIRST_SPEED_SEASON = 2004
+
+# Lap time model, in seconds: each lap is this much faster as fuel burns off, each lap on the
+# same tyres slower by the driver's wear rate, and laps behind the safety car this much slower.
+FUEL_SLOPE = -0.05
+TYRE_WEAR_RANGE = (0.02, 0.09)
+LAP_NOISE = 0.35
+TRAFFIC_PROBABILITY = 0.03
+SAFETY_CAR_PROBABILITY = 0.3
+SAFETY_CAR_FACTOR = 1.4
+
+def circuit_profiles(source_dir):
+    """Returns every circuit of the source schedule with its race name, location, typical lap time and race length."""
+    df_schedule = pd.read_csv(os.path.join(source_dir, 'race_schedule.csv'), dtype=str, keep_default_na=False)
+    df_circuits = df_schedule.groupby('circuitId').last().reset_index()
+
+    lap_files = [file_name for file_name in os.listdir(source_dir) if file_name.startswith('lap_times_')]
+    df_laps = pd.concat([pd.read_csv(os.path.join(source_dir, file_name), usecols=['season', 'round', 'lap', 'time']) for file_name in lap_files])
+    df_laps['lap_time_seconds'] = convert_times_to_seconds(df_laps['time'])
+    df_races = df_laps.groupby(['season', 'round']).agg(
+        race_laps=('lap', 'max'),
+        base_lap_time=('lap_time_seconds', 'median'),
+    ).reset_index()
+    df_races[['season', 'round']] = df_races[['season', 'round']].astype(str)
+    df_races = df_races.merge(df_schedule[['season', 'round', 'circuitId']], on=['season', 'round'])
+    df_races = df_races.groupby('circuitId')[['race_laps', 'base_lap_time']].median().reset_index()
+
+    df_circuits = df_circuits.merge(df_races, on='circuitId', how='left')
+    df_circuits['race_laps'] = df_circuits['race_laps'].fillna(df_races['race_laps'].median()).round().astype(int)
+    df_circuits['base_lap_time'] = df_circuits['base_lap_time'].fillna(df_races['base_lap_time'].median())
+    # An average speed of about 200 kph at the typical lap time, slower for the longer laps.
+    df_circuits['average_speed'] = (200 * np.sqrt(df_circuits['base_lap_time'].median() / df_circuits['base_lap_time'])).round(3)
+    return df_circuits
+
+def retirement_statuses(source_dir):
+    """Returns the statuses of the retirements in the source results and how often each occurred."""
+    df_results = pd.read_csv(os.path.join(source_dir, 'race_results.csv'), usecols=['status'])
+    status = df_results['status']
+    counts = status[~(status.isin(['Finished', 'Disqualified', 'Withdrew']) | status.str.match(r'^\+\d+ Laps?$'))].value_counts()
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+def pit_durations(source_dir):
+    """Returns the green-flag pit stop durations of the source data, which stop durations are drawn from."""
+    durations = pd.to_numeric(pd.read_csv(os.path.join(source_dir, 'pit_results.csv'))['duration'], errors='coerce').dropna()
+    return durations[durations < 60].to_numpy()
+
+def season_round_count(season, scale):
+    """Returns the number of rounds of a generated season, growing from 7 in 1950 to 24 in 2024 before scaling."""
+    return max(1, round((7 + (season - 1950) * 17 / 74) * scale))
+
+def dnf_probability(season):
+    """Returns the chance a car retires, falling from about a third in the 1950s to under a tenth today."""
+    return float(np.clip(0.35 - (season - 1950) * 0.27 / 74, 0.05, 0.35))
+
+def pick_lineup(rng, df_drivers, season, previous_lineup, teams):
+    """Picks the drivers of every team for a season, keeping most drivers of the previous season in their team.
+
+    Drivers are drawn from driver_info among those aged 19 to 40 during the season.
+    """
+    age = (pd.Timestamp(f'{season}-06-01') - df_drivers['dateOfBirth']).dt.days / 365.25
+    eligible = df_drivers.loc[age.between(19, 40), 'driverId'].tolist()
+    others = [driver for driver in df_drivers['driverId'] if driver not in set(eligible)]
+
+    lineup = {team: [] for team in teams}
+    for driver, team in previous_lineup.items():
+        if team in lineup and driver in eligible and rng.random() < 0.8:
+            lineup[team].append(driver)
+    taken = {driver for drivers in lineup.values() for driver in drivers}
+    candidates = [driver for driver in rng.permutation(eligible) if driver not in taken] + list(rng.permutation(others))
+    for team in teams:
+        while len(lineup[team]) < DRIVERS_PER_TEAM:
+            lineup[team].append(candidates.pop(0))
+    return {driver: team for team, drivers in lineup.items() for driver in drivers}
+
+def simulate_race(rng, circuit, pace, durations, season):
+    """Simulates the lap times of one race for every car and works out its classification.
+
+    Each lap is the circuit's typical lap plus the car's pace, fuel burn, tyre wear since the last stop,
+    noise and the odd lap lost in traffic, with a slower start, in- and out-laps and possibly a safety car.
+    Cars that retire stop after a random lap, and the others take the flag on the lap after the leader.
+    """
+    drivers = len(pace)
+    race_laps = int(circuit['race_laps'])
+    laps = np.arange(1, race_laps + 1)
+
+    stop_counts = rng.choice([1, 2, 3], size=drivers, p=[0.45, 0.4, 0.15])
+    stop_laps = np.zeros((drivers, race_laps), dtype=bool)
+    for driver, stop_count in enumerate(stop_counts):
+        stints = np.sort(rng.uniform(0.15, 0.85, stop_count)) * race_laps
+        stop_laps[driver, np.unique(np.clip(stints.astype(int), 1, race_laps - 2)) - 1] = True
+    stop_durations = np.where(stop_laps, rng.choice(durations, size=stop_laps.shape), 0.0)
+
+    last_stop = np.maximum.accumulate(np.where(np.roll(stop_laps, 1, axis=1) & (laps > 1), laps - 1, 0), axis=1)
+    lap_times = circuit['base_lap_time'] + pace[:, None] + FUEL_SLOPE * (laps - race_laps / 2)
+    lap_times = lap_times + rng.uniform(*TYRE_WEAR_RANGE, drivers)[:, None] * (laps - last_stop)
+    lap_times = lap_times + rng.normal(0, LAP_NOISE, lap_times.shape)
+    lap_times = lap_times + (rng.random(lap_times.shape) < TRAFFIC_PROBABILITY) * rng.exponential(3, lap_times.shape)
+    grid = np.argsort(np.argsort(pace + rng.normal(0, 0.2, drivers))) + 1
+    lap_times[:, 0] += 4 + 0.3 * grid
+    lap_times[:, :-1] += np.where(stop_laps[:, :-1], 1.5, 0.0)
+    lap_times[:, 1:] += np.maximum(stop_durations[:, :-1] - 2, 0)
+    if race_laps > 10 and rng.random() < SAFETY_CAR_PROBABILITY:
+        start = rng.integers(2, race_laps - 6)
+        lap_times[:, start:start + rng.integers(3, 7)] = circuit['base_lap_time'] * SAFETY_CAR_FACTOR + rng.normal(0, 0.5, (drivers, 1))
+    race_times = np.cumsum(lap_times, axis=1)
+
+    retired = rng.random(drivers) < dnf_probability(season)
+    finish_time = race_times[~retired, -1].min() if (~retired).any() else race_times[:, -1].min()
+    laps_completed = np.minimum(race_laps, (race_times < finish_time).sum(axis=1) + 1)
+    laps_completed = np.where(retired, rng.integers(0, race_laps, drivers), laps_completed)
+
+    completed = laps[None, :] <= laps_completed[:, None]
+    masked_times = np.where(completed, race_times, np.inf)
+    positions = np.argsort(np.argsort(masked_times, axis=0), axis=0) + 1
+    last_time = np.where(laps_completed > 0, race_times[np.arange(drivers), np.maximum(laps_completed - 1, 0)], np.inf)
+    order = np.lexsort((last_time, -laps_completed, retired))
+
+    return {
+        'lap_times': lap_times, 'race_times': race_times, 'completed': completed, 'positions': positions,
+        'stop_laps': stop_laps & completed, 'stop_durations': stop_durations, 'grid': grid,
+        'retired': retired, 'laps_completed': laps_completed, 'order': order, 'race_laps': race_laps,
+    }
+
+def format_lap_time(seconds):
+    """Formats lap times as m:ss.fff, like the lap times files."""
+    millis = np.rint(np.asarray(seconds) * 1000).astype(np.int64)
+    minutes = pd.Series(millis // 60000).astype(str)
+    secs = pd.Series(millis % 60000 // 1000).astype(str).str.zfill(2)
+    fraction = pd.Series(millis % 1000).astype(str).str.zfill(3)
+    return (minutes + ':' + secs + '.' + fraction).to_numpy()
+
+def format_race_time(seconds):
+    """Formats a winner's race time as h:mm:ss.fff."""
+    millis = int(round(seconds * 1000))
+    return f'{millis // 3600000}:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d}.{millis % 1000:03d}'
+
+def format_gap(seconds):
+    """Formats the gap to the winner as +s.fff, or +m:ss.fff from a minute."""
+    millis = int(round(seconds * 1000))
+    if millis < 60000:
+        return f'+{millis // 1000}.{millis % 1000:03d}'
+    return f'+{millis // 60000}:{millis // 1000 % 60:02d}.{millis % 1000:03d}'
+
+def format_clock(seconds):
+    """Formats seconds after midnight as HH:MM:SS."""
+    seconds = int(seconds)
+    return f'{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+
+def generate_datasets(output_dir, first_season=1950, last_season=2024, first_lap_season=1996, scale=1.0, seed=0, source_dir=DATASETS_DIR):
+    """Writes a synthetic Datasets directory with the schema of the real one, from first_season to last_season.
+
+    The circuits, drivers, constructors, retirement statuses and pit stop durations are drawn from the
+    source datasets, and scale multiplies the number of races per season. Lap times and pit stops are
+    written from first_lap_season on, like the Ergast history.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    df_circuits = circuit_profiles(source_dir)
+    statuses, status_weights = retirement_statuses(source_dir)
+    durations = pit_durations(source_dir)
+    df_drivers = pd.read_csv(os.path.join(source_dir, 'driver_info.csv'), dtype=str, keep_default_na=False)
+    df_drivers['dateOfBirth'] = pd.to_datetime(df_drivers['dateOfBirth'], errors='coerce')
+    driver_names = dict(zip(df_drivers['driverId'], df_drivers['givenName'] + ' ' + df_drivers['familyName']))
+    df_constructors = pd.read_csv(os.path.join(source_dir, 'constructor_standings.csv'), dtype=str).drop_duplicates('constructorId', keep='last')
+    constructors = df_constructors.set_index('constructorId')[['constructorName', 'nationality']]
+
+    teams = list(rng.choice(constructors.index, TEAMS_PER_SEASON, replace=False))
+    team_strength = dict(zip(constructors.index, rng.normal(0, 0.6, len(constructors))))
+    driver_skill = {}
+    lineup = {}
+    schedule_rows, result_rows, pit_rows, driver_standing_rows, constructor_standing_rows = [], [], [], [], []
+
+    for season in range(first_season, last_season + 1):
+        # Teams come and go, and their competitiveness drifts from one season to the next.
+        for index, team in enumerate(teams):
+            if rng.random() < 0.05:
+                teams[index] = rng.choice([constructor for constructor in constructors.index if constructor not in teams])
+        team_strength = {team: 0.7 * strength + rng.normal(0, 0.35) for team, strength in team_strength.items()}
+        lineup = pick_lineup(rng, df_drivers, season, lineup, teams)
+        drivers = list(lineup)
+        for driver in drivers:
+            driver_skill.setdefault(driver, rng.normal(0, 0.3))
+        season_pace = np.array([team_strength[lineup[driver]] + driver_skill[driver] for driver in drivers])
+
+        round_count = season_round_count(season, scale)
+        race_circuits = df_circuits.iloc[np.concatenate([
+            rng.permutation(len(df_circuits)) for _ in range(round_count // len(df_circuits) + 1)
+        ])[:round_count]]
+        race_dates = pd.Timestamp(f'{season}-03-01') + pd.to_timedelta(np.linspace(0, 260, round_count).astype(int), unit='D')
+        lap_rows = []
+        name_counts = {}
+
+        for race_round, (circuit, race_date) in enumerate(zip(race_circuits.to_dict('records'), race_dates), start=1):
+            name_counts[circuit['raceName']] = name_counts.get(circuit['raceName'], 0) + 1
+            race_name = circuit['raceName'] if name_counts[circuit['raceName']] == 1 else f"{circuit['raceName']} {name_counts[circuit['raceName']]}"
+            date = race_date.strftime('%Y-%m-%d')
+            schedule_rows.append((season, race_round, race_name, date, '14:00:00Z', circuit['circuitId'], circuit['circuitName'],
+                                  circuit['location-locality'], circuit['location-country'], circuit['location-lat'], circuit['location-long']))
+
+            race = simulate_race(rng, circuit, season_pace, durations, season)
+            race_laps = race['race_laps']
+            winner_time = race['race_times'][race['order'][0], -1]
+            for position, driver_index in enumerate(race['order'], start=1):
+                driver = drivers[driver_index]
+                laps_completed = race['laps_completed'][driver_index]
+                if race['retired'][driver_index]:
+                    status = rng.choice(statuses, p=status_weights)
+                elif laps_completed < race_laps:
+                    status = f'+{race_laps - laps_completed} Lap' + ('s' if race_laps - laps_completed > 1 else '')
+                else:
+                    status = 'Finished'
+                classified = not race['retired'][driver_index]
+                points = POINTS[position - 1] if classified and position <= len(POINTS) else 0
+                time_ms, time_text = '', ''
+                if status == 'Finished':
+                    race_time = race['race_times'][driver_index, -1]
+                    time_ms = int(round(race_time * 1000))
+                    time_text = format_race_time(race_time) if position == 1 else format_gap(race_time - winner_time)
+                speed_unit, speed = '', ''
+                if season >= FIRST_SPEED_SEASON and laps_completed > 1:
+                    fastest_lap = race['lap_times'][driver_index, 1:laps_completed].min()
+                    speed_unit, speed = 'kph', round(circuit['average_speed'] * circuit['base_lap_time'] / fastest_lap, 3)
+                grid = 0 if rng.random() < 0.01 else race['grid'][driver_index]
+                result_rows.append((season, race_round, race_name, date, driver, lineup[driver], grid, position, status, points,
+                                    time_ms, time_text, speed_unit, speed))
+
+            if season >= first_lap_season:
+                driver_index, lap_index = np.nonzero(race['completed'])
+                lap_rows.append(pd.DataFrame({
+                    'season': season,
+                    'round': race_round,
+                    'lap': lap_index + 1,
+                    'position': race['positions'][driver_index, lap_index],
+                    'driverId': np.array(drivers)[driver_index],
+                    'time': format_lap_time(race['lap_times'][driver_index, lap_index]),
+                }))
+                # Stops are timed on a 14:00 local start, in the order cars came in.
+                driver_index, lap_index = np.nonzero(race['stop_laps'])
+                stop_order = np.argsort(race['race_times'][driver_index, lap_index], kind='stable')
+                stop_numbers = {}
+                for index in stop_order:
+                    driver = drivers[driver_index[index]]
+                    stop_numbers[driver] = stop_numbers.get(driver, 0) + 1
+                    pit_rows.append((season, race_round, driver, stop_numbers[driver], lap_index[index] + 1,
+                                     format_clock(14 * 3600 + race['race_times'][driver_index[index], lap_index[index]]),
+                                     round(race['stop_durations'][driver_index[index], lap_index[index]], 3)))
+
+        if lap_rows:
+            df_season_laps = pd.concat(lap_rows, ignore_index=True).sort_values(['round', 'lap', 'position'], kind='stable')
+            df_season_laps.to_csv(os.path.join(output_dir, f'lap_times_{season}.csv'), index=False)
+
+        season_results = pd.DataFrame(
+            [(row[4], row[5], row[9], row[7]) for row in result_rows if row[0] == season],
+            columns=['driverId', 'constructorId', 'points', 'position']
+        )
+        season_results['win'] = season_results['position'] == 1
+        df_driver_totals = season_results.groupby('driverId', sort=False).agg(
+            points=('points', 'sum'), wins=('win', 'sum'), constructorId=('constructorId', 'last')
+        ).reset_index().sort_values(['points', 'wins'], ascending=False, kind='stable')
+        for position, row in enumerate(df_driver_totals.itertuples(index=False), start=1):
+            driver_standing_rows.append((season, position, row.points, row.wins, row.driverId, driver_names.get(row.driverId, row.driverId),
+                                         row.constructorId, constructors.at[row.constructorId, 'constructorName']))
+        df_constructor_totals = season_results.groupby('constructorId', sort=False).agg(
+            points=('points', 'sum'), wins=('win', 'sum')
+        ).reset_index().sort_values(['points', 'wins'], ascending=False, kind='stable')
+        for position, row in enumerate(df_constructor_totals.itertuples(index=False), start=1):
+            constructor_standing_rows.append((season, position, row.points, row.wins, row.constructorId,
+                                              constructors.at[row.constructorId, 'constructorName'], constructors.at[row.constructorId, 'nationality']))
+
+    pd.DataFrame(schedule_rows, columns=[
+        'season', 'round', 'raceName', 'date', 'time', 'circuitId', 'circuitName',
+        'location-locality', 'location-country', 'location-lat', 'location-long'
+    ]).to_csv(os.path.join(output_dir, 'race_schedule.csv'), index=False)
+    df_results = pd.DataFrame(result_rows, columns=[
+        'season', 'round', 'raceName', 'date', 'driverId', 'constructorId', 'grid', 'position', 'status', 'points',
+        'time-ms', 'time-hrmins', 'Max Avg Speed Unit', 'Max Avg Speed'
+    ])
+    df_results.to_csv(os.path.join(output_dir, 'race_results.csv'), index=False)
+    pd.DataFrame(pit_rows, columns=['season', 'round', 'driverId', 'stop', 'lap', 'time', 'duration']).to_csv(
+        os.path.join(output_dir, 'pit_results.csv'), index=False)
+    pd.DataFrame(driver_standing_rows, columns=[
+        'season', 'position', 'points', 'wins', 'driverId', 'driverName', 'constructorId', 'constructorName'
+    ]).to_csv(os.path.join(output_dir, 'driver_standings.csv'), index=False)
+    pd.DataFrame(constructor_standing_rows, columns=[
+        'season', 'position', 'points', 'wins', 'constructorId', 'constructorName', 'nationality'
+    ]).to_csv(os.path.join(output_dir, 'constructor_standings.csv'), index=False)
+
+    # The status counts are recounted from the generated results, keeping the mechanical statuses of the source.
+    status_counts = df_results['status'].value_counts().rename_axis('status').reset_index()
+    status_counts.to_csv(os.path.join(output_dir, 'finishing_status_2017_2024.csv'), index=False)
+    mechanical = pd.read_csv(os.path.join(source_dir, 'finishing_status_mechanica_issues_2017_2024.csv'))['status']
+    status_counts[status_counts['status'].isin(mechanical)].to_csv(
+        os.path.join(output_dir, 'finishing_status_mechanica_issues_2017_2024.csv'), index=False)
+    for file_name in ['driver_info.csv', 'finishing_status.csv']:
+        shutil.copy(os.path.join(source_dir, file_name), os.path.join(output_dir, file_name))
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic Datasets directory to load-test the dashboard.')
+    parser.add_argument('output_dir', help='Directory to write the datasets to')
+    parser.add_argument('--seasons', nargs=2, type=int, default=[1950, 2024], metavar=('FIRST', 'LAST'), help='Seasons to generate')
+    parser.add_argument('--first-lap-season', type=int, default=1996, help='First season with lap times and pit stops')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplies the number of races per season')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--source-dir', default=DATASETS_DIR, help='Datasets the circuits, drivers and distributions are drawn from')
+    args = parser.parse_args()
+
+    generate_datasets(args.output_dir, args.seasons[0], args.seasons[1], args.first_lap_season, args.scale, args.seed, args.source_dir)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import pandas as pd
+from utils.datasets import load_dataset
+
+# Files that hold every value of the vocabulary columns. The lap times and pit
+# stops only refer to drivers that also appear in these files.
+VOCABULARY_SOURCES = {
+    'race_results.csv': ['driverId', 'constructorId', 'raceName', 'status'],
+    'driver_standings.csv': ['driverId', 'constructorId'],
+    'constructor_standings.csv': ['constructorId'],
+    'driver_info.csv': ['driverId'],
+    'race_schedule.csv': ['raceName', 'circuitName'],
+    'finishing_status_mechanica_issues_2017_2024.csv': ['status'],
+}
+
+VOCABULARY_COLUMNS = ['driverId', 'constructorId', 'raceName', 'status', 'circuitName']
+
+# Derived columns that hold values of a vocabulary column, such as a driver's teammate.
+VOCABULARY_ALIASES = {'teammateId': 'driverId', 'rivalId': 'driverId'}
+
+def build_vocabulary(*file_paths):
+    """Collects the sorted distinct values of each vocabulary column across the source files."""
+    values = {column: set() for column in VOCABULARY_COLUMNS}
+    for file_path, columns in zip(file_paths, VOCABULARY_SOURCES.values()):
+        if file_path.endswith('.parquet'):
+            df = pd.read_parquet(file_path, columns=columns)
+        else:
+            df = pd.read_csv(file_path, usecols=columns, dtype=str)
+        for column in columns:
+            values[column].update(df[column].dropna().astype(str).unique())
+    return pd.DataFrame(
+        [(column, value) for column in VOCABULARY_COLUMNS for value in sorted(values[column])],
+        columns=['column', 'value']
+    )
+
+def load_vocabulary():
+    """Returns the categorical type of each vocabulary column, shared by every loaded frame."""
+    df_vocabulary = load_dataset('vocabulary', list(VOCABULARY_SOURCES), build_vocabulary)
+    return {
+        column: pd.CategoricalDtype(df_vocabulary.loc[df_vocabulary['column'] == column, 'value'])
+        for column in VOCABULARY_COLUMNS
+    }
+
+def vocabulary_codes(column):
+    """Returns the mapping from each value of a vocabulary column to its integer code."""
+    categories = load_vocabulary()[column].categories
+    return dict(zip(categories, range(len(categories))))
+
+def vocabulary_labels(series):
+    """Returns the values of a vocabulary column as plain strings, for labels and chart categories.
+
+    With copy-on-write, pandas casts a categorical column without rows through np.array(copy=False),
+    which NumPy 2 refuses, so the values are turned into objects first.
+    """
+    return series.astype(object).astype(str)
+
+def apply_vocabulary(df):
+    """Turns the vocabulary columns of a frame into categoricals with the shared category order.
+
+    Frames encoded this way compare, group and merge on the integer codes. A value missing
+    from the vocabulary is added to that column's categories rather than dropped.
+    """
+    vocabulary = load_vocabulary()
+    for column in VOCABULARY_COLUMNS + list(VOCABULARY_ALIASES):
+        if column in df:
+            series = df[column]
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype('category')
+            categories = vocabulary[VOCABULARY_ALIASES.get(column, column)].categories
+            extra_values = set(series.cat.categories) - set(categories)
+            if extra_values:
+                categories = list(categories) + sorted(extra_values)
+            # Re-coding a categorical only maps its categories, not every row.
+            df[column] = series.cat.set_categories(categories)
+    return df
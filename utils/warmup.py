@@ -0,0 +1,131 @@
+"""Background warm-up that prebuilds the default figures of every section when the server starts.
+
+The figures are built on F1_WARMUP_WORKERS threads so the first visitor of a section is served from the
+figure cache. The progress, failures and slowest figures are written to F1_WARMUP_STATUS_FILE when that
+is set, and running this module exits with status 0 once the warm-up is done.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WARMUP_WORKERS = int(os.environ.get('F1_WARMUP_WORKERS', '4'))
+WARMUP_STATUS_FILE = os.environ.get('F1_WARMUP_STATUS_FILE')
+
+def task_name(function, args, kwargs):
+    """Returns a readable name for a warm-up task, such as race_schedule_vis.f1_circuit_world_map(2024)."""
+    arguments = [repr(value) for value in args] + [f'{key}={value!r}' for key, value in kwargs.items()]
+    return f'{function.__module__.split(".")[-1]}.{function.__name__}({", ".join(arguments)})'
+
+class WarmupJob:
+    """Prebuilds figures in the background on a pool of threads, keeping track of its progress and timing.
+
+    list_tasks returns the (function, args, kwargs) calls to make. It is called on the background thread,
+    so importing the chart modules and reading the catalogue do not hold up the caller. Calling the
+    memoized chart functions is what stores their figures in the shared figure cache.
+    """
+
+    def __init__(self, list_tasks, workers=WARMUP_WORKERS, status_file=WARMUP_STATUS_FILE):
+        self.list_tasks = list_tasks
+        self.workers = workers
+        self.status_file = status_file
+        self.total = None
+        self.completed = 0
+        self.failed = {}
+        self.timings = {}
+        self.started_at = None
+        self.finished_at = None
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        """Starts the job on a daemon thread and returns it."""
+        self.started_at = time.time()
+        self.write_status()
+        threading.Thread(target=self.run, name='figure-warmup', daemon=True).start()
+        return self
+
+    def run(self):
+        """Lists the tasks and runs them on the thread pool, returning once every task has finished."""
+        try:
+            tasks = list(self.list_tasks())
+        except Exception as error:
+            tasks = []
+            self.failed['list_tasks'] = repr(error)
+        with self._lock:
+            self.total = len(tasks)
+        self.write_status()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='figure-warmup') as executor:
+            for task in tasks:
+                executor.submit(self.run_task, *task)
+
+        self.finished_at = time.time()
+        self.write_status()
+        self.finished.set()
+
+    def run_task(self, function, args=(), kwargs=None):
+        """Calls one chart function, recording its time or its error."""
+        kwargs = kwargs or {}
+        name = task_name(function, args, kwargs)
+        started_at = time.perf_counter()
+        try:
+            function(*args, **kwargs)
+        except Exception as error:
+            with self._lock:
+                self.failed[name] = repr(error)
+        with self._lock:
+            self.timings[name] = time.perf_counter() - started_at
+            self.completed += 1
+        self.write_status()
+
+    def wait(self, timeout=None):
+        """Blocks until the job has finished or the timeout has passed, returning whether it finished."""
+        return self.finished.wait(timeout)
+
+    def status(self):
+        """Returns the progress of the job: tasks completed and failed, whether it is done, and its slowest tasks."""
+        with self._lock:
+            end = self.finished_at or time.time()
+            slowest = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:5]
+            return {
+                'ready': self.finished_at is not None,
+                'total': self.total,
+                'completed': self.completed,
+                'failed': dict(self.failed),
+                'started_at': self.started_at,
+                'elapsed_seconds': round(end - self.started_at, 3) if self.started_at else 0.0,
+                'task_seconds': round(sum(self.timings.values()), 3),
+                'slowest': [{'task': name, 'seconds': round(seconds, 3)} for name, seconds in slowest],
+            }
+
+    def write_status(self):
+        """Writes the status to the status file, if there is one, replacing it only once the new one is complete."""
+        if not self.status_file:
+            return
+        # Written under a lock of its own so an older status never replaces a newer one.
+        with self._write_lock:
+            with open(f'{self.status_file}.tmp', 'w') as file:
+                json.dump(self.status(), file, indent=2)
+            os.replace(f'{self.status_file}.tmp', self.status_file)
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the status file of the dashboard warm-up, for a readiness probe.')
+    parser.add_argument('status_file', nargs='?', default=WARMUP_STATUS_FILE, help='Status file written by the warm-up (default: F1_WARMUP_STATUS_FILE)')
+    args = parser.parse_args()
+
+    if not args.status_file or not os.path.exists(args.status_file):
+        print('Warm-up has not started')
+        sys.exit(1)
+    with open(args.status_file) as file:
+        status = json.load(file)
+    print(f'{status["completed"]}/{status["total"] if status["total"] is not None else "?"} figures prebuilt '
+          f'in {status["elapsed_seconds"]:.1f}s, {len(status["failed"])} failed')
+    sys.exit(0 if status['ready'] else 1)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file